@@ -31,7 +31,8 @@ from collections.abc import Sequence
 from pathlib import Path
 
 from .doc import GeneratedDoc
-from .nodes import LocalRef, Section, TocTree, section_title_text
+from .nodes import LocalRef, Section, TocTree, encoder, section_title_text
+from .pack import encode_entry, entry_name, read_staging_format
 
 
 def _check_bundle_dir(bundle_dir: Path) -> Path:
@@ -51,24 +52,34 @@ def _check_key(key: str) -> str:
     return key
 
 
+def _doc_path(bundle_dir: Path, key: str) -> Path:
+    fmt = read_staging_format(bundle_dir)
+    return bundle_dir / "docs" / entry_name("docs", _check_key(key), fmt)
+
+
 def list_doc_keys(bundle_dir: Path) -> list[str]:
     """List the narrative-doc keys present in a bundle directory."""
     bundle_dir = _check_bundle_dir(bundle_dir)
     docs = bundle_dir / "docs"
     if not docs.is_dir():
         return []
-    return sorted(p.name for p in docs.iterdir() if p.is_file())
+    suffix = ".cbor" if read_staging_format(bundle_dir) == "cbor" else ""
+    return sorted(p.name.removesuffix(suffix) for p in docs.iterdir() if p.is_file())
 
 
 def read_doc(bundle_dir: Path, key: str) -> GeneratedDoc:
     """Read one narrative page (``docs/<key>``) as a ``GeneratedDoc``."""
     bundle_dir = _check_bundle_dir(bundle_dir)
-    path = bundle_dir / "docs" / _check_key(key)
+    path = _doc_path(bundle_dir, key)
     if not path.is_file():
         raise ValueError(
             f"no narrative doc {key!r} in {bundle_dir} "
             f"(available: {', '.join(list_doc_keys(bundle_dir)) or 'none'})"
         )
+    if path.suffix == ".cbor":
+        doc = encoder.decode(path.read_bytes())
+        assert isinstance(doc, GeneratedDoc), type(doc)
+        return doc
     return GeneratedDoc.from_dict(json.loads(path.read_text()))
 
 
@@ -76,9 +87,10 @@ def write_doc(bundle_dir: Path, key: str, doc: GeneratedDoc) -> None:
     """Validate and write one narrative page to ``docs/<key>``."""
     bundle_dir = _check_bundle_dir(bundle_dir)
     doc.validate()
-    docs = bundle_dir / "docs"
-    docs.mkdir(exist_ok=True)
-    (docs / _check_key(key)).write_bytes(doc.to_json())
+    path = _doc_path(bundle_dir, key)
+    path.parent.mkdir(exist_ok=True)
+    fmt = read_staging_format(bundle_dir)
+    path.write_bytes(encode_entry(doc, fmt))
 
 
 def narrative_doc(sections: Sequence[Section]) -> GeneratedDoc:
@@ -160,8 +172,7 @@ def add_toc_entry(
     toc already references *key* — so injectors stay idempotent.
     """
     bundle_dir = _check_bundle_dir(bundle_dir)
-    _check_key(key)
-    if not (bundle_dir / "docs" / key).is_file():
+    if not _doc_path(bundle_dir, key).is_file():
         raise ValueError(f"cannot add toc entry for missing doc {key!r}")
     toc_path = bundle_dir / "toc.json"
     nodes: tuple[TocTree, ...] = ()
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from pathlib import Path
 from typing import Annotated
 
 import typer
@@ -54,6 +55,94 @@ def gen(
         "--only",
         help="Restrict generation to these qualified names (repeatable).",
     ),
+    jobs: int | None = typer.Option(
+        None,
+        "--jobs",
+        "-j",
+        min=1,
+        help="Number of worker processes used to build the API and narrative docs "
+        "(default: the `jobs` config value, 1 if unset).",
+    ),
+    cache: bool | None = typer.Option(
+        None,
+        "--cache/--no-cache",
+        help="Reuse unchanged objects and narrative pages from the persistent "
+        "caches in ~/.cache/papyri/gen/ and ~/.cache/papyri/narrative/ "
+        "(default: the `cache` config value, on if unset).",
+    ),
+    exec_cache: bool | None = typer.Option(
+        None,
+        "--exec-cache/--no-exec-cache",
+        help="Replay unchanged examples from the persistent exec cache in "
+        "~/.cache/papyri/exec/ instead of executing them again "
+        "(default: the `exec_cache` config value, on if unset).",
+    ),
+    jedi_cache: bool | None = typer.Option(
+        None,
+        "--jedi-cache/--no-jedi-cache",
+        help="Reuse type inference results from the persistent Jedi cache in "
+        "~/.cache/papyri/jedi.sqlite3 "
+        "(default: the `jedi_cache` config value, on if unset).",
+    ),
+    example_workers: int | None = typer.Option(
+        None,
+        "--example-workers",
+        min=0,
+        help="Execute examples in this many isolated worker processes with a "
+        "timeout and memory limit; 0 runs them in-process "
+        "(default: the `example_workers` config value, 0 if unset).",
+    ),
+    collector: str | None = typer.Option(
+        None,
+        "--collector",
+        help="How to find API objects: 'import' the package, or parse its "
+        "sources with ast ('static', importing extension modules only) "
+        "(default: the `collector` config value, 'import' if unset).",
+    ),
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        is_flag=True,
+        help="Record wall and CPU time per phase and per object, write them to "
+        "<bundle>.profile.json next to the bundle and log the slowest objects.",
+    ),
+    profile_top: int = typer.Option(
+        20,
+        "--profile-top",
+        min=0,
+        help="Number of slowest objects logged with --profile.",
+    ),
+    memory: bool = typer.Option(
+        False,
+        "--memory",
+        is_flag=True,
+        help="Sample RSS and tracemalloc snapshots between passes and add "
+        "peak, growth per pass and top allocation sites to the --profile "
+        "report (slows gen down).",
+    ),
+    watch: bool = typer.Option(
+        False,
+        "--watch",
+        is_flag=True,
+        help="After generation, keep watching the package sources and "
+        "docs_path and regenerate what changes affect into the bundle, "
+        "until interrupted.",
+    ),
+    serve: str | None = typer.Option(
+        None,
+        "--serve",
+        metavar="SOCKET",
+        help="After generation, keep running and regenerate single objects, "
+        "narrative files and examples on JSON-RPC requests to this Unix "
+        "socket.",
+    ),
+    max_pending: int = typer.Option(
+        8,
+        "--max-pending",
+        min=1,
+        help="Number of requests --serve accepts at once (one runs, the "
+        "others wait); further ones are refused as busy.",
+    ),
     upload: bool = typer.Option(
         False,
         "--upload",
@@ -66,6 +155,14 @@ def gen(
         is_flag=True,
         help="After generation, pack the bundle into a .papyri artifact in the current directory.",
     ),
+    artifact: Path | None = typer.Option(
+        None,
+        "--artifact",
+        metavar="PATH",
+        help="Write the .papyri artifact to PATH straight from memory, "
+        "without writing and re-reading a DocBundle directory (same bytes "
+        "as gen followed by pack).",
+    ),
 ) -> None:
     """
     Generate documentation IR for a given package.
@@ -85,6 +182,8 @@ def gen(
     from papyri.gen import gen_main
 
     here = os.getcwd()
+    if artifact is not None and pack:
+        raise typer.BadParameter("--artifact already packs; drop --pack.")
 
     with TemporaryWorkingDirectory():
         bundle_path = gen_main(
@@ -102,6 +201,19 @@ def gen(
             fail_unseen_error=fail_unseen_error,
             limit_to=only,
             error_on_warning=error_on_warning,
+            jobs=jobs,
+            cache=cache,
+            exec_cache=exec_cache,
+            jedi_cache=jedi_cache,
+            example_workers=example_workers,
+            collector=collector,
+            profile=profile,
+            profile_top=profile_top,
+            memory=memory,
+            watch=watch,
+            serve=serve,
+            max_pending=max_pending,
+            artifact=None if artifact is None else Path(here, artifact.expanduser()),
         )
 
     if pack and bundle_path:
@@ -50,6 +50,13 @@ def pack(
             help="Promote bundle-lint warnings to errors and refuse to pack: dangling local refs, and orphan narrative docs (present but unreachable from any toc entry). Use in CI to catch toctree/cross-ref regressions.",
         ),
     ] = False,
+    revalidate: Annotated[
+        bool,
+        typer.Option(
+            "--revalidate/--no-revalidate",
+            help="Type-check every decoded node before packing. Skip it for a directory that `papyri gen` just wrote and validated.",
+        ),
+    ] = True,
 ) -> None:
     """
     Validate a DocBundle directory and write a single deterministic
@@ -77,21 +84,39 @@ def pack(
             typer.echo(f"error: no bundles found under {_DEFAULT_DATA_DIR}", err=True)
             raise typer.Exit(1)
         for target in targets:
-            _pack_one(target, _DEFAULT_DATA_DIR, verbose=verbose, strict=strict)
+            _pack_one(
+                target,
+                _DEFAULT_DATA_DIR,
+                verbose=verbose,
+                strict=strict,
+                revalidate=revalidate,
+            )
         return
 
-    _pack_one(bundle_dir.expanduser().resolve(), output, verbose=verbose, strict=strict)
+    _pack_one(
+        bundle_dir.expanduser().resolve(),
+        output,
+        verbose=verbose,
+        strict=strict,
+        revalidate=revalidate,
+    )
 
 
 def _pack_one(
-    bundle_dir: Path, output: Path | None, verbose: bool = False, strict: bool = False
+    bundle_dir: Path,
+    output: Path | None,
+    verbose: bool = False,
+    strict: bool = False,
+    revalidate: bool = True,
 ) -> None:
     from papyri.pack import make_artifact_from_dir
 
     log = (lambda msg: typer.echo(msg, err=True)) if verbose else None
     if verbose:
         typer.echo(f"packing {bundle_dir.name} …", err=True)
-    data, bundle = make_artifact_from_dir(bundle_dir, log=log, strict=strict)
+    data, bundle = make_artifact_from_dir(
+        bundle_dir, log=log, strict=strict, revalidate=revalidate
+    )
     default_name = f"{bundle.module}-{bundle.version}.papyri"
     if output is None:
         out_path = Path.cwd() / default_name
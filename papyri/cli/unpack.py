@@ -1,4 +1,4 @@
-"""``papyri unpack`` — explode a ``.papyri`` artifact back into a JSON DocBundle directory."""
+"""``papyri unpack`` — explode a ``.papyri`` artifact or a DocBundle directory into a JSON (or CBOR) DocBundle directory."""
 
 from __future__ import annotations
 
@@ -12,7 +12,10 @@ def unpack(
     artifact: Annotated[
         Path,
         typer.Argument(
-            help="Path to a `.papyri` artifact (output of `papyri pack`).",
+            help=(
+                "Path to a `.papyri` artifact (output of `papyri pack`), or to "
+                "a DocBundle directory (e.g. one staged as CBOR)."
+            ),
         ),
     ],
     output: Annotated[
@@ -27,6 +30,16 @@ def unpack(
             ),
         ),
     ] = None,
+    json: Annotated[
+        bool,
+        typer.Option(
+            "--json/--cbor",
+            help=(
+                "Write module/, docs/ and examples/ entries as indented JSON "
+                "(the default, for humans) or as CBOR."
+            ),
+        ),
+    ] = True,
     verbose: Annotated[
         bool,
         typer.Option(
@@ -45,12 +58,16 @@ def unpack(
     The bundle directory is named ``<module>_<version>`` and created under the
     output directory (the current directory by default). The command fails if
     that directory already exists.
+
+    Given a DocBundle directory instead, the bundle is validated and copied,
+    which turns a CBOR staging directory (``staging_format = "cbor"``) into
+    JSON; ``--cbor`` converts the other way.
     """
     from papyri.pack import BundleError, explode_artifact_to_dir
 
     artifact = artifact.expanduser()
-    if not artifact.is_file():
-        typer.echo(f"error: {artifact} is not a file", err=True)
+    if not artifact.exists():
+        typer.echo(f"error: {artifact} is not a file or a directory", err=True)
         raise typer.Exit(1)
 
     dest_parent = (output.expanduser() if output is not None else Path.cwd()).resolve()
@@ -60,7 +77,9 @@ def unpack(
         typer.echo(f"unpacking {artifact.name} …", err=True)
 
     try:
-        out_dir = explode_artifact_to_dir(artifact, dest_parent, log=log)
+        out_dir = explode_artifact_to_dir(
+            artifact, dest_parent, log=log, staging_format="json" if json else "cbor"
+        )
     except BundleError as exc:
         typer.echo(f"error: {exc}", err=True)
         raise typer.Exit(1) from exc
@@ -56,6 +56,50 @@ class Config:
     # resolves to ``error``. Set False (CLI: ``--no-error-on-warning``) for the
     # legacy "warn and continue" behaviour during incremental adoption.
     error_on_warning: bool = True
+    # Number of worker processes used to document API objects and to parse
+    # and visit narrative docs (CLI: ``--jobs``). Workers are forked after the
+    # package is imported and collected; 1 keeps everything in-process.
+    jobs: int = 1
+    # Reuse per-object results from the content-addressed cache under
+    # ``~/.cache/papyri/gen/``, and unaffected narrative pages from
+    # ``~/.cache/papyri/narrative/`` (CLI: ``--cache/--no-cache``). Never used
+    # with ``dry_run``.
+    cache: bool = True
+    # Replay executed examples from the content-addressed cache under
+    # ``~/.cache/papyri/exec/`` (CLI: ``--exec-cache/--no-exec-cache``). Never
+    # used with ``dry_run``.
+    exec_cache: bool = True
+    # Size cap of the exec cache, in MiB; least recently used entries are
+    # evicted at the end of each build.
+    exec_cache_size: int = 1024
+    # Execute each object's examples in a pool of this many forked worker
+    # processes (CLI: ``--example-workers``), isolating gen from examples that
+    # hang, leak or crash; 0 executes them in-process.
+    example_workers: int = 0
+    # Wall-clock limit, in seconds, for one object's examples in a worker.
+    example_timeout: float = 300.0
+    # Address-space limit of each example worker, in MiB; None for no limit.
+    example_memory_limit: int | None = None
+    # Number of objects an example worker handles before it is replaced.
+    example_worker_max_tasks: int = 100
+    # Keep Jedi inference results in ``~/.cache/papyri/jedi.sqlite3`` (CLI:
+    # ``--jedi-cache/--no-jedi-cache``). Never used with ``dry_run``.
+    jedi_cache: bool = True
+    # Size cap of the Jedi cache, in MiB; least recently used entries are
+    # evicted at the end of each build.
+    jedi_cache_size: int = 256
+    # Format of figures captured from examples: "png", "svg" or "webp".
+    figure_format: str = "png"
+    # Resolution of raster figures, in dots per inch.
+    figure_dpi: int = 300
+    # Encoding of the module/, docs/ and examples/ entries of the DocBundle:
+    # "json" (indented, for humans) or "cbor" (smaller, and read back by
+    # ``papyri pack`` without the JSON round-trip).
+    staging_format: str = "json"
+    # How API objects are found (CLI: ``--collector``): "import" imports the
+    # package and crawls it, "static" parses its sources with ``ast`` and
+    # only imports extension modules (see ``static_collector``).
+    collector: str = "import"
     # Values are either a plain handler qualname ("mod:Class.method") or a table
     # with "handler", optional "init_args" list, and optional "init_kwargs" dict.
     directives: dict[str, str | dict[str, Any]] = dataclasses.field(
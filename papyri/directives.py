@@ -2,12 +2,13 @@
 Various directive handlers.
 """
 
+import contextlib
 import logging
-from collections.abc import Callable
-from itertools import count
+from collections.abc import Callable, Iterator
 from pathlib import Path
 from typing import Any
 
+from .executors import FigureEncoder
 from .nodes import (
     Admonition,
     AdmonitionTitle,
@@ -42,6 +43,30 @@ def _log_warn(msg: str) -> None:
     log.warning(msg)
 
 
+# Sets collecting the files that ``include``, ``csv-table :file:`` and
+# ``image`` handlers look up, see ``recording_file_reads``.
+_FILE_READS: list[set[Path]] = []
+
+
+@contextlib.contextmanager
+def recording_file_reads() -> Iterator[set[Path]]:
+    """
+    Collect every file a directive handler reads (or looks for and does not
+    find) in the block; gen's narrative cache uses these as dependencies.
+    """
+    reads: set[Path] = set()
+    _FILE_READS.append(reads)
+    try:
+        yield reads
+    finally:
+        _FILE_READS.remove(reads)
+
+
+def _note_read(path: Path) -> None:
+    for reads in _FILE_READS:
+        reads.add(path)
+
+
 def drop(argument: str, options: dict[str, str], content: str) -> list[Any]:
     """Directive handler that silently discards the directive and returns nothing.
 
@@ -388,9 +413,6 @@ def container_handler(
     return nodes
 
 
-_plot_counter = count(0)
-
-
 def make_plot_handler(
     asset_store: Callable[[str, bytes], None] | None,
     module: str,
@@ -398,13 +420,15 @@ def make_plot_handler(
     execute: bool = False,
     qa: str = "plot",
     warn: DirectiveWarn = _log_warn,
+    figure_encoder: FigureEncoder | None = None,
 ) -> Callable[[str, dict[str, str], str], list[Any]]:
     """Return a ``.. plot::`` directive handler bound to the given execution context.
 
     When *execute* is ``True`` and *asset_store* is available the code body is
     run via ``BlockExecutor`` (same mechanism as doctest examples in gen.py).
-    Every matplotlib figure open after the run is saved as a bundle asset and
-    appended as a ``Figure`` node after the ``Code`` node.
+    Every matplotlib figure open after the run is encoded by *figure_encoder*
+    (PNG at 300 dpi by default), saved as a bundle asset and appended as a
+    ``Figure`` node after the ``Code`` node.
 
     When *execute* is ``False`` (or matplotlib / *asset_store* are absent) the
     code body is returned as a bare ``Code`` node so the example is not lost.
@@ -434,10 +458,10 @@ def make_plot_handler(
                 executor = BlockExecutor({})
                 with executor:
                     executor.exec(content, name=qa)
-                    fig_bytes_list = executor.get_figs()
-                for fig_bytes in fig_bytes_list:
-                    n = next(_plot_counter)
-                    figname = f"fig-plot-{n}.png"
+                    fig_list = executor.get_figs(figure_encoder)
+                # Assets are named by content, so the same figure gets the
+                # same name whichever process or run renders it.
+                for figname, fig_bytes in fig_list:
                     asset_store(figname, fig_bytes)
                     nodes.append(
                         Figure(
@@ -567,6 +591,7 @@ def csv_table_handler(
                 )
                 return []
             csv_path = (doc_path / file_opt).resolve()
+        _note_read(csv_path)
         if not csv_path.is_file():
             warn(f"csv-table: file {csv_path} not found; dropping directive")
             return []
@@ -685,6 +710,7 @@ def make_image_handler(
                 return [Image(url=uri, alt=alt)]
             img_path = (doc_path / uri).resolve()
 
+        _note_read(img_path)
         if not img_path.is_file():
             warn(f"image directive: {img_path} not found")
             return [Image(url=uri, alt=alt)]
@@ -789,6 +815,7 @@ def make_include_handler(
                 return []
             inc_path = (doc_path / uri).resolve()
 
+        _note_read(inc_path)
         if not inc_path.is_file():
             warn(f"include directive: {inc_path} not found; dropping")
             return []
@@ -134,6 +134,13 @@ W_DOCTEST_EXEC = _register(
     "Executing an example block raised (only recorded when exec_failure is "
     "set to 'fallback'; otherwise gen aborts the object).",
 )
+W_EXAMPLE_WORKER = _register(
+    "W-example-worker",
+    Severity.WARNING,
+    "An object's examples timed out, exceeded the memory limit or crashed "
+    "their isolated worker process (see example_workers); they are rendered "
+    "without execution output.",
+)
 W_NUMPYDOC_PARSE = _register(
     "W-numpydoc-parse",
     Severity.ERROR,
@@ -292,6 +299,16 @@ class Diagnostics:
         )
         return severity
 
+    def absorb(
+        self, records: list[dict[str, str]], counts: Mapping[Severity, int]
+    ) -> None:
+        """Fold in diagnostics that were already emitted (and logged) by
+        another ``Diagnostics`` instance, e.g. in a ``papyri gen --jobs``
+        worker process."""
+        self.records.extend(records)
+        for severity, n in counts.items():
+            self.counts[severity] += n
+
     @property
     def error_count(self) -> int:
         return self.counts[Severity.ERROR]
@@ -322,6 +339,22 @@ class ErrorCollector:
         self._unexpected_errors = {}
         self._expected_errors = {}
 
+    def merge(self, other: ErrorCollector, qa: str) -> None:
+        """Fold in the outcome of ``other`` for the single qualname ``qa``.
+
+        ``other`` must have been created from the same configuration and used
+        for ``qa`` only (this is how ``papyri gen --jobs`` workers report
+        back); its ``_expected_unseen`` entry for ``qa`` replaces ours.
+        """
+        for ename, qas in other._unexpected_errors.items():
+            self._unexpected_errors.setdefault(ename, []).extend(qas)
+        for ename, qas in other._expected_errors.items():
+            self._expected_errors.setdefault(ename, []).extend(qas)
+        if qa in other._expected_unseen:
+            self._expected_unseen[qa] = other._expected_unseen[qa]
+        else:
+            self._expected_unseen.pop(qa, None)
+
     def __call__(self, qa: str) -> ErrorCollector:
         self._qa = qa
         return self
@@ -0,0 +1,221 @@
+"""Persistent, content-addressed cache of executed docstring examples.
+
+Executing ``Examples`` sections (and rendering the figures they draw)
+dominates ``papyri gen`` for plotting-heavy libraries, and is usually wasted:
+most examples do not change between builds. ``ExecCache`` stores what
+``Gen.get_example_data`` produced for one object — the example section with
+each block's execution status and ``got`` output, and the figure bytes — under
+``~/.cache/papyri/exec/``, keyed by a hash of everything that can change it:
+
+- the example source, the object's qualname and the names made available to
+  it (the object itself, implied imports and ``implied_imports``),
+- the doctest option flags and the other ``Config`` fields read while
+  executing and tokenizing examples,
+- the versions of the target package and of every distribution imported
+  when the cache is opened, plus a digest of the size and modification time
+  of the target package's files (so editing a checkout invalidates it even if
+  its version string does not change).
+
+Hits refresh the entry's modification time; ``evict`` then removes the least
+recently used entries until the cache fits in ``exec_cache_size`` MiB.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import importlib.metadata
+import importlib.util
+import json
+import logging
+import os
+import pickle
+import sys
+from collections import Counter
+from hashlib import sha256
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .nodes import Section
+
+if TYPE_CHECKING:
+    from .config_loader import Config
+
+log = logging.getLogger("papyri")
+
+EXEC_CACHE_DIR = Path("~/.cache/papyri/exec/").expanduser()
+
+# Bump when the entry layout or anything feeding the key changes meaning.
+_FORMAT = 1
+
+_SOURCE_SUFFIXES = frozenset({".py", ".pyx", ".pxd", ".so", ".pyd"})
+
+
+def _imported_versions() -> list[tuple[str, str]]:
+    """``(distribution, version)`` of every top-level module imported so far."""
+    try:
+        providers = importlib.metadata.packages_distributions()
+    except Exception:
+        providers = {}
+    versions = set()
+    for name in [m for m in list(sys.modules) if "." not in m]:
+        for dist in providers.get(name, ()):
+            with contextlib.suppress(importlib.metadata.PackageNotFoundError):
+                versions.add((dist, importlib.metadata.version(dist)))
+    return sorted(versions)
+
+
+def package_digest(root: str) -> str | None:
+    """Digest of the paths, sizes and mtimes of the ``root`` package files."""
+    module = sys.modules.get(root)
+    filename = getattr(module, "__file__", None)
+    if filename is None:
+        # Not imported (e.g. by the static collector): locate it instead.
+        with contextlib.suppress(ImportError, ValueError):
+            spec = importlib.util.find_spec(root)
+            filename = None if spec is None else spec.origin
+    if filename is None:
+        return None
+    path = Path(filename)
+    if path.name.startswith("__init__."):
+        files = sorted(
+            p
+            for p in path.parent.rglob("*")
+            if p.suffix in _SOURCE_SUFFIXES and p.is_file()
+        )
+    else:
+        files = [path]
+    h = sha256()
+    for p in files:
+        st = p.stat()
+        h.update(f"{p}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
+
+class ExecCache:
+    """
+    On-disk store of executed example sections, one file per key::
+
+        <root>/<key[:2]>/<key>.pickle     (section, [(figure name, bytes), ...])
+
+    The section still holds gen-time ``GenCode`` nodes, which have no JSON
+    form; entries are pickled, like the results of example workers, and
+    keyed on the papyri version. They are written to a temporary file and
+    renamed into place, so concurrent builds (and ``--jobs`` workers) never
+    observe a partial entry.
+    ``stats`` counts the hits and misses of this process.
+    """
+
+    def __init__(self, root: Path, context: str, max_size: int) -> None:
+        self.root = root
+        self.context = context
+        self.max_size = max_size
+        self.stats: Counter[str] = Counter()
+
+    @classmethod
+    def for_bundle(cls, config: Config, *, root: str, version: str | None) -> ExecCache:
+        """
+        Open the cache for one bundle build, once the target package is
+        imported. The environment part of every key is computed once here.
+        """
+        from . import __version__
+
+        context = sha256(
+            json.dumps(
+                [
+                    _FORMAT,
+                    __version__,
+                    sys.version,
+                    root,
+                    version,
+                    _imported_versions(),
+                    package_digest(root),
+                ]
+            ).encode()
+        ).hexdigest()
+        return cls(EXEC_CACHE_DIR, context, config.exec_cache_size << 20)
+
+    def key(
+        self, example_section: list[str], *, obj: Any, qa: str, config: Config
+    ) -> str:
+        """Content hash identifying the executed examples of ``qa``."""
+        from .gen import _get_implied_imports
+
+        implied = {
+            name: f"{getattr(v, '__module__', None)}:{getattr(v, '__qualname__', None)}"
+            for name, v in _get_implied_imports(obj).items()
+        }
+        parts = [
+            self.context,
+            qa,
+            getattr(obj, "__name__", None),
+            "\n".join(example_section),
+            sorted(implied.items()),
+            sorted(config.implied_imports.items()),
+            sorted(config.doctest_optionflags),
+            config.infer and qa not in config.exclude_jedi,
+            config.wait_for_plt_show,
+            config.jedi_failure_mode,
+            config.figure_format,
+            config.figure_dpi,
+        ]
+        return sha256(json.dumps(parts).encode()).hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.pickle"
+
+    def get(self, key: str) -> tuple[Section, list[tuple[str, bytes]]] | None:
+        """Return the stored ``(section, figures)`` for ``key``, or None."""
+        entry = self._entry(key)
+        try:
+            section, figs = pickle.loads(entry.read_bytes())
+            # Mark as recently used for ``evict``.
+            os.utime(entry)
+        except FileNotFoundError:
+            self.stats["misses"] += 1
+            return None
+        except Exception as e:
+            log.debug("Discarding unreadable exec cache entry %s: %s", entry, e)
+            entry.unlink(missing_ok=True)
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return section, figs
+
+    def put(self, key: str, section: Section, figs: list[tuple[str, bytes]]) -> None:
+        entry = self._entry(key)
+        if entry.exists():
+            return
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry.parent / f".{key}.{os.getpid()}.tmp"
+        try:
+            tmp.write_bytes(pickle.dumps((section, figs)))
+            os.replace(tmp, entry)
+        except OSError as e:
+            # Lost a race with another writer, or the disk is unhappy; either
+            # way the cache is an optimisation and the build carries on.
+            log.debug("Could not store exec cache entry %s: %s", entry, e)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until the cache holds at most
+        ``max_size`` bytes; return the number of entries removed.
+        """
+        entries = []
+        total = 0
+        for entry in self.root.glob("??/*.pickle"):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, entry))
+            total += st.st_size
+        removed = 0
+        for _, size, entry in sorted(entries):
+            if total <= self.max_size:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,237 @@
+"""
+Isolated execution of docstring examples for ``papyri gen``.
+
+``ExecPool`` keeps a few long-lived worker processes, forked from the gen
+process once the target package is imported, and runs one object's example
+blocks per task in one of them. Each task gets a wall-clock limit (enforced
+with ``SIGALRM`` inside the worker, and by killing the worker from the parent
+if that is not enough) and the workers can be given an address-space limit.
+Workers are recycled after a number of tasks, after a timeout and whenever
+they die, so a hanging, leaking or segfaulting example only costs the object
+it belongs to: the caller gets an ``ExampleWorkerError`` and renders the
+examples without output.
+
+Workers are plain ``os.fork`` children talking over a ``multiprocessing``
+pipe rather than ``multiprocessing.Process``, so that a ``--jobs`` worker
+(itself a daemonic pool process) can still own an ``ExecPool``.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import pickle
+import queue
+import signal
+import time
+from collections.abc import Callable
+from multiprocessing import Pipe
+from multiprocessing.connection import Connection
+from typing import Any
+
+# Extra time the parent grants a task past its own deadline before it kills
+# the worker (e.g. an example stuck in C code that ignores SIGALRM).
+_KILL_GRACE = 5.0
+
+
+class ExampleWorkerError(RuntimeError):
+    """An example task timed out, ran out of memory or crashed its worker."""
+
+
+class UnpicklableTaskError(TypeError):
+    """A task could not be sent to a worker; nothing was run."""
+
+
+class _TaskTimeout(KeyboardInterrupt):
+    # A KeyboardInterrupt subclass so that doctest (which records every other
+    # exception as the example's outcome) lets it propagate out of the run.
+    pass
+
+
+def _raise_timeout(signum: int, frame: Any) -> None:
+    raise _TaskTimeout
+
+
+def _serve(conn: Connection, memory_limit: int | None) -> None:
+    """Worker loop: run ``(fn, args, kwargs, timeout)`` tasks until EOF."""
+    if memory_limit is not None:
+        import resource
+
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        fn, args, kwargs, timeout = task
+        reply: tuple[str, Any]
+        try:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+            try:
+                reply = ("ok", fn(*args, **kwargs))
+            finally:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        except _TaskTimeout:
+            reply = ("failed", f"timed out after {timeout:g}s")
+        except MemoryError:
+            reply = ("failed", "exceeded the memory limit")
+        except Exception as e:
+            reply = ("error", e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # Unpicklable result or exception: report it as an error instead.
+            conn.send(("error", RuntimeError(f"{reply[0]} result not picklable: {e}")))
+
+
+class _Worker:
+    def __init__(self, memory_limit: int | None) -> None:
+        parent, child = Pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - runs in the child
+            status = 0
+            try:
+                parent.close()
+                _serve(child, memory_limit)
+            except BaseException:
+                status = 1
+            finally:
+                os._exit(status)
+        child.close()
+        self.pid = pid
+        self.conn = parent
+        self.tasks = 0
+        self.exit_status: int | None = None
+
+    def stop(self) -> int:
+        """Kill the worker (if still running) and reap it; return its status."""
+        if self.exit_status is None:
+            # Siblings forked later hold a copy of our end of the pipe, so the
+            # worker would never see EOF: kill it instead.
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(self.pid, signal.SIGKILL)
+            self.conn.close()
+            self.exit_status = os.waitpid(self.pid, 0)[1]
+        return self.exit_status
+
+
+class ExecPool:
+    """
+    A pool of ``size`` forked worker processes running example tasks.
+
+    Parameters
+    ----------
+    size : int
+        Maximum number of worker processes; they are started lazily.
+    timeout : float
+        Wall-clock limit of one task, in seconds.
+    memory_limit : int | None
+        Address-space limit (``RLIMIT_AS``) of each worker, in bytes.
+    max_tasks : int
+        Number of tasks after which a worker is replaced by a fresh fork.
+    before_fork : callable, optional
+        Called before every fork, to stop the threads of the parent (forking
+        a multi-threaded process can deadlock the child).
+    """
+
+    def __init__(
+        self,
+        size: int,
+        *,
+        timeout: float,
+        memory_limit: int | None = None,
+        max_tasks: int = 100,
+        before_fork: Callable[[], None] | None = None,
+    ) -> None:
+        assert size >= 1, size
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.max_tasks = max_tasks
+        self.before_fork = before_fork
+        self._size = size
+        self._owner = os.getpid()
+        self._reset()
+
+    def _reset(self) -> None:
+        # Slots hold an idle worker, or None for one that is not started yet.
+        self._idle: queue.SimpleQueue[_Worker | None] = queue.SimpleQueue()
+        self._live: list[_Worker] = []
+        for _ in range(self._size):
+            self._idle.put(None)
+
+    def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Call ``fn(*args, **kwargs)`` in a worker and return its result.
+
+        ``fn``, its arguments and its result travel through ``pickle``;
+        ``UnpicklableTaskError`` is raised, before anything runs, if the task
+        cannot be sent. Exceptions raised by ``fn`` are re-raised here.
+        Raises ``ExampleWorkerError`` when the task times out, exhausts the
+        memory limit or kills the worker.
+        """
+        if os.getpid() != self._owner:
+            # Inherited through fork (e.g. into a ``--jobs`` worker): the
+            # workers belong to the parent, start our own.
+            self._owner = os.getpid()
+            self._reset()
+        try:
+            payload = pickle.dumps((fn, args, kwargs, self.timeout))
+        except Exception as e:
+            raise UnpicklableTaskError(str(e)) from e
+        worker = self._idle.get()
+        if worker is None:
+            if self.before_fork is not None:
+                self.before_fork()
+            worker = _Worker(self.memory_limit)
+            self._live.append(worker)
+        status = "failed"
+        try:
+            status, value = self._call(worker, payload)
+        finally:
+            worker.tasks += 1
+            if status != "failed" and worker.tasks < self.max_tasks:
+                self._idle.put(worker)
+            else:
+                self._live.remove(worker)
+                worker.stop()
+                self._idle.put(None)
+        if status == "ok":
+            return value
+        if status == "failed":
+            raise ExampleWorkerError(value)
+        raise value
+
+    def _call(self, worker: _Worker, payload: bytes) -> tuple[str, Any]:
+        worker.conn.send_bytes(payload)
+        start = time.monotonic()
+        if not worker.conn.poll(self.timeout + _KILL_GRACE):
+            raise ExampleWorkerError(
+                f"timed out after {time.monotonic() - start:.0f}s "
+                "(unresponsive worker killed)"
+            )
+        try:
+            reply: tuple[str, Any] = worker.conn.recv()
+        except (EOFError, OSError):
+            worker.conn.close()
+            worker.exit_status = os.waitpid(worker.pid, 0)[1]
+            raise ExampleWorkerError(
+                f"worker process died ({_describe_exit(worker.exit_status)})"
+            ) from None
+        return reply
+
+    def close(self) -> None:
+        """Stop every worker started by this process."""
+        if os.getpid() != self._owner:
+            return
+        for worker in self._live:
+            worker.stop()
+        self._reset()
+
+
+def _describe_exit(status: int) -> str:
+    if os.WIFSIGNALED(status):
+        sig = os.WTERMSIG(status)
+        return f"killed by {signal.Signals(sig).name}"
+    return f"exit status {os.WEXITSTATUS(status)}"
@@ -12,8 +12,8 @@ from __future__ import annotations
 
 import contextlib
 import doctest
+import importlib
 import inspect
-import io
 import json
 import logging
 
@@ -32,17 +32,20 @@ for _doctest_optname in (
 ):
     doctest.register_optionflag(_doctest_optname)
 del _doctest_optname
+import multiprocessing
 import os
 import shutil
 import site
 import sys
 import tempfile
+import time
 import traceback
 import warnings
-from collections import defaultdict, deque
-from collections.abc import Callable
-from functools import lru_cache
-from hashlib import sha256
+from collections import Counter, defaultdict, deque
+from collections.abc import Callable, Collection, Iterator
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
 from pathlib import Path
 from types import FunctionType, ModuleType, TracebackType
 from typing import (
@@ -59,8 +62,11 @@ from rich.progress import BarColumn, TextColumn
 
 log = logging.getLogger("papyri")
 
+from . import profiling
 from ._progress import TimeElapsedColumn, progress_class
+from .bundle import Bundle
 from .config_loader import Config, load_configuration
+from .directives import recording_file_reads
 from .doc import (
     GeneratedDoc,
     _first_paragraph_text,
@@ -70,18 +76,25 @@ from .doc import (
 from .error_collector import (
     W_DOCTEST_EXEC,
     W_DOCTEST_SYNTAX,
+    W_EXAMPLE_WORKER,
     W_MODULE_DOCSTRING,
     W_NUMPYDOC_PARSE,
     DiagnosticConfig,
     Diagnostics,
     ErrorCollector,
+    Severity,
 )
 from .errors import (
     IncorrectInternalDocsLen,
     NumpydocParseError,
     TextSignatureParsingFailed,
 )
-from .executors import BlockExecutor
+from .exec_cache import ExecCache
+from .exec_pool import ExampleWorkerError, ExecPool, UnpicklableTaskError
+from .executors import FIGURE_STATS, BlockExecutor, FigureEncoder
+from .gen_cache import GenCache
+from .narrative_cache import LookupRecorder, NarrativeCache
+from .node_base import Node
 from .nodes import (
     DocParam,
     DocstringSentinel,
@@ -102,9 +115,25 @@ from .nodes import (
     section_title_text,
 )
 from .numpydoc_compat import NumpyDocString
+from .pack import (
+    assemble_bundle,
+    check_staging_format,
+    decode_entry,
+    encode_entry,
+    entry_name,
+    make_artifact,
+    manifest_from_meta,
+)
 from .signature import Signature as ObjectSignature
+from .static_collector import StaticPackage, check_collector, realize, stub_info
 from .toc import make_tree
-from .tokens import _add_classes, parse_script
+from .tokens import (
+    JEDI_CACHE_PATH,
+    JEDI_CACHE_STATS,
+    JediCache,
+    stop_jedi,
+    tokenize_script,
+)
 from .tree import GenVisitor
 from .utils import (
     Canonical,
@@ -112,6 +141,7 @@ from .utils import (
     dedent_but_first,
     full_qual,
     obj_from_qualname,
+    peak_rss_mib,
     strip_clinic_signature,
 )
 
@@ -156,6 +186,9 @@ def _get_implied_imports(obj: Any) -> dict[str, Any]:
     Most examples in methods or modules needs names defined in current module,
     or name of the class they are part of.
     """
+    if stub_info(obj) is not None:
+        # Not executed: leave the module of a static stub unimported.
+        return {}
     if hasattr(obj, "__qualname__"):
         if "." not in obj.__qualname__:
             return {}
@@ -177,6 +210,13 @@ def _get_implied_imports(obj: Any) -> dict[str, Any]:
     return {}
 
 
+def _find_file(obj: Any) -> str | None:
+    """``find_file``, which also knows the source file of static stubs."""
+    if (stub := stub_info(obj)) is not None:
+        return stub.file
+    return find_file(obj)
+
+
 class _MatplotlibFontFilter(logging.Filter):
     """Silence noisy matplotlib font-fallback warnings during gen."""
 
@@ -254,6 +294,19 @@ def gen_main(
     fail_unseen_error: bool,
     limit_to: list[str],
     error_on_warning: bool = True,
+    jobs: int | None = None,
+    cache: bool | None = None,
+    exec_cache: bool | None = None,
+    jedi_cache: bool | None = None,
+    example_workers: int | None = None,
+    collector: str | None = None,
+    profile: bool = False,
+    profile_top: int = 20,
+    memory: bool = False,
+    watch: bool = False,
+    serve: str | None = None,
+    max_pending: int = 8,
+    artifact: Path | None = None,
 ) -> Path | None:
     """
     Main entry point to generate DocBundle files.
@@ -289,15 +342,64 @@ def gen_main(
         overwrite early_error option in config file
     fail_unseen_error : bool
         raise an exception if the error is unseen
+    jobs : int | None
+        CLI override of the number of worker processes used to build the API
+        docs
+    cache : bool | None
+        CLI override of whether to reuse per-object results from the
+        persistent gen cache
+    exec_cache : bool | None
+        CLI override of whether to replay executed examples from the
+        persistent exec cache
+    jedi_cache : bool | None
+        CLI override of whether to reuse type inference results from the
+        persistent Jedi cache
+    example_workers : int | None
+        CLI override of the number of isolated processes executing examples
+    collector : str | None
+        CLI override of how API objects are found, "import" or "static"
+    profile : bool
+        record wall and CPU time per phase and per object, write them to a
+        JSON report next to the bundle and log the slowest objects
+    profile_top : int
+        number of slowest objects to log with ``profile``
+    memory : bool
+        sample RSS and tracemalloc snapshots between passes and add peak,
+        growth per pass and top allocation sites to the ``profile`` report
+    watch : bool
+        after the build, keep watching the package sources and ``docs_path``
+        and regenerate the affected objects and documents into the bundle on
+        every change, until interrupted
+    serve : str | None
+        after the build, answer requests to regenerate single objects,
+        narrative files and examples on this Unix socket, until shut down
+    max_pending : int
+        number of requests ``serve`` accepts at once; further ones are
+        refused as busy
+    artifact : Path | None
+        write the ``.papyri`` artifact to this path straight from memory
+        instead of writing a DocBundle directory to pack
 
     Returns
     -------
     Path | None
-        Path to the generated DocBundle directory, or None if dry_run is True.
+        Path to the generated DocBundle directory (the artifact with
+        ``artifact``), or None if dry_run is True.
 
     """
     if limit_to is None:
         limit_to = set()
+    if (watch or serve) and dry_run:
+        raise SystemExit(
+            "papyri gen: --watch and --serve need a bundle to update; drop --dry-run."
+        )
+    if watch and serve:
+        raise SystemExit("papyri gen: --watch and --serve are mutually exclusive.")
+    if artifact is not None and (dry_run or watch or serve or limit_to):
+        raise SystemExit(
+            "papyri gen: --artifact packs a complete build; it cannot be "
+            "combined with --dry-run, --watch, --serve or --only."
+        )
     target_module_name, conf, meta = load_configuration(target_file)
 
     conf["early_error"] = fail_early
@@ -308,10 +410,22 @@ def gen_main(
         config.execute_doctests = exec_
     if infer is not None:
         config.infer = infer
+    if jobs is not None:
+        config.jobs = jobs
+    if cache is not None:
+        config.cache = cache
+    if exec_cache is not None:
+        config.exec_cache = exec_cache
+    if jedi_cache is not None:
+        config.jedi_cache = jedi_cache
+    if example_workers is not None:
+        config.example_workers = example_workers
+    if collector is not None:
+        config.collector = collector
 
     target_dir = Path("~/.papyri/data").expanduser()
 
-    if not target_dir.exists() and not config.dry_run:
+    if not target_dir.exists() and not config.dry_run and artifact is None:
         target_dir.mkdir(parents=True, exist_ok=True)
     if dry_run:
         temp_dir = tempfile.TemporaryDirectory()
@@ -323,40 +437,112 @@ def gen_main(
         g.log.setLevel(logging.DEBUG)
         g.log.debug("Log level set to debug")
 
-    g.collect_package_metadata(
-        target_module_name,
-        relative_dir=Path(target_file).parent,
-        meta=meta,
-    )
-
-    g.log.info("Target package is %s-%s", target_module_name, g.version)
-    g.log.info("Will write data to %s", target_dir)
-
-    if examples:
-        g.collect_examples_out()
-    if api:
-        g.collect_api_docs(target_module_name, limit_to=limit_to)
-    if narrative:
-        g.collect_narrative_docs()
-
-    p: Path = target_dir / (g.root + "_" + g.version)
-    if not limit_to and p.exists():
-        g.log.info("Removing previous bundle at %s", p)
-        shutil.rmtree(p)
-    p.mkdir(exist_ok=True)
-
-    g.log.info("Saving current Doc bundle to %s", p)
-    if not limit_to:
-        g.write(p)
-    else:
-        g.partial_write(p)
+    if profile:
+        g.object_phases = {}
+    g.memory = profiling.MemoryTracker(enabled=memory)
+    start = time.perf_counter_ns()
+    stats_before = _snapshot_stats()
+    with profiling.phase("other"):
+        g.collect_package_metadata(
+            target_module_name,
+            relative_dir=Path(target_file).parent,
+            meta=meta,
+        )
+        g.memory.sample("import")
+
+        g.log.info("Target package is %s-%s", target_module_name, g.version)
+        p: Path = target_dir / (g.root + "_" + g.version)
+        if artifact is not None:
+            # Everything stays in memory until packed.
+            p = artifact
+            g.log.info("Will write the artifact to %s", p)
+        else:
+            g.log.info("Will write data to %s", target_dir)
+            if not limit_to and p.exists():
+                g.log.info("Removing previous bundle at %s", p)
+                shutil.rmtree(p)
+            p.mkdir(exist_ok=True)
+            g.stream_to(p)
+
+        if examples:
+            with g.counting_stats():
+                g.collect_examples_out()
+            g.memory.sample("examples")
+        if api:
+            g.collect_api_docs(target_module_name, limit_to=limit_to)
+            g.memory.sample("api")
+        if narrative:
+            g.collect_narrative_docs()
+            g.memory.sample("narrative")
+
+        if artifact is not None:
+            g.write_artifact(p)
+        elif not limit_to:
+            g.log.info("Saving current Doc bundle to %s", p)
+            g.write(p)
+        else:
+            g.log.info("Saving current Doc bundle to %s", p)
+            g.partial_write(p)
+        g.memory.sample("write")
+        jedi_evicted = 0 if watch or serve else g.close_jedi_cache()
+    if profile or memory:
+        if artifact is not None:
+            report_path = artifact.with_suffix(".profile.json")
+        else:
+            report_path = target_dir / f"{p.name}.profile.json"
+        _report_profile(
+            g,
+            _stats_since(stats_before)["phases"],
+            wall_ns=time.perf_counter_ns() - start,
+            top=profile_top,
+            where=None if dry_run else report_path,
+        )
     if dry_run:
         temp_dir.cleanup()
         return None
 
+    rss = peak_rss_mib()
+    g.log.info(
+        "Wrote %d API documents; peak RSS %s",
+        g._streamed + len(g.data),
+        "unknown" if rss is None else f"{rss:.1f} MiB",
+    )
+    stats = g.stats["figures"]
+    if stats["figures"]:
+        g.log.info(
+            "Encoded %d figure(s) (%d distinct) as %s, %.1f MiB: "
+            "%.2fs rendering, %.2fs encoding in the background",
+            stats["figures"],
+            stats["encoded"],
+            config.figure_format,
+            stats["bytes"] / 2**20,
+            stats["render_ns"] / 1e9,
+            stats["encode_ns"] / 1e9,
+        )
+    stats = g.stats["jedi_cache"]
+    if stats:
+        lookups = stats["hits"] + stats["misses"]
+        g.log.info(
+            "Jedi cache (%s): %d/%d hit(s) (%.0f%%), %d evicted",
+            JEDI_CACHE_PATH,
+            stats["hits"],
+            lookups,
+            100 * stats["hits"] / lookups,
+            jedi_evicted,
+        )
     summary = g.diagnostics.summary()
     if summary:
         g.log.info("Diagnostics: %s", summary)
+    if watch:
+        from .watch import watch as watch_bundle
+
+        watch_bundle(g, p, api=api, narrative=narrative)
+        return p
+    if serve:
+        from .serve import GenServer
+
+        GenServer(g, p, max_pending=max_pending).serve(Path(serve))
+        return p
     # The bundle is written to disk before we gate on diagnostics, so an
     # error-severity diagnostic still leaves the (degraded) bundle available
     # for inspection while signalling failure to CI.
@@ -369,6 +555,39 @@ def gen_main(
     return p
 
 
+def _report_profile(
+    g: Gen,
+    phases: dict[str, int],
+    *,
+    wall_ns: int,
+    top: int,
+    where: Path | None,
+) -> None:
+    """
+    Log the ``--profile``/``--memory`` tables and write the JSON report to
+    ``where``.
+    """
+    report = profiling.build_report(
+        phases,
+        g.object_phases or {},
+        wall_ns=wall_ns,
+        package=g.root,
+        version=g.version,
+        jobs=g.config.jobs,
+        # Spent on the encoder threads, alongside the phases above.
+        figure_encoding_s=round(g.stats["figures"]["encode_ns"] / 1e9, 6),
+        memory=g.memory.stop(),
+    )
+    g.log.info(
+        "Profile, %.2fs wall clock (phase times are summed over worker processes):\n%s",
+        report["wall_s"],
+        profiling.format_report(report, top),
+    )
+    if where is not None:
+        where.write_text(json.dumps(report, indent=2))
+        g.log.info("Wrote profile report to %s", where)
+
+
 class DFSCollector:
     """
     Depth first search collector.
@@ -381,7 +600,9 @@ class DFSCollector:
 
     """
 
-    def __init__(self, root: ModuleType, others: list[ModuleType]):
+    def __init__(
+        self, root: ModuleType, others: list[ModuleType], *, scan_root: bool = True
+    ):
         """
         Parameters
         ----------
@@ -394,14 +615,23 @@ class DFSCollector:
             Typically this is because some packages do not import some
             submodules by default, so we need to pass these submodules
             explicitly.
+        scan_root
+            If False, only start from ``others``; ``root`` then only bounds
+            the scan to its package.
         """
 
         assert isinstance(root, ModuleType), root
         self.root = root.__name__
         assert "." not in self.root
         self.obj: dict[str, Any] = dict()
+        # id(obj) -> qa for everything in ``self.obj``: "already collected?"
+        # is an identity lookup, not a scan calling arbitrary ``__eq__``.
+        # ``self.obj`` keeps those objects alive, so their ids stay unique.
+        self._collected: dict[int, str] = dict()
         self.aliases: dict[str, list[str]] = defaultdict(lambda: [])
-        self._open_list: deque[tuple[Any, list[str]]] = deque([(root, [root.__name__])])
+        self._open_list: deque[tuple[Any, list[str]]] = deque(
+            [(root, [root.__name__])] if scan_root else []
+        )
         for o in others:
             self._open_list.append((o, o.__name__.split(".")))
         self.log = logging.getLogger("papyri")
@@ -410,13 +640,15 @@ class DFSCollector:
         """
         Attempt to find all objects.
         """
-        seen: set[int] = set()
+        # Values are kept alive so that an attribute created on access (and
+        # dropped right after) cannot free its id for a different object.
+        seen: dict[int, Any] = {}
         while self._open_list:
             current, stack = self._open_list.popleft()
 
             # numpy objects have no bool values.
             if id(current) not in seen:
-                seen.add(id(current))
+                seen[id(current)] = current
                 self.visit(current, stack)
 
     def prune(self) -> None:
@@ -430,16 +662,17 @@ class DFSCollector:
         in order to extract the canonical import name (visible to users),
         and to resolve references.
         """
-        for qa, item in self.obj.items():
+        for qa, item in list(self.obj.items()):
             if (nqa := full_qual(item)) != qa:
                 log.debug("after import qa differs: %s -> %s", qa, nqa)
                 assert isinstance(nqa, str)
-                if self.obj[nqa] == item:
+                if self.obj.get(nqa) is item:
                     log.debug("present twice")
                     del self.obj[nqa]
                 else:
                     log.debug("differs: %r != %r", item, self.obj.get(nqa))
 
+    @profiling.phase("collect")
     def items(self) -> dict[str, Any]:
         self.scan()
         self.prune()
@@ -474,12 +707,14 @@ class DFSCollector:
 
         if oroot != self.root:
             return
-        if obj in self.obj.values():
+        if id(obj) in self._collected:
             return
-        if (qa in self.obj) and self.obj[qa] != obj:
-            pass
+        if (previous := self.obj.get(qa)) is not None:
+            # A different object under the same name replaces the earlier one.
+            del self._collected[id(previous)]
 
         self.obj[qa] = obj
+        self._collected[id(obj)] = qa
         self.aliases[qa].append(".".join(stack))
 
         if isinstance(obj, ModuleType):
@@ -511,6 +746,7 @@ class DFSCollector:
     def visit_FunctionType(self, fun: Any, stack: list[str]) -> None:
         pass
 
+    @profiling.phase("collect")
     def compute_aliases(
         self,
     ) -> tuple[dict[FullQual, Canonical], list[tuple[str, list[str]]]]:
@@ -546,6 +782,45 @@ _numpydoc_sections_with_text = {
 }
 
 
+# Docstring parses performed in this process, per parser: "numpydoc" for
+# whole docstrings, "ts" for tree-sitter parses of module docstrings and
+# numpydoc text sections. Each object's docstring should be parsed once;
+# ``Gen.parse_counts`` aggregates them across ``--jobs`` workers.
+PARSE_COUNTS: Counter[str] = Counter()
+
+# Other per-process counters, by kind; ``Gen.stats`` aggregates them across
+# ``--jobs`` and example workers.
+_PROCESS_STATS: dict[str, Counter[str]] = {
+    "figures": FIGURE_STATS,
+    "jedi_cache": JEDI_CACHE_STATS,
+    "phases": profiling.PHASE_STATS,
+}
+
+
+def _snapshot_stats() -> dict[str, Counter[str]]:
+    profiling.checkpoint()
+    return {kind: counter.copy() for kind, counter in _PROCESS_STATS.items()}
+
+
+def _stats_since(before: dict[str, Counter[str]]) -> dict[str, dict[str, int]]:
+    """Increments of ``_PROCESS_STATS`` since ``before`` was snapshotted."""
+    profiling.checkpoint()
+    return {
+        kind: dict(counter - before[kind]) for kind, counter in _PROCESS_STATS.items()
+    }
+
+
+@profiling.phase("numpydoc")
+def _numpydoc_parse(docstring: str) -> NumpyDocString:
+    PARSE_COUNTS["numpydoc"] += 1
+    return NumpyDocString(dedent_but_first(docstring))
+
+
+def _ts_parse(text: str, qa: str) -> list[Section]:
+    PARSE_COUNTS["ts"] += 1
+    return ts.parse(text.encode(), qa)
+
+
 class APIObjectInfo:
     """
     Describes the object's type and other relevant information
@@ -575,6 +850,11 @@ class APIObjectInfo:
         self.name = name
         self.docstring = docstring
         self.parsed: list[Any] = []
+        # The numpydoc parse of ``docstring`` and the sections built from it
+        # (by numpydoc title), reused by ``Gen.prepare_doc_for_one_object``
+        # so that each docstring goes through the parsers only once.
+        self.ndoc: NumpyDocString | None = None
+        self.sections: dict[str, Section] = {}
         self.signature = signature
         self._qa = qa
 
@@ -582,9 +862,10 @@ class APIObjectInfo:
             # TS is going to choke on this as See Also and other
             # sections are technically invalid.
             try:
-                ndoc = NumpyDocString(dedent_but_first(docstring))
+                ndoc = _numpydoc_parse(docstring)
             except Exception as e:
                 raise NumpydocParseError("APIObjectInfoParse Error in numpydoc") from e
+            self.ndoc = ndoc
 
             for title in ndoc.ordered_sections:
                 if not ndoc[title]:
@@ -593,9 +874,10 @@ class APIObjectInfo:
                     section = _numpy_data_to_section(ndoc[title], title, self._qa)
                     assert isinstance(section, Section)
                     self.parsed.append(section)
+                    self.sections[title] = section
                 elif title in _numpydoc_sections_with_text:
                     predoc = "\n".join(ndoc[title])
-                    docs = ts.parse(predoc.encode(), qa)
+                    docs = _ts_parse(predoc, qa)
                     if len(docs) != 1:
                         # TODO
                         # potential reasons
@@ -605,6 +887,7 @@ class APIObjectInfo:
                     section = docs[0]
                     assert isinstance(section, Section), section
                     self.parsed.append(section)
+                    self.sections[title] = section
                 elif title == "Signature":
                     self.parsed.append(NumpydocSignature(ndoc[title]))
                 elif title == "Examples":
@@ -616,7 +899,7 @@ class APIObjectInfo:
                 else:
                     raise AssertionError
         elif docstring and kind == "module":
-            self.parsed = ts.parse(docstring.encode(), qa)
+            self.parsed = _ts_parse(docstring, qa)
         self.validate()
 
     def special(self, title: str) -> Any:
@@ -667,26 +950,21 @@ class PapyriDocTestRunner(doctest.DocTestRunner):
         for k, v in config.implied_imports.items():
             self.globs[k] = obj_from_qualname(v)
 
-        self.figs: list[tuple[str, bytes]] = []
+        # (asset name, future of the encoded figure), see ``FigureEncoder``.
+        self.figs: list[tuple[str, Future[bytes]]] = []
 
     def _get_tok_entries(self, example: Any) -> list[GenToken]:
-        entries = parse_script(
-            example.source, ns=self.globs, prev="", config=self.config, where=self.qa
+        entries = tokenize_script(
+            example.source,
+            ns=self.globs,
+            prev="",
+            config=self.config,
+            where=self.qa,
+            cache=self.gen.jedi_cache(),
         )
         if entries is None:
-            entries = [("jedi failed", "jedi failed")]
-        tok_entries = [GenToken(*x) for x in _add_classes(entries)]
-        return tok_entries
-
-    def _figure_name(self, data: bytes) -> str:
-        """
-        Content-addressed asset filename. Identical figure bytes — across
-        examples, qualnames, or rebuilds — collapse to the same key, so the
-        blob store dedupes naturally and the version diff doesn't churn on
-        non-deterministic matplotlib output. The qualname is dropped from
-        the name on purpose: it would only desync from content.
-        """
-        return f"fig-{sha256(data).hexdigest()[:16]}.png"
+            entries = [("jedi failed", "jedi failed", "")]
+        return [GenToken(*x) for x in entries]
 
     def report_start(self, out: Any, test: Any, example: Any) -> None:
         pass
@@ -704,11 +982,8 @@ class PapyriDocTestRunner(doctest.DocTestRunner):
         fig_managers = _pylab_helpers.Gcf.get_all_fig_managers()
         figs = []
         if fig_managers and (("plt.show" in example.source) or not wait_for_show):
-            for fig in fig_managers:
-                buf = io.BytesIO()
-                fig.canvas.figure.savefig(buf, dpi=300)  # , bbox_inches="tight"
-                data = buf.getvalue()
-                figs.append((self._figure_name(data), data))
+            encoder = self.gen.figure_encoder()
+            figs = [encoder.submit(fig.canvas.figure) for fig in fig_managers]
             plt.close("all")
 
         for figname, _ in figs:
@@ -826,6 +1101,8 @@ class Gen:
 
         self.config = config
         self.log.debug("Configuration: %s", self.config)
+        check_staging_format(config.staging_format)
+        check_collector(config.collector)
 
         # Gen-time diagnostics: coded, severity-resolved observations emitted
         # from gen/tree. Built once from the project's [global.diagnostics]
@@ -836,11 +1113,37 @@ class Gen:
 
         self.data = {}
         self.bdata = {}
+        # Bundle directory API documents and assets are streamed to as soon as
+        # they are ``put``; None keeps them in ``data``/``bdata`` until ``write``.
+        self._bundle_dir: Path | None = None
+        self._streamed = 0
+        # Docstring parses per parser for the API docs, see PARSE_COUNTS.
+        self.parse_counts: Counter[str] = Counter()
+        # Isolated example workers, started on first use (``example_workers``).
+        self._exec_pool: ExecPool | None = None
+        # Executed examples replayed from / stored to disk (``exec_cache``),
+        # opened by ``collect_api_docs``; hits and misses across workers.
+        self._exec_cache: ExecCache | None = None
+        self.exec_cache_stats: Counter[str] = Counter()
+        # Figure encoding and Jedi results store, started on first use.
+        self._figure_encoder: FigureEncoder | None = None
+        self._jedi_cache: JediCache | None = None
+        # ``_PROCESS_STATS`` increments for this build, across workers.
+        self.stats: defaultdict[str, Counter[str]] = defaultdict(Counter)
+        # Per-object ``PHASE_STATS`` increments, kept for ``--profile``.
+        self.object_phases: dict[str, dict[str, int]] | None = None
+        # Memory samples between passes, taken with ``--memory``.
+        self.memory = profiling.MemoryTracker(enabled=False)
+        # Objects to document, crawled by the first ``collect_api_docs``.
+        self._collection: _Collection | None = None
+        # The parsed sources of the package, with ``collector = "static"``.
+        self._static_package: StaticPackage | None = None
         self._meta: dict[str, Any] = {}
         self.examples = {}
         self.docs = {}
         self._toc_nodes: list[TocTree] = []
 
+    @profiling.phase("exec")
     def get_example_data(
         self,
         example_section: Any,
@@ -960,6 +1263,14 @@ class Gen:
             sys_stdout.write(" ".join(str(x) for x in args) + "\n")
 
         blocks = doctest.DocTestParser().parse(example_code, name=qa)
+        jedi_cache = self.jedi_cache() if config.infer else None
+        if jedi_cache is not None:
+            # Examples are inferred against their namespace, see
+            # ``PapyriDocTestRunner._get_tok_entries``.
+            jedi_cache.prefetch(
+                (b.source for b in blocks if isinstance(b, doctest.Example)),
+                interpreter=True,
+            )
         for block in blocks:
             if isinstance(block, doctest.Example):
                 doctests = doctest.DocTest(
@@ -997,7 +1308,241 @@ class Gen:
         if len(fig_managers) != 0:
             plt.close("all")
 
-        return processed_example_data(example_section_data), doctest_runner.figs
+        if jedi_cache is not None:
+            jedi_cache.flush()
+        # Figures were encoded in the background while later examples ran.
+        figs = [(name, future.result()) for name, future in doctest_runner.figs]
+        return processed_example_data(example_section_data), figs
+
+    def _run_examples(
+        self, example_section: Any, *, obj: Any, qa: str, config: Config
+    ) -> tuple[Section, list[Any]]:
+        """
+        ``get_example_data``, replayed from the exec cache when the examples
+        were already executed in an identical environment, and executed in an
+        isolated example worker when ``example_workers`` is set.
+
+        If the worker times out, runs out of memory or crashes, a
+        ``W-example-worker`` diagnostic is emitted and the examples are
+        rendered without executing them (and are not cached). Objects or
+        results that cannot be pickled run in-process as before.
+        """
+        cache = self._exec_cache if config.execute_doctests else None
+        key = None
+        if cache is not None:
+            key = cache.key(list(example_section), obj=obj, qa=qa, config=config)
+            hit = cache.get(key)
+            if hit is not None:
+                return hit
+        try:
+            result = self._execute_examples(
+                example_section, obj=obj, qa=qa, config=config
+            )
+        except ExampleWorkerError as e:
+            self.diagnostics.emit(
+                W_EXAMPLE_WORKER, qa, f"examples were not executed: {e}"
+            )
+            return self.get_example_data(
+                example_section,
+                obj=obj,
+                qa=qa,
+                config=config.replace(execute_doctests=False),
+                log=self.log,
+            )
+        if cache is not None and key is not None:
+            cache.put(key, *result)
+        return result
+
+    def _execute_examples(
+        self, example_section: Any, *, obj: Any, qa: str, config: Config
+    ) -> tuple[Section, list[Any]]:
+        if config.example_workers < 1 or not config.execute_doctests:
+            return self.get_example_data(
+                example_section, obj=obj, qa=qa, config=config, log=self.log
+            )
+        global _EXAMPLE_GEN
+        if self._exec_pool is None:
+            memory_limit = config.example_memory_limit
+            self._exec_pool = ExecPool(
+                config.example_workers,
+                timeout=config.example_timeout,
+                memory_limit=None if memory_limit is None else memory_limit << 20,
+                max_tasks=config.example_worker_max_tasks,
+                before_fork=self._stop_threads,
+            )
+        # Workers are forked on demand and find this Gen here.
+        _EXAMPLE_GEN = self
+        try:
+            section, figs, stats = self._exec_pool.run(
+                _example_task, list(example_section), obj=obj, qa=qa, config=config
+            )
+            # Count the worker's figures, Jedi lookups and time as our own.
+            for kind, increments in stats.items():
+                if kind == "phases":
+                    profiling.absorb(increments)
+                else:
+                    _PROCESS_STATS[kind].update(increments)
+            return section, figs
+        except UnpicklableTaskError as e:
+            self.log.debug("Running examples of %s in-process: %s", qa, e)
+            return self.get_example_data(
+                example_section, obj=obj, qa=qa, config=config, log=self.log
+            )
+
+    def _stop_threads(self) -> None:
+        """
+        Stop our helper threads and the Jedi subprocess before forking; they
+        restart on use.
+        """
+        if self._figure_encoder is not None:
+            self._figure_encoder.shutdown()
+        stop_jedi()
+
+    def figure_encoder(self) -> FigureEncoder:
+        """The encoder for captured figures (``figure_format``/``figure_dpi``)."""
+        if self._figure_encoder is None:
+            self._figure_encoder = FigureEncoder(
+                self.config.figure_format, self.config.figure_dpi
+            )
+        return self._figure_encoder
+
+    def jedi_cache(self) -> JediCache | None:
+        """The persistent store of Jedi results, or None if disabled."""
+        if not self.config.jedi_cache or self.config.dry_run:
+            return None
+        if self._jedi_cache is None:
+            self._jedi_cache = JediCache.for_bundle(
+                self.root, self.version, self.config.jedi_cache_size << 20
+            )
+        return self._jedi_cache
+
+    def close_jedi_cache(self) -> int:
+        """Evict and close the Jedi store; return the number of evicted entries."""
+        if self._jedi_cache is None:
+            return 0
+        evicted = self._jedi_cache.evict()
+        self._jedi_cache.close()
+        self._jedi_cache = None
+        return evicted
+
+    def _add_stats(self, stats: dict[str, dict[str, int]]) -> None:
+        for kind, increments in stats.items():
+            self.stats[kind].update(increments)
+
+    @contextlib.contextmanager
+    def counting_stats(self) -> Iterator[None]:
+        """Add the work this process does in the block to ``stats``."""
+        before = _snapshot_stats()
+        try:
+            yield
+        finally:
+            self._add_stats(_stats_since(before))
+
+    def _fork_jobs(self, what: str) -> int:
+        """Number of ``--jobs`` workers to fork for ``what``; 1 if unsupported."""
+        jobs = self.config.jobs
+        if jobs > 1 and "fork" not in multiprocessing.get_all_start_methods():
+            self.log.warning(
+                "--jobs requires the 'fork' start method, which is not available "
+                "on this platform; %s serially.",
+                what,
+            )
+            return 1
+        return jobs
+
+    @contextlib.contextmanager
+    def _narrative_pool(self, jobs: int) -> Iterator[Any]:
+        """A forked pool of ``jobs`` workers, or None to work in-process."""
+        if jobs <= 1:
+            yield None
+            return
+        self._stop_threads()
+        with multiprocessing.get_context("fork").Pool(jobs) as pool:
+            yield pool
+
+    @profiling.phase("visit")
+    def _visit_narrative(
+        self,
+        p: Path,
+        key: str,
+        data: list[Section],
+        *,
+        doc_root: Path,
+        doc_targets: dict[str, str],
+        external_targets: dict[str, str],
+        doc_titles: dict[str, str],
+    ) -> _NarrativeResult:
+        """
+        Visit one parsed narrative document with fresh asset storage and
+        diagnostics, and return everything it produced instead of leaving it
+        in ``self``, along with the files and labels it depends on.
+        """
+        saved = self.bdata, self.diagnostics, self._bundle_dir
+        self.bdata, self._bundle_dir = {}, None
+        self.diagnostics = Diagnostics(saved[1].config, self.log)
+        stats_before = _snapshot_stats()
+        result = _NarrativeResult(assets=self.bdata, stats={})
+        lookups = {
+            "doc_targets": LookupRecorder(doc_targets),
+            "external_targets": LookupRecorder(external_targets),
+            "doc_titles": LookupRecorder(doc_titles),
+        }
+        try:
+            blob = GeneratedDoc.new()
+            try:
+                dv = GenVisitor(
+                    key,
+                    frozenset(),
+                    local_refs=set(),
+                    aliases={},
+                    version=self._meta["version"],
+                    config=self.config.directives,
+                    module=self._meta.get("module"),
+                    doc_path=p.parent,
+                    asset_store=self.put_raw,
+                    doc_root=doc_root,
+                    execute=self.config.execute_doctests,
+                    diagnostics=self.diagnostics,
+                    github_slug=self._meta.get("github_slug"),
+                    figure_encoder=self.figure_encoder(),
+                    **lookups,
+                )
+                with recording_file_reads() as reads:
+                    dv.collect_substitutions(*data)
+                    blob.arbitrary = tuple(dv.visit(s) for s in data)
+                blob.item_file = None
+                blob.item_line = None
+                blob.item_type = None
+                blob.aliases = ()
+                blob.example_section_data = Section([], ())
+                blob.see_also = ()
+                blob.signature = None
+                blob.validate()
+            except Exception as e:
+                if self.config.early_error:
+                    raise
+                result.warning = f"Could not process {p}, skipping: {e}"
+            else:
+                titles = [
+                    section_title_text(s.title) for s in blob.arbitrary if s.title
+                ]
+                result.title = f"<No Title {key}>" if not titles else titles[0]
+                result.tocs = dv._tocs
+                result.doc = encode_entry(blob, self.config.staging_format)
+                result.reads = reads
+                result.lookups = {k: v.seen for k, v in lookups.items()}
+            result.diagnostics = self.diagnostics.records
+            result.diagnostic_counts = self.diagnostics.counts
+            result.stats = _stats_since(stats_before)
+            return result
+        finally:
+            self.bdata, self.diagnostics, self._bundle_dir = saved
+
+    def close_exec_pool(self) -> None:
+        """Stop the example workers, if any were started."""
+        if self._exec_pool is not None:
+            self._exec_pool.close()
+            self._exec_pool = None
 
     @staticmethod
     def _extract_rst_targets(
@@ -1029,6 +1574,14 @@ class Gen:
         """
         Crawl the filesystem for all docs/rst files
 
+        Both passes (parsing every file, then visiting every document once
+        the targets of all of them are known) are spread over ``--jobs``
+        forked workers. Results are folded back in file order, so the bundle
+        and the warnings are the same as in a serial build.
+
+        With ``cache`` enabled, files are only parsed again if they changed,
+        and documents are only visited again if they, a file they read, or a
+        label they resolved changed (see ``narrative_cache``).
         """
         if not self.config.docs_path:
             return
@@ -1039,126 +1592,166 @@ class Gen:
             )
             return
         self.log.info("Scraping Documentation")
-        files = list(path.glob("**/*.rst"))
+        # The visitor rewrites parsed trees in place; unchanged files that
+        # need a new visit must be parsed afresh.
+        ts._parse_cached.cache_clear()
+        files = [
+            p
+            for p in path.glob("**/*.rst")
+            if not any([k in str(p) for k in self.config.narrative_exclude])
+        ]
+        jobs = self._fork_jobs("building narrative docs") if len(files) > 1 else 1
         trees = {}
         title_map = {}
-        blbs = {}
+        cache: NarrativeCache | None = None
+        if self.config.cache and not self.config.dry_run:
+            cache = NarrativeCache.for_docs(
+                self.config,
+                docs_root=path,
+                module=self._meta.get("module"),
+                version=self._meta.get("version"),
+                github_slug=self._meta.get("github_slug"),
+            )
+        rels = {p: p.relative_to(path).as_posix() for p in files}
 
         # First pass: parse every RST file and collect targets so that
         # :ref:`label` can resolve across documents in the same bundle.
         # doc_targets maps each RST label to the doc key that defines it.
         # doc_titles maps each doc key to its first heading so toctree
         # entries can render document titles instead of raw paths.
-        parsed_files: list[tuple[Path, str, list[Section]]] = []
+        parsed_files: list[tuple[Path, str, list[Section] | None]] = []
         doc_targets: dict[str, str] = {}
         external_targets: dict[str, str] = {}
         doc_titles: dict[str, str] = {}
-        for p in files:
-            if any([k in str(p) for k in self.config.narrative_exclude]):
-                continue
-            assert p.is_file()
-            parts = p.relative_to(path).parts
-            assert parts[-1].endswith("rst")
-            try:
-                data = ts.parse(p.read_bytes(), str(p))
-            except ts.TreeSitterParseError as e:
-                self.log.warning("Could not parse %s:%d, skipping: %s", p, e.line, e)
-                continue
-            except Exception as e:
-                self.log.warning("Could not parse %s, skipping: %s", p, e)
-                continue
-            key = ":".join(parts)[:-4]
-            first_title = next(
-                (section_title_text(s.title) for s in data if s.title), None
+        known: dict[Path, _NarrativeParse] = {}
+        if cache is not None:
+            for p in files:
+                if (hit := cache.parsed(rels[p], p)) is not None:
+                    known[p] = _NarrativeParse(p, data=None, **hit)
+        todo = [p for p in files if p not in known]
+        parse = partial(_parse_narrative, path)
+        with self._narrative_pool(jobs) as pool:
+            fresh = iter(
+                pool.imap(parse, todo, chunksize=max(1, len(todo) // (jobs * 4)))
+                if pool
+                else map(parse, todo)
             )
-            if first_title:
-                doc_titles[key] = first_title
-            internal_labels, doc_external = self._extract_rst_targets(data)
-            for label in internal_labels:
-                if label in doc_targets:
-                    self.log.warning(
-                        "Duplicate RST target %r in %s (already defined in %s)",
-                        label,
-                        key,
-                        doc_targets[label],
-                    )
-                else:
-                    doc_targets[label] = key
-            for label, url in doc_external.items():
-                # External hyperlink targets are global across the bundle and
-                # the same label may legitimately be redefined per-doc. Last
-                # writer wins, with a debug log so collisions are traceable.
-                if label in external_targets and external_targets[label] != url:
-                    self.log.debug(
-                        "External RST target %r redefined in %s (was %s, now %s)",
-                        label,
-                        key,
-                        external_targets[label],
-                        url,
-                    )
-                external_targets[label] = url
-            parsed_files.append((p, key, data))
+            for p in files:
+                if (item := known.get(p)) is None:
+                    item = next(fresh)
+                    if pool:
+                        profiling.absorb(item.stats.get("phases", {}))
+                    if cache is not None:
+                        cache.store_parsed(rels[p], p, item.summary())
+                if item.warning is not None:
+                    self.log.warning("%s", item.warning)
+                    continue
+                key = item.key
+                if item.title:
+                    doc_titles[key] = item.title
+                for label in item.internal_labels:
+                    if label in doc_targets:
+                        self.log.warning(
+                            "Duplicate RST target %r in %s (already defined in %s)",
+                            label,
+                            key,
+                            doc_targets[label],
+                        )
+                    else:
+                        doc_targets[label] = key
+                for label, url in item.external_targets.items():
+                    # External hyperlink targets are global across the bundle
+                    # and the same label may legitimately be redefined per-doc.
+                    # Last writer wins, with a debug log so collisions are
+                    # traceable.
+                    if label in external_targets and external_targets[label] != url:
+                        self.log.debug(
+                            "External RST target %r redefined in %s (was %s, now %s)",
+                            label,
+                            key,
+                            external_targets[label],
+                            url,
+                        )
+                    external_targets[label] = url
+                parsed_files.append((item.path, key, item.data))
 
         # Second pass: visit each document with the full target map available.
-        with self.progress() as p2:
-            task = p2.add_task("Parsing narrative", total=len(parsed_files))
-
-            for p, key, data in parsed_files:
-                p2.update(task, description=compress_user(str(p)).ljust(7))
-                p2.advance(task)
-
-                blob = GeneratedDoc.new()
-                try:
-                    dv = GenVisitor(
-                        key,
-                        frozenset(),
-                        local_refs=set(),
-                        aliases={},
-                        version=self._meta["version"],
-                        config=self.config.directives,
-                        module=self._meta.get("module"),
-                        doc_path=p.parent,
-                        asset_store=self.put_raw,
-                        doc_root=path,
-                        doc_targets=doc_targets,
-                        external_targets=external_targets,
-                        doc_titles=doc_titles,
-                        execute=self.config.execute_doctests,
-                        diagnostics=self.diagnostics,
-                        github_slug=self._meta.get("github_slug"),
-                    )
-                    dv.collect_substitutions(*data)
-                    blob.arbitrary = tuple(dv.visit(s) for s in data)
-                    blob.item_file = None
-                    blob.item_line = None
-                    blob.item_type = None
-                    blob.aliases = ()
-                    blob.example_section_data = Section([], ())
-                    blob.see_also = ()
-                    blob.signature = None
-                    blob.validate()
-                except Exception as e:
-                    if self.config.early_error:
-                        raise
-                    self.log.warning("Could not process %s, skipping: %s", p, e)
-                    continue
-                # Only register the toctree references after the doc validates
-                # — otherwise a failed doc can still seed `trees` with itself
-                # as a root (no fallback elsewhere can recover the missing
-                # entry, so the rendered toc loses everything reachable only
-                # from that root, including the doc itself).
-                trees[key] = dv._tocs
-                titles = [
-                    section_title_text(s.title) for s in blob.arbitrary if s.title
-                ]
-                title = f"<No Title {key}>" if not titles else titles[0]
-                title_map[key] = title
-                if "generated" not in key and title_map[key] is None:
-                    log.debug("%s %s", key, title)
+        global _NARRATIVE_STATE
 
-                blbs[key] = blob
-        for k, b in blbs.items():
-            self.docs[k] = b.to_json()
+        kwargs: dict[str, Any] = {
+            "doc_root": path,
+            "doc_targets": doc_targets,
+            "external_targets": external_targets,
+            "doc_titles": doc_titles,
+        }
+        # The workers inherit the parsed documents and the merged target maps
+        # through fork; only indices travel to them.
+        reused: dict[int, _NarrativeResult] = {}
+        if cache is not None:
+            for i, (p, _, _) in enumerate(parsed_files):
+                if (hit := cache.result(rels[p], p, kwargs)) is not None:
+                    reused[i] = _NarrativeResult(stats={}, **hit)
+        _NARRATIVE_STATE = (self, parsed_files, kwargs)
+        try:
+            # Fork before the progress bar starts its refresh thread.
+            with self._narrative_pool(jobs) as pool, self.progress() as p2:
+                task = p2.add_task("Parsing narrative", total=len(parsed_files))
+                indices = [i for i in range(len(parsed_files)) if i not in reused]
+                results = iter(
+                    pool.imap(
+                        _narrative_visit_worker,
+                        indices,
+                        chunksize=max(1, len(indices) // (jobs * 4)),
+                    )
+                    if pool
+                    else map(_narrative_visit_worker, indices)
+                )
+                for i, (p, key, _) in enumerate(parsed_files):
+                    if (result := reused.get(i)) is None:
+                        result = next(results)
+                        if pool:
+                            profiling.absorb(result.stats.get("phases", {}))
+                        if cache is not None:
+                            cache.rebuilt += 1
+                        if cache is not None and result.doc is not None:
+                            cache.store_result(
+                                rels[p],
+                                reads=result.reads,
+                                lookups=result.lookups,
+                                doc=result.doc,
+                                assets=result.assets,
+                                title=result.title,
+                                tocs=result.tocs,
+                                diagnostics=result.diagnostics,
+                                diagnostic_counts=result.diagnostic_counts,
+                            )
+                    p2.update(task, description=compress_user(str(p)).ljust(7))
+                    p2.advance(task)
+                    self._add_stats(result.stats)
+                    self.diagnostics.absorb(
+                        result.diagnostics, result.diagnostic_counts
+                    )
+                    for name, data in result.assets.items():
+                        self.put_raw(name, data)
+                    if result.doc is None:
+                        self.log.warning("%s", result.warning)
+                        continue
+                    # Only register the toctree references after the doc
+                    # validates — otherwise a failed doc can still seed `trees`
+                    # with itself as a root (no fallback elsewhere can recover
+                    # the missing entry, so the rendered toc loses everything
+                    # reachable only from that root, including the doc itself).
+                    trees[key] = result.tocs
+                    title_map[key] = result.title
+                    if "generated" not in key and title_map[key] is None:
+                        log.debug("%s %s", key, result.title)
+
+                    self.docs[key] = result.doc
+        finally:
+            _NARRATIVE_STATE = None
+        if cache is not None:
+            cache.save()
+            self.log.info("Narrative docs cache (%s): %s", cache.root, cache.summary())
 
         root, raw_tree = make_tree(trees)
 
@@ -1197,14 +1790,33 @@ class Gen:
             )
         (where / "docs").mkdir(exist_ok=True)
         for file, v in self.docs.items():
-            subf = where / "docs"
-            subf.mkdir(exist_ok=True, parents=True)
-            (subf / file).write_bytes(v)
+            self.bundle_entry(where, "docs", file).write_bytes(v)
+
+    def rewrite_narrative(self, where: Path) -> None:
+        """
+        Collect the narrative docs again and rewrite them into the DocBundle
+        folder ``where``, removing the documents whose source is gone.
+        """
+        self.docs = {}
+        self.collect_narrative_docs()
+        docs = where / "docs"
+        if docs.is_dir():
+            keep = {self.bundle_entry(where, "docs", key) for key in self.docs}
+            for stale in [f for f in docs.iterdir() if f not in keep]:
+                stale.unlink()
+        self.write_narrative(where)
+
+    def bundle_entry(self, where: Path, kind: str, key: str) -> Path:
+        """
+        Path of the entry ``key`` of the ``kind`` directory (``module``,
+        ``docs`` or ``examples``) of the DocBundle folder ``where``.
+        """
+        return where / kind / entry_name(kind, key, self.config.staging_format)
 
     def write_examples(self, where: Path) -> None:
         (where / "examples").mkdir(exist_ok=True)
         for k, v in self.examples.items():
-            (where / "examples" / k).write_bytes(v)
+            self.bundle_entry(where, "examples", k).write_bytes(v)
 
     def write_api(self, where: Path) -> None:
         """
@@ -1212,11 +1824,15 @@ class Gen:
         """
         (where / "module").mkdir(exist_ok=True)
         for k, v in self.data.items():
-            (where / "module" / (k + ".json")).write_bytes(v.to_json())
+            self.bundle_entry(where, "module", k).write_bytes(
+                encode_entry(v, self.config.staging_format)
+            )
 
+    @profiling.phase("write")
     def partial_write(self, where: Path) -> None:
         self.write_api(where)
 
+    @profiling.phase("write")
     def write(self, where: Path) -> None:
         """
         Write a DocBundle folder.
@@ -1226,11 +1842,63 @@ class Gen:
         self.write_examples(where)
         self.write_assets(where)
         with (where / "papyri.json").open("w") as f:
-            assert "version" in self._meta
-            meta = dict(self._meta)
-            if self.diagnostics.records:
-                meta["diagnostics"] = self.diagnostics.records
-            f.write(json.dumps(meta, indent=2, sort_keys=True))
+            f.write(json.dumps(self.bundle_meta(), indent=2, sort_keys=True))
+
+    def bundle_meta(self) -> dict[str, Any]:
+        """
+        Content of the ``papyri.json`` manifest of the DocBundle.
+        """
+        assert "version" in self._meta
+        meta = dict(self._meta)
+        if self.config.staging_format != "json":
+            meta["staging_format"] = self.config.staging_format
+        if self.diagnostics.records:
+            meta["diagnostics"] = self.diagnostics.records
+        return meta
+
+    def to_bundle(self) -> Bundle:
+        """
+        The ``Bundle`` that packing the DocBundle folder ``write`` would
+        produce, built from memory and validated the same way.
+
+        Only valid when nothing was streamed to disk (see ``stream_to``).
+        """
+        assert self._bundle_dir is None, "API docs were streamed to disk"
+        fmt = self.config.staging_format
+
+        def decoded(kind: str, type_: type[Node], entries: dict[str, bytes]) -> Any:
+            return {
+                k: decode_entry(entries[k], type_, fmt, f"{kind}/{k}")
+                for k in sorted(entries)
+            }
+
+        # Through JSON, as papyri.json would be read back.
+        meta = json.loads(json.dumps(self.bundle_meta()))
+        return assemble_bundle(
+            manifest_from_meta(meta),
+            api={k: self.data[k] for k in sorted(self.data)},
+            narrative=decoded("docs", GeneratedDoc, self.docs),
+            examples=decoded("examples", Section, self.examples),
+            assets=dict(sorted(self.bdata.items())),
+            toc=tuple(self._toc_nodes),
+        )
+
+    @profiling.phase("pack")
+    def write_artifact(self, path: Path) -> None:
+        """
+        Write the ``.papyri`` artifact of the package to ``path`` without
+        going through a DocBundle folder; byte-identical to ``write``
+        followed by ``papyri pack``.
+        """
+        start = time.perf_counter()
+        data = make_artifact(self.to_bundle())
+        path.write_bytes(data)
+        self.log.info(
+            "Wrote artifact %s (%.1f MiB) in %.2fs",
+            path,
+            len(data) / 2**20,
+            time.perf_counter() - start,
+        )
 
     def write_assets(self, where: Path) -> None:
         assets = where / "assets"
@@ -1238,17 +1906,42 @@ class Gen:
         for k, v in self.bdata.items():
             (assets / k).write_bytes(v)
 
+    def stream_to(self, where: Path) -> None:
+        """
+        Write every API document and asset ``put`` from now on directly into
+        the DocBundle folder ``where`` instead of keeping it in memory until
+        ``write``.
+
+        Only the bundle metadata (``papyri.json``, aliases, narrative docs
+        and examples) is still held until the end, so peak memory no longer
+        grows with the number of objects and figures in the package.
+        """
+        (where / "module").mkdir(exist_ok=True)
+        (where / "assets").mkdir(exist_ok=True)
+        self._bundle_dir = where
+
+    @profiling.phase("write")
     def put(self, path: str, obj: Any) -> None:
         """
         put some json data at the given path
         """
-        self.data[path] = obj
+        if self._bundle_dir is None:
+            self.data[path] = obj
+        else:
+            self.bundle_entry(self._bundle_dir, "module", path).write_bytes(
+                encode_entry(obj, self.config.staging_format)
+            )
+            self._streamed += 1
 
+    @profiling.phase("write")
     def put_raw(self, path: str, data: bytes) -> None:
         """
         put some binary data at the given path.
         """
-        self.bdata[path] = data
+        if self._bundle_dir is None:
+            self.bdata[path] = data
+        else:
+            (self._bundle_dir / "assets" / path).write_bytes(data)
 
     def _populate_content(self, blob: GeneratedDoc, ndoc: Any) -> GeneratedDoc:
         """
@@ -1269,7 +1962,7 @@ class Gen:
         for GeneratedDoc.
         """
         # will not work for dev install. Maybe an option to set the root location ?
-        item_file: str | None = find_file(target_item)
+        item_file: str | None = _find_file(target_item)
         if item_file is not None and item_file.endswith("<string>"):
             # dynamically generated object (like dataclass __eq__ method
             item_file = None
@@ -1318,7 +2011,10 @@ class Gen:
         """
         item_line = None
         try:
-            item_line = inspect.getsourcelines(target_item)[1]
+            if (stub := stub_info(target_item)) is not None:
+                item_line = stub.line
+            else:
+                item_line = inspect.getsourcelines(target_item)[1]
         except OSError:
             self.log.debug("Could not find item_line for %s, (OSERROR)", target_item)
         except TypeError:
@@ -1430,12 +2126,14 @@ class Gen:
             # warnings this is true only for non-modules
             # things.
             try:
-                example_section_data, figs = self.get_example_data(
+                example_section_data, figs = self._run_examples(
                     api_object.special("Examples").value,
-                    obj=target_item,
+                    # Executing needs the real object, not a static stub.
+                    obj=realize(target_item)
+                    if config.execute_doctests
+                    else target_item,
                     qa=qa,
                     config=config,
-                    log=self.log,
                 )
             except Exception as e:
                 example_section_data = Section([], ())
@@ -1493,8 +2191,10 @@ class Gen:
                 elif not data:
                     # is empty
                     blob.content[section] = Section([], ())
+                elif section in api_object.sections:
+                    blob.content[section] = api_object.sections[section]
                 else:
-                    tsc = ts.parse("\n".join(data).encode(), qa)
+                    tsc = _ts_parse("\n".join(data), qa)
                     assert len(tsc) in (0, 1), (tsc, data)
                     tssc = tsc[0] if tsc else Section([], ())
                     assert isinstance(tssc, Section)
@@ -1521,6 +2221,10 @@ class Gen:
 
         for s in set(sections_).intersection(blob.content.keys()):
             assert isinstance(blob.content[s], list), f"{s}, {blob.content[s]} {qa} "
+            if s in api_object.sections:
+                # Same DocParams, without the title carried by APIObjectInfo.
+                blob.content[s] = Section(api_object.sections[s].children, ())
+                continue
             new_content = []
 
             for param, type_, desc in blob.content[s]:
@@ -1548,7 +2252,9 @@ class Gen:
         )
         return blob, figs
 
-    def collect_examples(self, folder: Path, config: Config) -> list[Any]:
+    def collect_examples(
+        self, folder: Path, config: Config, names: Collection[str] | None = None
+    ) -> list[Any]:
         acc = []
         examples = list(folder.glob("**/*.py"))
 
@@ -1556,6 +2262,8 @@ class Gen:
         for e in examples:
             if any(str(e).endswith(p) for p in config.examples_exclude):
                 continue
+            if names is not None and e.name not in names:
+                continue
             valid_examples.append(e)
         examples = valid_examples
 
@@ -1580,10 +2288,7 @@ class Gen:
                     with executor:
                         try:
                             executor.exec(script, name=str(example))
-                            figs = [
-                                (f"fig-{sha256(f).hexdigest()[:16]}.png", f)
-                                for f in executor.get_figs()
-                            ]
+                            figs = executor.get_figs(self.figure_encoder())
                             ce_status = "execed"
                         except Exception as e:
                             failed.append(str(example))
@@ -1595,28 +2300,20 @@ class Gen:
                                 )
                             else:
                                 raise type(e)(f"Within {example}") from e
-                entries_p = parse_script(
+                entries = tokenize_script(
                     script,
                     ns={},
                     prev="",
                     config=config,
+                    cache=self.jedi_cache(),
                 )
-
-                entries: list[Any]
-                if entries_p is None:
+                if entries is None:
                     self.diagnostics.emit(
                         W_DOCTEST_SYNTAX,
                         str(example),
                         "example block could not be parsed into tokens",
                     )
-                    entries = [("fail", "fail")]
-                else:
-                    entries = list(entries_p)
-
-                assert isinstance(entries, list), entries
-
-                entries = _add_classes(entries)
-                assert set(len(x) for x in entries) == {3}
+                    entries = [("fail", "fail", "")]
 
                 tok_entries = [GenToken(*x) for x in entries]
                 l: list[Any] = []  # get typechecker to shut up.
@@ -1646,8 +2343,9 @@ class Gen:
                     diagnostics=self.diagnostics,
                     github_slug=self._meta.get("github_slug"),
                 )
-                dv.collect_substitutions(s)
-                s2 = dv.visit(s)
+                with profiling.phase("visit"):
+                    dv.collect_substitutions(s)
+                    s2 = dv.visit(s)
 
                 acc.append(
                     (
@@ -1658,6 +2356,7 @@ class Gen:
         assert len(failed) == 0, failed
         return acc
 
+    @profiling.phase("collect")
     def _get_collector(self) -> DFSCollector:
         """
         Construct a depth first search collector that will try to find all
@@ -1666,11 +2365,16 @@ class Gen:
         We give it the root module, and a few submodules as seed.
         """
         assert "." not in self.root
-        n0 = __import__(self.root)
-        submodules = []
-
         subs = self.config.submodules
         extra_from_conf = [self.root + "." + s for s in subs]
+        if self.config.collector == "static":
+            if self._static_package is None:
+                self._static_package = self._parse_package(self.root)
+            n0, *submodules = self._static_package.load([self.root, *extra_from_conf])
+            return DFSCollector(n0, submodules)
+
+        n0 = __import__(self.root)
+        submodules = []
         for name in extra_from_conf:
             _, *r = name.split(".")
             nx = __import__(name)
@@ -1685,7 +2389,22 @@ class Gen:
         )
         return DFSCollector(n0, submodules)
 
-    def collect_examples_out(self) -> None:
+    def _parse_package(self, root: str) -> StaticPackage:
+        start = time.perf_counter()
+        package = StaticPackage.parse(root, jobs=self._fork_jobs("parsing sources"))
+        self.log.info(
+            "Parsed %d modules of %s without importing them in %.2fs",
+            len(package.files),
+            root,
+            time.perf_counter() - start,
+        )
+        return package
+
+    def collect_examples_out(self, names: Collection[str] | None = None) -> None:
+        """
+        Execute and collect the examples of ``examples_folder``, or only those
+        whose file name is in ``names``.
+        """
         examples_folder = self.config.examples_folder
         self.log.debug("Example Folder: %s", examples_folder)
         if examples_folder is not None:
@@ -1693,9 +2412,15 @@ class Gen:
             examples_data = self.collect_examples(
                 examples_path,
                 config=self.config,
+                names=names,
             )
             for edoc, figs in examples_data:
-                self.examples.update({k: v.to_json() for k, v in edoc.items()})
+                self.examples.update(
+                    {
+                        k: encode_entry(v, self.config.staging_format)
+                        for k, v in edoc.items()
+                    }
+                )
                 for name, data in figs:
                     self.put_raw(name, data)
 
@@ -1769,9 +2494,16 @@ class Gen:
             return None, [], api_object
         elif item_docstring is None and isinstance(target_item, ModuleType):
             item_docstring = """This module has no documentation"""
+        elif not isinstance(target_item, ModuleType):
+            # Only module docstrings are rendered as free-form sections; other
+            # objects are fully described by their numpydoc sections, which
+            # APIObjectInfo has already parsed.
+            return item_docstring, [], api_object
+        elif api_object.parsed:
+            return item_docstring, api_object.parsed, api_object
 
         try:
-            sections = ts.parse(item_docstring.encode(), qa)
+            sections = _ts_parse(item_docstring, qa)
         except (AssertionError, NotImplementedError) as e:
             self.log.error("TS could not parse %s, %s", repr(qa), e)
             raise type(e)(f"from {qa}") from e
@@ -1782,6 +2514,7 @@ class Gen:
         assert api_object is not None
         return item_docstring, sections, api_object
 
+    @profiling.phase("collect")
     def collect_package_metadata(
         self, root: str, relative_dir: Path, meta: dict[str, Any]
     ) -> None:
@@ -1796,12 +2529,18 @@ class Gen:
             logo = logo_path.name
         else:
             logo = None
-        module = __import__(root)
         # Prefer the module's own __version__ when available; fall back to
         # installed-distribution metadata for projects that stopped exposing
         # it (e.g. xarray). Distribution name may differ from the import
         # name, so allow callers to override via [meta].pypi.
-        version = getattr(module, "__version__", None)
+        if self.config.collector == "static":
+            self._static_package = self._parse_package(root)
+            version = self._static_package.constant(root, "__version__")
+            if not isinstance(version, str):
+                version = None
+        else:
+            module = __import__(root)
+            version = getattr(module, "__version__", None)
         if version is None:
             from importlib.metadata import PackageNotFoundError
             from importlib.metadata import version as _dist_version
@@ -1842,6 +2581,156 @@ class Gen:
 
         """
 
+        # The visitor rewrites parsed trees in place (resolving ``.. plot::``
+        # into figures among others); a rebuild must parse afresh.
+        ts._parse_cached.cache_clear()
+        collection = self._collected(root)
+        collected = collection.objects
+
+        if limit_to:
+            non_existinsing = [k for k in limit_to if k not in collected]
+            if non_existinsing:
+                self.log.warning(
+                    "You asked to build docs only for following items,"
+                    " but they don't exist:\n %s, existing items are %s",
+                    non_existinsing,
+                    collected.keys(),
+                )
+            collected = {k: v for k, v in collected.items() if k in limit_to}
+            self.log.info("DEV: regenerating docs only for")
+            for k, v in collected.items():
+                self.log.info(f"    {k}:{v}")
+
+        aliases = collection.aliases
+        rev_aliases = collection.rev_aliases
+        known_refs = collection.known_refs
+
+        error_collector = ErrorCollector(self.config, self.log)
+        # with self.progress() as p2:
+        # just nice display of progression.
+        # taskp = p2.add_task(description="parsing", total=len(collected))
+
+        failure_collection: dict[str, list[str]] = defaultdict(lambda: [])
+        kwargs: dict[str, Any] = {
+            "collector_aliases": collection.collector.aliases,
+            "known_refs": known_refs,
+            "rev_aliases": rev_aliases,
+        }
+
+        cache: GenCache | None = None
+        keys: dict[str, str] = {}
+        todo = collected
+        if self.config.cache and not self.config.dry_run:
+            cache = GenCache.for_bundle(
+                self.config,
+                root=root,
+                version=self.version,
+                qualnames=list(collection.objects),
+                aliases=collection.collector.aliases,
+            )
+            keys = {qa: cache.key(qa, item) for qa, item in collected.items()}
+            todo = {qa: v for qa, v in collected.items() if not cache.has(keys[qa])}
+            cache.misses += len(todo)
+        if self.config.exec_cache and not self.config.dry_run:
+            self._exec_cache = ExecCache.for_bundle(
+                self.config, root=root, version=self.version
+            )
+
+        jobs = self._fork_jobs("collecting API docs")
+        fresh: Iterator[_ApiDocResult]
+        remote = jobs > 1 and len(todo) > 1
+        if remote:
+            fresh = self._collect_api_docs_parallel(todo, jobs=jobs, **kwargs)
+        else:
+            fresh = (
+                self._capture_one_api_doc(qa, target_item, **kwargs)
+                for qa, target_item in todo.items()
+            )
+        # Fold results back one at a time, in qualname order, so cached,
+        # serial and ``--jobs`` builds produce the same bundle and a streaming
+        # ``Gen`` never holds more than one finished object.
+        try:
+            for qa, target_item in collected.items():
+                hit = None
+                if qa not in todo:
+                    assert cache is not None
+                    hit = cache.get(keys[qa])
+                if hit is not None:
+                    errors = ErrorCollector(self.config, self.log)
+                    result = _ApiDocResult(qa=qa, errors=errors, **hit)
+                else:
+                    if qa in todo:
+                        result = next(fresh)
+                        assert result.qa == qa, (result.qa, qa)
+                        if remote:
+                            profiling.absorb(result.stats.get("phases", {}))
+                    else:
+                        # The entry became unreadable since ``has``; rebuild it.
+                        result = self._capture_one_api_doc(qa, target_item, **kwargs)
+                    if cache is not None and result.cacheable:
+                        assert result.doc is not None
+                        cache.put(
+                            keys[qa],
+                            doc=result.doc,
+                            assets=result.assets,
+                            diagnostics=result.diagnostics,
+                            diagnostic_counts=result.diagnostic_counts,
+                            failures=result.failures,
+                        )
+                self._apply_api_doc_result(result, error_collector, failure_collection)
+        finally:
+            self.close_exec_pool()
+        if cache is not None:
+            self.log.info("API docs cache (%s): %s", cache.root, cache.summary())
+        if self._exec_cache is not None:
+            hits = self.exec_cache_stats["hits"]
+            misses = self.exec_cache_stats["misses"]
+            evicted = self._exec_cache.evict()
+            self.log.info(
+                "Examples cache (%s): %d/%d hit(s), %d miss(es), %d evicted",
+                self._exec_cache.root,
+                hits,
+                hits + misses,
+                misses,
+                evicted,
+            )
+            self._exec_cache = None
+        self.log.info(
+            "Parsed %d docstrings with numpydoc and %d text blocks with "
+            "tree-sitter for %d objects",
+            self.parse_counts["numpydoc"],
+            self.parse_counts["ts"],
+            len(collected),
+        )
+        if error_collector._unexpected_errors:
+            self.log.info(
+                "ERRORS:"
+                + tomli_w.dumps(error_collector._unexpected_errors).replace(
+                    ",", ",    \n"
+                )
+            )
+        if error_collector._expected_unseen:
+            inverted = defaultdict(lambda: [])
+            for qa, errs in error_collector._expected_unseen.items():
+                for err in errs:
+                    inverted[err].append(qa)
+            self.log.info("UNSEEN ERRORS:" + tomli_w.dumps(inverted))
+        if failure_collection:
+            self.log.info(
+                "The following parsing failed \n%s",
+                json.dumps(failure_collection, indent=2, sort_keys=True),
+            )
+        self._meta.update(
+            {
+                "aliases": aliases,
+            }
+        )
+
+    def _collect_objects(self, root: str) -> _Collection:
+        """
+        Import and crawl ``root`` for the objects to document, minus the
+        configured exclusions, and work out how they refer to each other.
+        """
         collector: DFSCollector = self._get_collector()
         collected: dict[str, Any] = collector.items()
 
@@ -1863,164 +2752,369 @@ class Gen:
 
         collected = {k: v for k, v in collected.items() if k not in excluded}
 
-        if limit_to:
-            non_existinsing = [k for k in limit_to if k not in collected]
-            if non_existinsing:
-                self.log.warning(
-                    "You asked to build docs only for following items,"
-                    " but they don't exist:\n %s, existing items are %s",
-                    non_existinsing,
-                    collected.keys(),
-                )
-            collected = {k: v for k, v in collected.items() if k in limit_to}
-            self.log.info("DEV: regenerating docs only for")
-            for k, v in collected.items():
-                self.log.info(f"    {k}:{v}")
-
         aliases: dict[FullQual, Canonical]
         aliases, _not_found = collector.compute_aliases()
-        rev_aliases: dict[Canonical, FullQual] = {v: k for k, v in aliases.items()}
+        self.memory.sample("collect")
+        return _Collection(
+            collector=collector,
+            objects=collected,
+            aliases=aliases,
+            rev_aliases={v: k for k, v in aliases.items()},
+            known_refs=self._known_refs(root, collected),
+        )
 
-        known_refs = frozenset(
+    def _known_refs(self, root: str, collected: dict[str, Any]) -> frozenset[RefInfo]:
+        return frozenset(
             {
                 RefInfo.from_untrusted(root, self.version, "module", qa)
                 for qa in collected
             }
         )
 
-        error_collector = ErrorCollector(self.config, self.log)
-        # with self.progress() as p2:
-        # just nice display of progression.
-        # taskp = p2.add_task(description="parsing", total=len(collected))
+    def _collected(self, root: str) -> _Collection:
+        if self._collection is None:
+            self._collection = self._collect_objects(root)
+        return self._collection
 
-        failure_collection: dict[str, list[str]] = defaultdict(lambda: [])
+    def api_objects(self) -> dict[str, Any]:
+        """
+        The objects of the package ``collect_api_docs`` documents, by
+        qualname; collected on first use and kept for the life of this Gen.
+        """
+        return self._collected(self.root).objects
+
+    def reload_modules(self, names: list[str]) -> tuple[list[str], list[str]]:
+        """
+        Re-import (with the static collector, re-parse) the modules ``names``
+        of the package and collect their objects again, leaving the rest of
+        the collection as it is.
+
+        Returns the qualnames defined in those modules, which need to be
+        documented again, and the qualnames that no longer exist. If one of
+        them fails to import, the previous versions of all of them are put
+        back in ``sys.modules`` and the error is raised.
+        """
+        assert self._collection is not None, "collect_api_docs was never run"
+        collection = self._collection
+        fresh: dict[str, Any] = {}
+        if self.config.collector == "static":
+            # Parsing is cheap: parse the package again, crawl the new stubs.
+            self._static_package = self._parse_package(self.root)
+            fresh.update(
+                (qa, obj)
+                for qa, obj in self._get_collector().items().items()
+                if qa.partition(":")[0] in names and qa not in self.config.exclude
+            )
+        else:
+            importlib.invalidate_caches()
+            # A fresh import rather than importlib.reload, which executes the
+            # new source over the old namespace and keeps removed names.
+            previous = {name: sys.modules.pop(name, None) for name in names}
+            try:
+                modules = [importlib.import_module(name) for name in names]
+            except BaseException:
+                # Keep the versions the collection was built from, until the
+                # next save fixes the error.
+                for name, old in previous.items():
+                    if old is None:
+                        sys.modules.pop(name, None)
+                    else:
+                        sys.modules[name] = old
+                raise
+            package = sys.modules[self.root]
+            for name, module in zip(names, modules, strict=True):
+                collector = DFSCollector(package, [module], scan_root=False)
+                fresh.update(
+                    (qa, obj)
+                    for qa, obj in collector.items().items()
+                    if qa.partition(":")[0] == name and qa not in self.config.exclude
+                )
+        gone = [
+            qa
+            for qa in collection.objects
+            if qa.partition(":")[0] in names and qa not in fresh
+        ]
+        for qa in gone:
+            del collection.objects[qa]
+        collection.objects.update(fresh)
+        collection.known_refs = self._known_refs(self.root, collection.objects)
+        if self._jedi_cache is not None:
+            # Its context digests the package files; reopen it on next use.
+            self._jedi_cache.close()
+            self._jedi_cache = None
+        return list(fresh), gone
+
+    def _collect_api_docs_parallel(
+        self,
+        collected: dict[str, Any],
+        *,
+        jobs: int,
+        collector_aliases: dict[str, list[str]],
+        known_refs: frozenset[RefInfo],
+        rev_aliases: dict[Canonical, FullQual],
+    ) -> Iterator[_ApiDocResult]:
+        """
+        Run ``_capture_one_api_doc`` for every collected object across
+        ``jobs`` forked worker processes.
+
+        The target package is already imported and collected at this point, so
+        the workers inherit it (and every other piece of ``Gen`` state) through
+        ``fork`` instead of re-importing it; only shards of qualnames travel to
+        the workers. Results are yielded in the original qualname order so the
+        bundle, its assets and its diagnostics are identical to a serial run.
+        """
+        global _FORK_STATE
+
+        qas = list(collected)
+        # A few shards per worker keeps the pool busy when some objects (e.g.
+        # ones with plotting examples) are much slower than others.
+        size = max(1, len(qas) // (jobs * 4))
+        shards = [qas[i : i + size] for i in range(0, len(qas), size)]
+        self.log.info(
+            "Collecting API docs for %d objects with %d worker processes",
+            len(qas),
+            jobs,
+        )
+        self._stop_threads()
+        _FORK_STATE = (
+            self,
+            collected,
+            {
+                "collector_aliases": collector_aliases,
+                "known_refs": known_refs,
+                "rev_aliases": rev_aliases,
+            },
+        )
+        try:
+            with multiprocessing.get_context("fork").Pool(jobs) as pool:
+                for results in pool.imap(_api_docs_worker, shards):
+                    yield from results
+        finally:
+            _FORK_STATE = None
+
+    def _capture_one_api_doc(
+        self,
+        qa: str,
+        target_item: Any,
+        *,
+        collector_aliases: dict[str, list[str]],
+        known_refs: frozenset[RefInfo],
+        rev_aliases: dict[Canonical, FullQual],
+    ) -> _ApiDocResult:
+        """
+        Run ``_collect_one_api_doc`` for a single object with fresh bundle
+        storage, diagnostics and error bookkeeping, and return everything it
+        produced instead of leaving it in ``self``.
+        """
+        saved = self.data, self.bdata, self.diagnostics, self._bundle_dir
+        self.data, self.bdata, self._bundle_dir = {}, {}, None
+        self.diagnostics = Diagnostics(saved[2].config, self.log)
+        errors = ErrorCollector(self.config, self.log)
+        failures: dict[str, list[str]] = defaultdict(list)
+        parses_before = PARSE_COUNTS.copy()
+        exec_stats = self._exec_cache.stats if self._exec_cache else Counter()
+        exec_before = exec_stats.copy()
+        stats_before = _snapshot_stats()
+        try:
+            self._collect_one_api_doc(
+                qa,
+                target_item,
+                collector_aliases=collector_aliases[qa],
+                known_refs=known_refs,
+                rev_aliases=rev_aliases,
+                error_collector=errors,
+                failure_collection=failures,
+            )
+            return _ApiDocResult(
+                qa=qa,
+                doc=self.data.get(qa),
+                assets=self.bdata,
+                diagnostics=self.diagnostics.records,
+                diagnostic_counts=self.diagnostics.counts,
+                failures=dict(failures),
+                errors=errors,
+                parses=dict(PARSE_COUNTS - parses_before),
+                exec_cache=dict(exec_stats - exec_before),
+                stats=_stats_since(stats_before),
+            )
+        finally:
+            self.data, self.bdata, self.diagnostics, self._bundle_dir = saved
+
+    def _apply_api_doc_result(
+        self,
+        result: _ApiDocResult,
+        error_collector: ErrorCollector,
+        failure_collection: dict[str, list[str]],
+    ) -> None:
+        """Fold one ``_ApiDocResult`` back into this ``Gen``."""
+        error_collector.merge(result.errors, result.qa)
+        self.parse_counts.update(result.parses)
+        self.exec_cache_stats.update(result.exec_cache)
+        self._add_stats(result.stats)
+        if self.object_phases is not None and "phases" in result.stats:
+            self.object_phases[result.qa] = result.stats["phases"]
+        for kind, qas in result.failures.items():
+            failure_collection[kind].extend(qas)
+        self.diagnostics.absorb(result.diagnostics, result.diagnostic_counts)
+        if result.doc is not None:
+            if result.qa == self.root:
+                summary_section = result.doc._content.get("Summary")
+                if summary_section is not None:
+                    blurb = _first_paragraph_text(summary_section)
+                    if blurb:
+                        self._meta["summary"] = blurb
+            self.put(result.qa, result.doc)
+        for name, data in result.assets.items():
+            self.put_raw(name, data)
+
+    def _collect_one_api_doc(
+        self,
+        qa: str,
+        target_item: Any,
+        *,
+        collector_aliases: list[str],
+        known_refs: frozenset[RefInfo],
+        rev_aliases: dict[Canonical, FullQual],
+        error_collector: ErrorCollector,
+        failure_collection: dict[str, list[str]],
+    ) -> None:
+        """
+        Extract, parse, execute and visit the documentation of one object, and
+        ``put`` the resulting ``GeneratedDoc`` (and its assets) into the bundle.
+
+        Errors are routed to ``error_collector`` and ``failure_collection``;
+        an object that fails is skipped rather than aborting the build, unless
+        ``early_error`` is set.
+        """
         api_object: APIObjectInfo
-        for qa, target_item in collected.items():
-            self.log.debug("treating %r", qa)
+        self.log.debug("treating %r", qa)
 
-            with error_collector(qa=qa) as ecollector:
-                item_docstring, arbitrary, api_object = self.extract_docstring(
-                    qa=qa,
-                    target_item=target_item,
+        with error_collector(qa=qa) as ecollector:
+            item_docstring, arbitrary, api_object = self.extract_docstring(
+                qa=qa,
+                target_item=target_item,
+            )
+            self.log.debug("APIOBJECT %r", api_object)
+        if ecollector.errored:
+            if ecollector._unexpected_errors.keys():
+                self.log.warning(
+                    "error with %s %s",
+                    qa,
+                    list(ecollector._unexpected_errors.keys()),
                 )
-                self.log.debug("APIOBJECT %r", api_object)
-            if ecollector.errored:
-                if ecollector._unexpected_errors.keys():
-                    self.log.warning(
-                        "error with %s %s",
-                        qa,
-                        list(ecollector._unexpected_errors.keys()),
-                    )
-                else:
-                    self.log.info(
-                        "only expected error with %s, %s",
-                        qa,
-                        list(ecollector._expected_errors.keys()),
-                    )
-                continue
+            else:
+                self.log.info(
+                    "only expected error with %s, %s",
+                    qa,
+                    list(ecollector._expected_errors.keys()),
+                )
+            return
 
-            module_docstring_parse_failed = False
-            try:
-                if item_docstring is None:
-                    ndoc = NumpyDocString(dedent_but_first("No Docstrings"))
-                else:
-                    ndoc = NumpyDocString(dedent_but_first(item_docstring))
-                    # note currently in ndoc we use:
-                    # _parsed_data
-                    # direct access to  ["See Also"], and [""]
-                    # and :
-                    # ndoc.ordered_sections
-            except Exception as e:
-                if not isinstance(target_item, ModuleType):
-                    self.log.debug(
-                        "numpydoc failed to parse %s - %s",
-                        qa,
-                        target_item.__name__,
-                        exc_info=True,
-                    )
-                    self.diagnostics.emit(
-                        W_NUMPYDOC_PARSE,
-                        qa,
-                        f"numpydoc could not parse docstring ({type(e).__name__}: {e})",
-                    )
-                    failure_collection["NumpydocError-" + str(type(e))].append(qa)
-                if isinstance(target_item, ModuleType):
-                    # Module docstrings that numpydoc cannot parse fall
-                    # through to the same empty shell we use when a module
-                    # has no docstring at all. Previously the placeholder
-                    # read ``"To remove in the future -- <qa>"`` which
-                    # leaked into the rendered output.
-                    self.diagnostics.emit(
-                        W_MODULE_DOCSTRING,
-                        qa,
-                        f"numpydoc could not parse module docstring "
-                        f"({type(e).__name__}: {e})",
-                    )
-                    failure_collection["module_docstring_parse_failure"].append(qa)
-                    module_docstring_parse_failed = True
-                    ndoc = NumpyDocString(dedent_but_first("No Docstrings"))
-                else:
-                    continue
+        module_docstring_parse_failed = False
+        try:
+            if api_object.ndoc is not None:
+                ndoc = api_object.ndoc
+            elif item_docstring is None:
+                ndoc = NumpyDocString(dedent_but_first("No Docstrings"))
+            else:
+                ndoc = _numpydoc_parse(item_docstring)
+                # note currently in ndoc we use:
+                # _parsed_data
+                # direct access to  ["See Also"], and [""]
+                # and :
+                # ndoc.ordered_sections
+        except Exception as e:
             if not isinstance(target_item, ModuleType):
-                arbitrary = []
-            ex = self.config.execute_doctests
-            if self.config.execute_doctests and any(
-                qa.startswith(pat) for pat in self.config.execute_exclude_patterns
-            ):
-                ex = False
-
-            # TODO: ndoc-placeholder : make sure ndoc placeholder handled here.
-            with error_collector(qa=qa) as c:
-                doc_blob, figs = self.prepare_doc_for_one_object(
-                    target_item,
-                    ndoc,
-                    qa=qa,
-                    config=self.config.replace(execute_doctests=ex),
-                    aliases=collector.aliases[qa],
-                    api_object=api_object,
+                self.log.debug(
+                    "numpydoc failed to parse %s - %s",
+                    qa,
+                    target_item.__name__,
+                    exc_info=True,
                 )
-            del api_object
-            if c.errored:
-                continue
-            _local_refs: list[str] = []
-
-            sections_ = [
-                "Parameters",
-                "Returns",
-                "Raises",
-                "Yields",
-                "Attributes",
-                "Other Parameters",
-                "Warns",
-                ##"Warnings",
-                "Methods",
-                # "Summary",
-                "Receives",
-            ]
-            for s in sections_:
-                for child in doc_blob.content.get(s, []):
-                    if isinstance(child, Parameters):
-                        for param in child.children:
-                            new_ref = [u.strip() for u in param[0].split(",") if u]
-                            if new_ref:
-                                _local_refs.extend(new_ref)
-
-            for lr1 in _local_refs:
-                assert isinstance(lr1, str)
-            lr: frozenset[str] = frozenset(_local_refs)
-            doc_blob.local_refs = tuple(sorted(lr))
-            try:
-                _src_file = find_file(target_item)
-                _doc_path = (
-                    Path(_src_file).parent
-                    if _src_file and not _src_file.endswith("<string>")
-                    else None
+                self.diagnostics.emit(
+                    W_NUMPYDOC_PARSE,
+                    qa,
+                    f"numpydoc could not parse docstring ({type(e).__name__}: {e})",
                 )
-                _param_names: frozenset[str] = (
-                    frozenset(p.name for p in doc_blob.signature.parameters)
-                    if doc_blob.signature is not None
-                    else frozenset()
+                failure_collection["NumpydocError-" + str(type(e))].append(qa)
+            if isinstance(target_item, ModuleType):
+                # Module docstrings that numpydoc cannot parse fall
+                # through to the same empty shell we use when a module
+                # has no docstring at all. Previously the placeholder
+                # read ``"To remove in the future -- <qa>"`` which
+                # leaked into the rendered output.
+                self.diagnostics.emit(
+                    W_MODULE_DOCSTRING,
+                    qa,
+                    f"numpydoc could not parse module docstring "
+                    f"({type(e).__name__}: {e})",
                 )
+                failure_collection["module_docstring_parse_failure"].append(qa)
+                module_docstring_parse_failed = True
+                ndoc = NumpyDocString(dedent_but_first("No Docstrings"))
+            else:
+                return
+        if not isinstance(target_item, ModuleType):
+            arbitrary = []
+        ex = self.config.execute_doctests
+        if self.config.execute_doctests and any(
+            qa.startswith(pat) for pat in self.config.execute_exclude_patterns
+        ):
+            ex = False
+
+        # TODO: ndoc-placeholder : make sure ndoc placeholder handled here.
+        with error_collector(qa=qa) as c:
+            doc_blob, figs = self.prepare_doc_for_one_object(
+                target_item,
+                ndoc,
+                qa=qa,
+                config=self.config.replace(execute_doctests=ex),
+                aliases=collector_aliases,
+                api_object=api_object,
+            )
+        del api_object
+        if c.errored:
+            return
+        _local_refs: list[str] = []
+
+        sections_ = [
+            "Parameters",
+            "Returns",
+            "Raises",
+            "Yields",
+            "Attributes",
+            "Other Parameters",
+            "Warns",
+            ##"Warnings",
+            "Methods",
+            # "Summary",
+            "Receives",
+        ]
+        for s in sections_:
+            for child in doc_blob.content.get(s, []):
+                if isinstance(child, Parameters):
+                    for param in child.children:
+                        new_ref = [u.strip() for u in param[0].split(",") if u]
+                        if new_ref:
+                            _local_refs.extend(new_ref)
+
+        for lr1 in _local_refs:
+            assert isinstance(lr1, str)
+        lr: frozenset[str] = frozenset(_local_refs)
+        doc_blob.local_refs = tuple(sorted(lr))
+        try:
+            _src_file = _find_file(target_item)
+            _doc_path = (
+                Path(_src_file).parent
+                if _src_file and not _src_file.endswith("<string>")
+                else None
+            )
+            _param_names: frozenset[str] = (
+                frozenset(p.name for p in doc_blob.signature.parameters)
+                if doc_blob.signature is not None
+                else frozenset()
+            )
+            with profiling.phase("visit"):
                 dv = GenVisitor(
                     qa,
                     known_refs,
@@ -2035,6 +3129,7 @@ class Gen:
                     param_names=_param_names,
                     diagnostics=self.diagnostics,
                     github_slug=self._meta.get("github_slug"),
+                    figure_encoder=self.figure_encoder(),
                 )
                 dv.collect_substitutions(
                     *arbitrary,
@@ -2055,103 +3150,258 @@ class Gen:
                     if section in doc_blob.content:
                         doc_blob.content[section] = dv.visit(doc_blob.content[section])
 
-                doc_blob.see_also = tuple(
-                    sorted(set(doc_blob.see_also), key=lambda sa: sa.name.value)
-                )
+            doc_blob.see_also = tuple(
+                sorted(set(doc_blob.see_also), key=lambda sa: sa.name.value)
+            )
 
-                for sa in doc_blob.see_also:
-                    from .tree import resolve_
+            for sa in doc_blob.see_also:
+                from .tree import resolve_
 
-                    r = resolve_(
-                        qa,
-                        known_refs,
-                        frozenset(),
-                        sa.name.value,
-                        rev_aliases=rev_aliases,
-                    )
-                    assert isinstance(r, RefInfo)
-                    if r.kind == "module":
-                        # Intra-bundle refs don't need a version stamp — store
-                        # as LocalRef so the bundle digest is independent of
-                        # its own version number. Mirrors GenVisitor._ref_to_crossref.
-                        if r.module == self.root:
-                            sa.name.reference = LocalRef(r.kind, r.path)
-                        else:
-                            sa.name.reference = r
+                r = resolve_(
+                    qa,
+                    known_refs,
+                    frozenset(),
+                    sa.name.value,
+                    rev_aliases=rev_aliases,
+                )
+                assert isinstance(r, RefInfo)
+                if r.kind == "module":
+                    # Intra-bundle refs don't need a version stamp — store
+                    # as LocalRef so the bundle digest is independent of
+                    # its own version number. Mirrors GenVisitor._ref_to_crossref.
+                    if r.module == self.root:
+                        sa.name.reference = LocalRef(r.kind, r.path)
                     else:
-                        imp = GenVisitor._import_solver(sa.name.value)
-                        if imp:
-                            self.log.debug(
-                                "TODO: see also resolve for %s in %s, %s",
-                                sa.name.value,
-                                qa,
-                                imp,
-                            )
-
-                # Inject a sentinel node if module docstring parsing failed
-                if module_docstring_parse_failed:
-                    sentinel = DocstringSentinel(
-                        message=f"numpydoc could not parse the docstring for {qa}"
-                    )
-                    # Prepend sentinel to Summary section if it exists
-                    if "Summary" in doc_blob._content:
-                        existing = doc_blob._content["Summary"]
-                        if isinstance(existing, Section):
-                            # Create a new Section (don't mutate the existing one in case it's shared)
-                            # Note: use direct _content assignment, not the proxy, because the proxy may be stale
-                            doc_blob._content["Summary"] = Section(
-                                children=(sentinel, *existing.children),
-                                title=existing.title,
-                                level=existing.level,
-                                target=existing.target,
-                            )
+                        sa.name.reference = r
+                else:
+                    imp = GenVisitor._import_solver(sa.name.value)
+                    if imp:
+                        self.log.debug(
+                            "TODO: see also resolve for %s in %s, %s",
+                            sa.name.value,
+                            qa,
+                            imp,
+                        )
 
-                # end processing
-                assert not isinstance(doc_blob._content, str), doc_blob._content
-                doc_blob.validate()
-                self.log.debug(doc_blob.signature)
-                self.put(qa, doc_blob)
-                if figs:
-                    self.log.debug("Found %s figures", len(figs))
-                for name, data in figs:
-                    self.put_raw(name, data)
-            except Exception as _post_err:
-                if self.config.early_error:
-                    raise
-                self.log.warning(
-                    "Error post-processing %s, skipping: %s", qa, _post_err
+            # Inject a sentinel node if module docstring parsing failed
+            if module_docstring_parse_failed:
+                sentinel = DocstringSentinel(
+                    message=f"numpydoc could not parse the docstring for {qa}"
                 )
-        if error_collector._unexpected_errors:
-            self.log.info(
-                "ERRORS:"
-                + tomli_w.dumps(error_collector._unexpected_errors).replace(
-                    ",", ",    \n"
-                )
-            )
-        if error_collector._expected_unseen:
-            inverted = defaultdict(lambda: [])
-            for qa, errs in error_collector._expected_unseen.items():
-                for err in errs:
-                    inverted[err].append(qa)
-            self.log.info("UNSEEN ERRORS:" + tomli_w.dumps(inverted))
-        if failure_collection:
-            self.log.info(
-                "The following parsing failed \n%s",
-                json.dumps(failure_collection, indent=2, sort_keys=True),
-            )
-        self._meta.update(
-            {
-                "aliases": aliases,
-            }
+                # Prepend sentinel to Summary section if it exists
+                if "Summary" in doc_blob._content:
+                    existing = doc_blob._content["Summary"]
+                    if isinstance(existing, Section):
+                        # Create a new Section (don't mutate the existing one in case it's shared)
+                        # Note: use direct _content assignment, not the proxy, because the proxy may be stale
+                        doc_blob._content["Summary"] = Section(
+                            children=(sentinel, *existing.children),
+                            title=existing.title,
+                            level=existing.level,
+                            target=existing.target,
+                        )
+
+            # end processing
+            assert not isinstance(doc_blob._content, str), doc_blob._content
+            doc_blob.validate()
+            self.log.debug(doc_blob.signature)
+            self.put(qa, doc_blob)
+            if figs:
+                self.log.debug("Found %s figures", len(figs))
+            for name, data in figs:
+                self.put_raw(name, data)
+        except Exception as _post_err:
+            if self.config.early_error:
+                raise
+            self.log.warning("Error post-processing %s, skipping: %s", qa, _post_err)
+
+
+@dataclass
+class _Collection:
+    """
+    The objects ``collect_api_docs`` documents, as crawled once per ``Gen``
+    (and refreshed module by module by ``Gen.reload_modules``).
+    """
+
+    collector: DFSCollector
+    # qualname -> object, without the configured exclusions.
+    objects: dict[str, Any]
+    aliases: dict[FullQual, Canonical]
+    rev_aliases: dict[Canonical, FullQual]
+    known_refs: frozenset[RefInfo]
+
+
+@dataclass
+class _ApiDocResult:
+    """
+    Everything one object contributes to the bundle, as produced by
+    ``Gen._capture_one_api_doc`` (typically inside a ``--jobs`` worker).
+    """
+
+    qa: str
+    doc: GeneratedDoc | None
+    assets: dict[str, bytes]
+    diagnostics: list[dict[str, str]]
+    diagnostic_counts: dict[Severity, int]
+    failures: dict[str, list[str]]
+    errors: ErrorCollector
+    # ``PARSE_COUNTS`` increments while building this object (none for a
+    # gen cache hit).
+    parses: dict[str, int] = field(default_factory=dict)
+    # Exec cache hits and misses while building this object.
+    exec_cache: dict[str, int] = field(default_factory=dict)
+    # ``_PROCESS_STATS`` increments while building this object.
+    stats: dict[str, dict[str, int]] = field(default_factory=dict)
+
+    @property
+    def cacheable(self) -> bool:
+        """Whether this result may be stored in the persistent gen cache."""
+        return (
+            self.doc is not None
+            and not self.errors._unexpected_errors
+            and not self.errors._expected_errors
+            # Examples that did not run this time may well run next time.
+            and not any(d["code"] == W_EXAMPLE_WORKER for d in self.diagnostics)
         )
 
-        top = self.data.get(self.root)
-        if top is not None:
-            summary_section = top._content.get("Summary")
-            if summary_section is not None:
-                blurb = _first_paragraph_text(summary_section)
-                if blurb:
-                    self._meta["summary"] = blurb
+
+# Gen whose ``get_example_data`` runs in forked example workers; set by
+# ``Gen._run_examples`` before any worker is started.
+_EXAMPLE_GEN: Gen | None = None
+
+
+def _example_task(
+    example_section: list[str], *, obj: Any, qa: str, config: Config
+) -> tuple[Section, list[Any], dict[str, dict[str, int]]]:
+    """
+    ExecPool entry point: run one object's examples in an example worker.
+    Also returns the ``_PROCESS_STATS`` increments, for the parent to count.
+    """
+    assert _EXAMPLE_GEN is not None
+    before = _snapshot_stats()
+    section, figs = _EXAMPLE_GEN.get_example_data(
+        example_section, obj=obj, qa=qa, config=config, log=_EXAMPLE_GEN.log
+    )
+    return section, figs, _stats_since(before)
+
+
+# (gen, collected objects, shared keyword arguments) handed to forked
+# ``--jobs`` workers; only set while a pool is running.
+_FORK_STATE: tuple[Gen, dict[str, Any], dict[str, Any]] | None = None
+
+
+def _api_docs_worker(qas: list[str]) -> list[_ApiDocResult]:
+    """Pool entry point: document one shard of qualnames in a forked worker."""
+    assert _FORK_STATE is not None
+    gen, collected, kwargs = _FORK_STATE
+    try:
+        return [gen._capture_one_api_doc(qa, collected[qa], **kwargs) for qa in qas]
+    finally:
+        gen.close_exec_pool()
+
+
+@dataclass
+class _NarrativeParse:
+    """First-pass result for one narrative file, see ``_parse_narrative``."""
+
+    path: Path
+    key: str
+    # None when the file could not be parsed (``warning`` says why), or when
+    # the rest was replayed from the narrative cache without parsing.
+    data: list[Section] | None
+    title: str | None = None
+    internal_labels: list[str] = field(default_factory=list)
+    external_targets: dict[str, str] = field(default_factory=dict)
+    warning: str | None = None
+    # ``_PROCESS_STATS`` increments while parsing this file.
+    stats: dict[str, dict[str, int]] = field(default_factory=dict)
+
+    def summary(self) -> dict[str, Any]:
+        """Everything but the parsed tree, as stored in the narrative cache."""
+        return {
+            "key": self.key,
+            "title": self.title,
+            "internal_labels": self.internal_labels,
+            "external_targets": self.external_targets,
+            "warning": self.warning,
+        }
+
+
+def _parse_narrative(root: Path, p: Path) -> _NarrativeParse:
+    """
+    Parse one narrative ``.rst`` file under ``root`` and extract its first
+    title and RST targets (typically inside a ``--jobs`` worker).
+    """
+    assert p.is_file()
+    parts = p.relative_to(root).parts
+    assert parts[-1].endswith("rst")
+    key = ":".join(parts)[:-4]
+    before = _snapshot_stats()
+    warning: str | None
+    try:
+        data = ts.parse(p.read_bytes(), str(p))
+    except ts.TreeSitterParseError as e:
+        warning = f"Could not parse {p}:{e.line}, skipping: {e}"
+    except Exception as e:
+        warning = f"Could not parse {p}, skipping: {e}"
+    else:
+        warning = None
+    stats = _stats_since(before)
+    if warning is not None:
+        return _NarrativeParse(p, key, None, warning=warning, stats=stats)
+    internal_labels, external_targets = Gen._extract_rst_targets(data)
+    return _NarrativeParse(
+        p,
+        key,
+        data,
+        title=next((section_title_text(s.title) for s in data if s.title), None),
+        internal_labels=internal_labels,
+        external_targets=external_targets,
+        stats=stats,
+    )
+
+
+@dataclass
+class _NarrativeResult:
+    """
+    Everything one narrative document contributes to the bundle, as produced
+    by ``Gen._visit_narrative`` (typically inside a ``--jobs`` worker).
+    """
+
+    assets: dict[str, bytes]
+    # ``_PROCESS_STATS`` increments while visiting this document.
+    stats: dict[str, dict[str, int]]
+    diagnostics: list[dict[str, str]] = field(default_factory=list)
+    diagnostic_counts: dict[Severity, int] = field(default_factory=dict)
+    # Serialized ``GeneratedDoc``; None when the document failed, and
+    # ``warning`` says why.
+    doc: bytes | None = None
+    title: str | None = None
+    tocs: Any = None
+    warning: str | None = None
+    # Files read by directives and labels looked up (with what they resolved
+    # to) while visiting, recorded by the narrative cache.
+    reads: set[Path] = field(default_factory=set)
+    lookups: dict[str, dict[str, str | None]] = field(default_factory=dict)
+
+
+# (gen, parsed narrative files, visitor keyword arguments) handed to forked
+# narrative workers; only set during the second narrative pass.
+_NARRATIVE_STATE: (
+    tuple[Gen, list[tuple[Path, str, list[Section] | None]], dict[str, Any]] | None
+) = None
+
+
+def _narrative_visit_worker(index: int) -> _NarrativeResult:
+    """Pool entry point: visit one parsed narrative document."""
+    assert _NARRATIVE_STATE is not None
+    gen, parsed_files, kwargs = _NARRATIVE_STATE
+    p, key, data = parsed_files[index]
+    if data is None:
+        # Unchanged since the cached build, but something it depends on did.
+        data = _parse_narrative(kwargs["doc_root"], p).data
+        assert data is not None
+    return gen._visit_narrative(p, key, data, **kwargs)
 
 
 def is_private(path: str) -> bool:
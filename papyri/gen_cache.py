@@ -0,0 +1,229 @@
+"""Persistent, content-addressed cache of per-object ``papyri gen`` output.
+
+Every API object documented by ``Gen.collect_api_docs`` is keyed by a hash
+of everything that can change its ``GeneratedDoc``: its docstring and
+signature, a digest of the file it is defined in, the papyri version, the
+``Config`` fields that influence gen, and a digest of the bundle-wide
+context (package name/version, the set of documented objects and their
+aliases, which drive cross-reference resolution). Entries live under
+``~/.cache/papyri/gen/`` and hold the finished ``GeneratedDoc`` JSON, its
+figure assets and the diagnostics emitted while building it, so a hit can be
+replayed into the bundle without parsing, executing or inferring anything.
+
+Only clean results are stored: an object that raised (expected or not) is
+always rebuilt.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import inspect
+import json
+import logging
+import os
+import shutil
+from hashlib import sha256
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .doc import GeneratedDoc
+from .error_collector import Severity
+from .signature import clean_hexaddress
+from .static_collector import stub_info
+
+if TYPE_CHECKING:
+    from .config_loader import Config
+
+log = logging.getLogger("papyri")
+
+GEN_CACHE_DIR = Path("~/.cache/papyri/gen/").expanduser()
+
+# Bump when the entry layout or anything feeding the key changes meaning.
+_FORMAT = 1
+
+# Config fields that do not influence what gen produces for one object.
+_VOLATILE_CONFIG = frozenset(
+    {
+        "dummy_progress",
+        "dry_run",
+        "jobs",
+        "cache",
+        "exec_cache",
+        "exec_cache_size",
+        "jedi_cache",
+        "jedi_cache_size",
+        "example_workers",
+        "example_worker_max_tasks",
+    }
+)
+
+
+def config_digest(config: Config) -> str:
+    """Digest of the ``Config`` fields relevant to per-object output."""
+    relevant = {
+        k: v for k, v in dataclasses.asdict(config).items() if k not in _VOLATILE_CONFIG
+    }
+    return sha256(
+        json.dumps(relevant, sort_keys=True, default=repr).encode()
+    ).hexdigest()
+
+
+class GenCache:
+    """
+    On-disk store of ``_ApiDocResult`` payloads, one directory per key::
+
+        <root>/<key[:2]>/<key>/doc.json
+                              /meta.json      diagnostics and failures
+                              /assets/<name>  figures
+
+    Entries are written to a temporary directory and renamed into place, so
+    concurrent builds never observe a partial entry.
+    """
+
+    def __init__(self, root: Path, context: str) -> None:
+        self.root = root
+        self.context = context
+        self.hits = 0
+        self.misses = 0
+        self._file_digests: dict[str, str | None] = {}
+
+    @classmethod
+    def for_bundle(
+        cls,
+        config: Config,
+        *,
+        root: str,
+        version: str | None,
+        qualnames: list[str],
+        aliases: dict[str, list[str]],
+    ) -> GenCache:
+        """
+        Open the cache for one bundle build. The bundle-wide part of every
+        key is computed once here.
+        """
+        from . import __version__
+
+        context = sha256(
+            json.dumps(
+                [
+                    _FORMAT,
+                    __version__,
+                    config_digest(config),
+                    root,
+                    version,
+                    sorted(qualnames),
+                    sorted((k, sorted(v)) for k, v in aliases.items()),
+                ],
+                default=repr,
+            ).encode()
+        ).hexdigest()
+        return cls(GEN_CACHE_DIR, context)
+
+    def _file_digest(self, target_item: Any) -> str | None:
+        try:
+            stub = stub_info(target_item)
+            path = stub.file if stub is not None else inspect.getfile(target_item)
+        except (TypeError, OSError):
+            return None
+        if path not in self._file_digests:
+            try:
+                self._file_digests[path] = sha256(Path(path).read_bytes()).hexdigest()
+            except OSError:
+                self._file_digests[path] = None
+        return self._file_digests[path]
+
+    def key(self, qa: str, target_item: Any) -> str:
+        """Content hash identifying the output of ``qa`` in this bundle."""
+        try:
+            # Default values render with their memory address.
+            signature: str | None = clean_hexaddress(
+                str(inspect.signature(target_item))
+            )
+        except Exception:
+            signature = None
+        doc = getattr(target_item, "__doc__", None)
+        parts = [
+            self.context,
+            qa,
+            doc if isinstance(doc, str) else None,
+            signature,
+            self._file_digest(target_item),
+        ]
+        return sha256(json.dumps(parts).encode()).hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def has(self, key: str) -> bool:
+        return (self._entry(key) / "meta.json").exists()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """
+        Return the stored payload for ``key`` (``doc``, ``assets``,
+        ``diagnostics``, ``diagnostic_counts``, ``failures``), or None.
+        """
+        entry = self._entry(key)
+        try:
+            meta = json.loads((entry / "meta.json").read_text())
+            doc = GeneratedDoc.from_json((entry / "doc.json").read_bytes())
+            assets = {
+                p.name: p.read_bytes() for p in sorted((entry / "assets").iterdir())
+            }
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            log.debug("Discarding unreadable gen cache entry %s: %s", entry, e)
+            shutil.rmtree(entry, ignore_errors=True)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return {
+            "doc": doc,
+            "assets": assets,
+            "diagnostics": meta["diagnostics"],
+            "diagnostic_counts": {
+                Severity[name]: n for name, n in meta["diagnostic_counts"].items()
+            },
+            "failures": meta["failures"],
+        }
+
+    def put(
+        self,
+        key: str,
+        *,
+        doc: GeneratedDoc,
+        assets: dict[str, bytes],
+        diagnostics: list[dict[str, str]],
+        diagnostic_counts: dict[Severity, int],
+        failures: dict[str, list[str]],
+    ) -> None:
+        entry = self._entry(key)
+        if entry.exists():
+            return
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry.parent / f".{key}.{os.getpid()}.tmp"
+        try:
+            (tmp / "assets").mkdir(parents=True)
+            (tmp / "doc.json").write_bytes(doc.to_json())
+            for name, data in assets.items():
+                (tmp / "assets" / name).write_bytes(data)
+            meta = {
+                "diagnostics": diagnostics,
+                "diagnostic_counts": {
+                    s.name: n for s, n in diagnostic_counts.items() if n
+                },
+                "failures": failures,
+            }
+            (tmp / "meta.json").write_text(json.dumps(meta, sort_keys=True))
+            os.replace(tmp, entry)
+        except OSError as e:
+            # Lost a race with another writer, or the disk is unhappy; either
+            # way the cache is an optimisation and the build carries on.
+            log.debug("Could not store gen cache entry %s: %s", entry, e)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        return f"{self.hits}/{total} hit(s), {self.misses} miss(es)"
@@ -48,6 +48,7 @@ log = logging.getLogger("papyri")
 class IngestedDoc(Node):
     __slots__ = (
         "_content",
+        "_dp",
         "_ordered_sections",
         "aliases",
         "arbitrary",
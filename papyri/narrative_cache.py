@@ -0,0 +1,270 @@
+"""Persistent dependency graph and output cache of the narrative docs.
+
+``Gen.collect_narrative_docs`` parses every ``.rst`` file under ``docs_path``
+to collect its RST labels, then visits each document against the labels of
+all of them. This cache keeps, per file and across builds:
+
+- the digest of the file and what the first pass extracted from it (key,
+  title, internal and external targets), so an unchanged file is not parsed
+  again just to know which labels it defines;
+- the files its directives read (``include``, ``csv-table :file:``,
+  ``image``) with their digests, the labels and document titles its
+  ``:ref:``s and toctrees looked up with what they resolved to, and the
+  finished ``GeneratedDoc`` with its assets and diagnostics.
+
+A document is only visited again when its own digest, the digest of one of
+the files it read, or the resolution of one of the lookups it made changed;
+every other document is replayed from the cache. Entries live under
+``~/.cache/papyri/narrative/``, one manifest per docs tree and build context
+(papyri version, relevant ``Config`` fields, package name and version).
+
+Only clean results are stored: a document that failed to visit is always
+rebuilt.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from collections.abc import Iterator, Mapping
+from hashlib import sha256
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .error_collector import Severity
+from .gen_cache import config_digest
+
+if TYPE_CHECKING:
+    from .config_loader import Config
+
+log = logging.getLogger("papyri")
+
+NARRATIVE_CACHE_DIR = Path("~/.cache/papyri/narrative/").expanduser()
+
+# Bump when the manifest layout or anything feeding the context changes meaning.
+_FORMAT = 1
+
+
+class LookupRecorder(Mapping[str, str]):
+    """
+    Read-only view of a label map that remembers every key looked up through
+    it, and what it resolved to (None for a miss).
+    """
+
+    def __init__(self, data: Mapping[str, str]) -> None:
+        self._data = data
+        self.seen: dict[str, str | None] = {}
+
+    def __getitem__(self, key: str) -> str:
+        value = self._data.get(key)
+        self.seen[key] = value
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class NarrativeCache:
+    """
+    On-disk store for one docs tree::
+
+        <root>/<context[:2]>/<context>/manifest.json   one entry per file
+                                      /blobs/<sha256>  documents and assets
+
+    The manifest is rewritten once per build, dropping the entries of files
+    that no longer exist, and blobs nothing refers to anymore are removed.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.reused = 0
+        self.rebuilt = 0
+        self._digests: dict[Path, str | None] = {}
+        self._seen: set[str] = set()
+        try:
+            self.entries: dict[str, dict[str, Any]] = json.loads(
+                (root / "manifest.json").read_text()
+            )
+        except FileNotFoundError:
+            self.entries = {}
+        except Exception as e:
+            log.debug("Discarding unreadable narrative cache %s: %s", root, e)
+            self.entries = {}
+
+    @classmethod
+    def for_docs(
+        cls,
+        config: Config,
+        *,
+        docs_root: Path,
+        module: str | None,
+        version: str | None,
+        github_slug: str | None,
+    ) -> NarrativeCache:
+        """Open the cache of the narrative docs under ``docs_root``."""
+        from . import __version__
+
+        context = sha256(
+            json.dumps(
+                [
+                    _FORMAT,
+                    __version__,
+                    config_digest(config),
+                    str(docs_root.resolve()),
+                    module,
+                    version,
+                    github_slug,
+                ],
+                default=repr,
+            ).encode()
+        ).hexdigest()
+        return cls(NARRATIVE_CACHE_DIR / context[:2] / context)
+
+    def digest(self, path: Path) -> str | None:
+        """Digest of the content of ``path`` (None if unreadable), once per build."""
+        if path not in self._digests:
+            try:
+                self._digests[path] = sha256(path.read_bytes()).hexdigest()
+            except OSError:
+                self._digests[path] = None
+        return self._digests[path]
+
+    def parsed(self, rel: str, path: Path) -> dict[str, Any] | None:
+        """
+        What the first pass extracted from ``path`` last time (``key``,
+        ``title``, ``internal_labels``, ``external_targets``, ``warning``), or
+        None if the file changed.
+        """
+        self._seen.add(rel)
+        entry = self.entries.get(rel)
+        if entry is None or entry["digest"] != self.digest(path):
+            return None
+        parse: dict[str, Any] = entry["parse"]
+        return parse
+
+    def store_parsed(self, rel: str, path: Path, parse: dict[str, Any]) -> None:
+        self.entries[rel] = {"digest": self.digest(path), "parse": parse}
+
+    def result(
+        self,
+        rel: str,
+        path: Path,
+        lookups: dict[str, Mapping[str, str]],
+    ) -> dict[str, Any] | None:
+        """
+        Return the stored visit of ``path`` (``doc``, ``assets``, ``title``,
+        ``tocs``, ``diagnostics``, ``diagnostic_counts``) if neither the file,
+        the files it read, nor what its lookups in ``lookups`` resolve to
+        changed; None otherwise.
+        """
+        entry = self.entries.get(rel)
+        visit = None if entry is None else entry.get("visit")
+        if (
+            visit is None
+            or entry is None
+            or entry["digest"] != self.digest(path)
+            or any(self.digest(Path(p)) != d for p, d in visit["deps"].items())
+            or any(
+                lookups[name].get(label) != value
+                for name, seen in visit["lookups"].items()
+                for label, value in seen.items()
+            )
+        ):
+            return None
+        try:
+            doc = (self.root / "blobs" / visit["doc"]).read_bytes()
+            assets = {
+                name: (self.root / "blobs" / blob).read_bytes()
+                for name, blob in visit["assets"].items()
+            }
+        except OSError as e:
+            log.debug("Discarding narrative cache entry %s: %s", rel, e)
+            del entry["visit"]
+            return None
+        self.reused += 1
+        return {
+            "doc": doc,
+            "assets": assets,
+            "title": visit["title"],
+            "tocs": visit["tocs"],
+            "diagnostics": visit["diagnostics"],
+            "diagnostic_counts": {
+                Severity[name]: n for name, n in visit["diagnostic_counts"].items()
+            },
+        }
+
+    def store_result(
+        self,
+        rel: str,
+        *,
+        reads: set[Path],
+        lookups: dict[str, dict[str, str | None]],
+        doc: bytes,
+        assets: dict[str, bytes],
+        title: str | None,
+        tocs: Any,
+        diagnostics: list[dict[str, str]],
+        diagnostic_counts: dict[Severity, int],
+    ) -> None:
+        entry = self.entries.get(rel)
+        if entry is None:
+            return
+        try:
+            visit = {
+                "deps": {str(p): self.digest(p) for p in sorted(reads)},
+                "lookups": lookups,
+                "doc": self._put_blob(doc),
+                "assets": {name: self._put_blob(data) for name, data in assets.items()},
+                "title": title,
+                "tocs": tocs,
+                "diagnostics": diagnostics,
+                "diagnostic_counts": {
+                    s.name: n for s, n in diagnostic_counts.items() if n
+                },
+            }
+        except OSError as e:
+            log.debug("Could not store narrative cache entry %s: %s", rel, e)
+            return
+        entry["visit"] = visit
+
+    def _put_blob(self, data: bytes) -> str:
+        name = sha256(data).hexdigest()
+        blob = self.root / "blobs" / name
+        if not blob.exists():
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            tmp = blob.with_name(f".{name}.{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, blob)
+        return name
+
+    def save(self) -> None:
+        """Write the manifest of this build and drop unreferenced blobs."""
+        self.entries = {k: v for k, v in self.entries.items() if k in self._seen}
+        live = set()
+        for entry in self.entries.values():
+            if visit := entry.get("visit"):
+                live.add(visit["doc"])
+                live.update(visit["assets"].values())
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = self.root / f".manifest.{os.getpid()}.tmp"
+            tmp.write_text(json.dumps(self.entries, sort_keys=True))
+            os.replace(tmp, self.root / "manifest.json")
+            blobs = self.root / "blobs"
+            if blobs.is_dir():
+                for blob in blobs.iterdir():
+                    if blob.name not in live:
+                        blob.unlink(missing_ok=True)
+        except OSError as e:
+            # The cache is an optimisation; the build carries on without it.
+            log.debug("Could not save narrative cache %s: %s", self.root, e)
+
+    def summary(self) -> str:
+        total = self.reused + self.rebuilt
+        return f"{self.reused}/{total} reused, {self.rebuilt} rebuilt"
@@ -3,16 +3,24 @@ from __future__ import annotations
 import json
 import types
 import typing
-from collections.abc import Callable
-from typing import Any, Self
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import MISSING, Field, dataclass
+from typing import Any, Self, TypeVar
 
 import cbor2
 
-from .node_serializer import serialize as _serialize
-from .serde import deserialize, get_type_hints
+from . import profiling
+from .node_serializer import serializer_for
+from .serde import deserializer_for, get_type_hints
+
+_N = TypeVar("_N", bound="Node")
 
 
 class Base:
+    __slots__ = ()
+
     def validate(self) -> Self:
         validate(self)
         return self
@@ -22,8 +30,8 @@ class Base:
         return cls()
 
 
-def _coerce_field(ann: Any, val: Any) -> Any:
-    """Coerce val to the mutable→immutable type the annotation requires.
+def _wants_tuple(ann: Any) -> bool:
+    """Whether a field annotated ``ann`` stores lists as tuples.
 
     Node fields annotated as tuple[T, ...] must be tuples at runtime so that
     cbor2 ≥ 6 (which decodes CBOR arrays inside tagged values as tuples) and
@@ -32,32 +40,174 @@ def _coerce_field(ann: Any, val: Any) -> Any:
     Also handles Optional[tuple[T, ...]] (i.e. ``tuple[T, ...] | None``).
     """
     origin = getattr(ann, "__origin__", None)
-    if origin is tuple and isinstance(val, list):
-        return tuple(val)
+    if origin is tuple:
+        return True
     # Handle X | Y unions (types.UnionType, Python 3.10+) and typing.Union
     if isinstance(ann, types.UnionType) or origin is typing.Union:
-        for arg in ann.__args__:
-            if getattr(arg, "__origin__", None) is tuple and isinstance(val, list):
-                return tuple(val)
-    return val
+        return any(getattr(arg, "__origin__", None) is tuple for arg in ann.__args__)
+    return False
+
+
+def _is_classvar(annotation: Any) -> bool:
+    if isinstance(annotation, str):
+        return annotation.startswith(("ClassVar", "typing.ClassVar"))
+    return typing.get_origin(annotation) is typing.ClassVar
 
 
-class Node(Base):
+def _slots(cls: type) -> tuple[str, ...]:
+    slots = vars(cls).get("__slots__", ())
+    return (slots,) if isinstance(slots, str) else tuple(slots)
+
+
+class NodeMeta(type):
+    """
+    Give each class the ``__slots__`` of the fields it annotates, so that
+    nodes carry no per-instance ``__dict__``.
+
+    ``ClassVar`` annotations and unannotated class attributes, such as the
+    ``type`` tags, stay on the class. A default value cannot share its name
+    with a slot: the defaults of the class body move to ``_field_defaults``,
+    which ``Node.__init__`` applies (calling ``field(default_factory=...)``).
+    Classes that declare ``__slots__`` themselves keep them.
+
+    Classes flagged ``_interned`` are immutable leaves; unless they define
+    their own ``__hash__``, they get a ``_hash`` slot caching it, and a
+    ``_validated`` one so ``validate()`` checks each instance once.
+    """
+
+    def __new__(
+        mcls, name: str, bases: tuple[type, ...], namespace: dict[str, Any]
+    ) -> NodeMeta:
+        if "__slots__" not in namespace:
+            slotted = {s for base in bases for c in base.__mro__ for s in _slots(c)}
+            annotated = [
+                k
+                for k, ann in namespace.get("__annotations__", {}).items()
+                if not _is_classvar(ann)
+            ]
+            namespace["_field_defaults"] = {
+                k: namespace.pop(k) for k in annotated if k in namespace
+            }
+            slots = tuple(k for k in annotated if k not in slotted)
+            if namespace.get("_interned") and "__hash__" not in namespace:
+                namespace["__hash__"] = _cached_hash
+                slots += ("_hash", "_validated")
+            namespace["__slots__"] = slots
+        return super().__new__(mcls, name, bases, namespace)
+
+
+def _default_factory(default: Any) -> Callable[[], Any]:
+    if isinstance(default, Field):
+        if default.default_factory is not MISSING:
+            return default.default_factory
+        default = default.default
+    return lambda: default
+
+
+@dataclass(frozen=True, slots=True)
+class ConstructionPlan:
+    """How to build instances of one ``Node`` subclass, worked out once."""
+
+    # Field annotations, in positional order.
+    hints: dict[str, Any]
+    # Fields with a default, and how to make it.
+    defaults: dict[str, Callable[[], Any]]
+    # Fields whose list values are stored as tuples.
+    tuple_fields: frozenset[str]
+    post_deserialise: Callable[[Any], None] | None
+    # Whether ``__init__`` is ``Node.__init__``, or only checks its arguments
+    # (``_trusted_init``), so decoders may set the fields directly.
+    trusted: bool
+
+
+_PLANS: dict[type, ConstructionPlan] = {}
+
+
+def construction_plan(cls: type) -> ConstructionPlan:
+    try:
+        return _PLANS[cls]
+    except KeyError:
+        pass
+    hints = get_type_hints(cls)
+    if cls.__name__ == "Directive":
+        hints = {k: v for k, v in hints.items() if k != "type"}
+    defaults: dict[str, Any] = {}
+    for c in reversed(cls.__mro__):
+        defaults.update(vars(c).get("_field_defaults", {}))
+    init_owner = next(c for c in cls.__mro__ if "__init__" in vars(c))
+    plan = ConstructionPlan(
+        hints=hints,
+        defaults={k: _default_factory(v) for k, v in defaults.items() if k in hints},
+        tuple_fields=frozenset(k for k, ann in hints.items() if _wants_tuple(ann)),
+        post_deserialise=getattr(cls, "_post_deserialise", None),
+        trusted=init_owner is Node or vars(init_owner).get("_trusted_init", False),
+    )
+    _PLANS[cls] = plan
+    return plan
+
+
+class Node(Base, metaclass=NodeMeta):
+    __slots__ = ()
+    # Immutable leaves that ``Interner`` may share; see ``NodeMeta``.
+    _interned = False
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
-        tt = get_type_hints(type(self))  # type: ignore[arg-type]
-        if type(self).__name__ == "Directive":
-            tt = {k: v for k, v in tt.items() if k != "type"}
-        for attr, val in zip(tt, args, strict=False):
-            setattr(self, attr, _coerce_field(tt[attr], val))
+        plan = _PLANS.get(type(self)) or construction_plan(type(self))
+        tuple_fields = plan.tuple_fields
+        for attr, val in zip(plan.hints, args, strict=False):
+            if attr in tuple_fields and isinstance(val, list):
+                val = tuple(val)
+            setattr(self, attr, val)
         for k, v in kwargs.items():
-            assert k in tt, f"{k} not in {tt}"
-            setattr(self, k, _coerce_field(tt[k], v))
-        if hasattr(self, "_post_deserialise"):
-            self._post_deserialise()
+            assert k in plan.hints, f"{k} not in {plan.hints}"
+            if k in tuple_fields and isinstance(v, list):
+                v = tuple(v)
+            setattr(self, k, v)
+        if plan.defaults:
+            _set_defaults(self, plan, len(args), kwargs)
+        if plan.post_deserialise is not None:
+            plan.post_deserialise(self)
+
+    @classmethod
+    def _deserialise(cls, **kwargs: Any) -> Self:
+        """
+        Build an instance from decoded fields, which already have their
+        annotated types.
+
+        Skips the checks and conversions of ``__init__`` when the plan of the
+        class trusts it; used by ``from_dict`` and the CBOR decoder.
+
+        Under ``interning()``, equal instances of the ``_interned`` leaf
+        classes come back as one shared object.
+        """
+        plan = _PLANS.get(cls) or construction_plan(cls)
+        if not plan.trusted:
+            self = cls(**kwargs)
+        else:
+            self = cls.__new__(cls)
+            for k, v in kwargs.items():
+                setattr(self, k, v)
+            if plan.defaults and len(kwargs) < len(plan.hints):
+                _set_defaults(self, plan, 0, kwargs)
+            if plan.post_deserialise is not None:
+                plan.post_deserialise(self)
+        if _INTERNER is not None and cls._interned:
+            return _INTERNER(self)
+        return self
+
+    def __setstate__(self, state: Any) -> None:
+        # Pickled slots; the default would use setattr, which frozen
+        # dataclass nodes refuse. A cached hash is only valid in the process
+        # that computed it.
+        if isinstance(state, tuple):
+            state = state[1]
+        for k, v in (state or {}).items():
+            if k != "_hash":
+                object.__setattr__(self, k, v)
 
     def cbor(self, encoder: Any) -> None:
         tag = TAG_MAP[type(self)]
-        attrs = get_type_hints(type(self))  # type: ignore[arg-type]
+        attrs = get_type_hints(type(self))
         values = []
         for k in attrs:
             v = getattr(self, k)
@@ -70,9 +220,11 @@ class Node(Base):
         encoder.encode(cbor2.CBORTag(tag, values))
 
     def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
         if not (type(self) == type(other)):
             return False
-        tt = get_type_hints(type(self))  # type: ignore[arg-type]
+        tt = get_type_hints(type(self))
         for attr in tt:
             a, b = getattr(self, attr), getattr(other, attr)
             if a != b:
@@ -81,13 +233,14 @@ class Node(Base):
         return True
 
     def __repr__(self) -> str:
-        tt = get_type_hints(type(self))  # type: ignore[arg-type]
+        tt = get_type_hints(type(self))
         acc = ""
         for t in tt:
             acc += f"{t}: {getattr(self, t)!r}\n"
 
         return f"<{self.__class__.__name__}: \n{indent(acc)}>"
 
+    @profiling.phase("serialize")
     def to_json(self) -> bytes:
         return json.dumps(self.to_dict(), indent=2, sort_keys=True).encode()
 
@@ -96,22 +249,108 @@ class Node(Base):
         return cls.from_dict(json.loads(data))
 
     def to_dict(self) -> dict[str, Any]:
-        return _serialize(self, type(self))  # type: ignore[no-any-return]
+        return serializer_for(type(self))(self)  # type: ignore[no-any-return]
 
     @classmethod
     def from_dict(cls, data: Any) -> Self:
-        return deserialize(cls, cls, data)  # type: ignore[no-any-return]
+        return deserializer_for(cls)(data)  # type: ignore[no-any-return]
 
     def __hash__(self) -> int:
+        # Over the same fields as ``__eq__``, so equal nodes hash equal.
+        plan = _PLANS.get(type(self)) or construction_plan(type(self))
         return hash(
-            tuple(
-                tuple(getattr(self, x))
-                for x in dir(self)
-                if not x.startswith("_") and not callable(getattr(self, x))
-            )
+            (type(self), *[_hash_key(getattr(self, k, None)) for k in plan.hints])
         )
 
 
+def _set_defaults(
+    node: Node, plan: ConstructionPlan, n_args: int, given: dict[str, Any]
+) -> None:
+    positional = list(plan.hints)[:n_args]
+    for k, default in plan.defaults.items():
+        if k not in given and k not in positional:
+            setattr(node, k, default())
+
+
+def _hash_key(value: Any) -> Any:
+    """A hashable stand-in for a field value, equal when the values are."""
+    if isinstance(value, (list, tuple)):
+        return tuple(map(_hash_key, value))
+    if isinstance(value, dict):
+        return len(value)
+    return value
+
+
+def _cached_hash(self: Node) -> int:
+    try:
+        return self._hash  # type: ignore[attr-defined, no-any-return]
+    except AttributeError:
+        h = Node.__hash__(self)
+        object.__setattr__(self, "_hash", h)
+        return h
+
+
+class Interner:
+    """
+    Hash-consing table for the immutable leaf classes flagged ``_interned``.
+
+    Calling it with a node returns the first equal node it was given, so
+    repeated leaves (the same ``Text`` run, ``RefInfo`` or ``CrossRef`` in
+    thousands of documents) share one object; nodes of other classes pass
+    through. ``seen`` and ``kept`` count, per class name, the nodes it was
+    given and the distinct ones it holds.
+    """
+
+    def __init__(self) -> None:
+        self._table: dict[tuple[Any, ...], Node] = {}
+        self.seen: Counter[str] = Counter()
+        self.kept: Counter[str] = Counter()
+
+    def __call__(self, node: _N) -> _N:
+        cls = type(node)
+        if not cls._interned:
+            return node
+        plan = _PLANS.get(cls) or construction_plan(cls)
+        key = (cls, *[getattr(node, k) for k in plan.hints])
+        shared = self._table.setdefault(key, node)
+        self.seen[cls.__name__] += 1
+        if shared is node:
+            self.kept[cls.__name__] += 1
+        return shared  # type: ignore[return-value]
+
+    @property
+    def ratio(self) -> float:
+        """Nodes given per node kept; 1.0 when nothing was shared."""
+        return self.seen.total() / max(self.kept.total(), 1)
+
+    def __repr__(self) -> str:
+        return (
+            f"<Interner: {self.kept.total()} of {self.seen.total()} "
+            f"leaves kept ({self.ratio:.2f}x)>"
+        )
+
+
+_INTERNER: Interner | None = None
+
+
+@contextmanager
+def interning(interner: Interner | None = None) -> Iterator[Interner]:
+    """
+    Share equal ``_interned`` leaves among the nodes decoded in the block.
+
+    Only for trees that are read, not edited in place: every node decoded
+    with ``from_dict`` or the CBOR decoder meanwhile goes through
+    ``interner`` (a fresh one by default), which is yielded for its counts.
+    """
+    global _INTERNER
+    previous = _INTERNER
+    _INTERNER = interner if interner is not None else Interner()
+    try:
+        yield _INTERNER
+    finally:
+        _INTERNER = previous
+
+
 class UnserializableNode(Node):
     """
     Base for Node subclasses that are purely in-memory intermediates and must
@@ -155,6 +394,10 @@ def indent(text: str, marker: str = "   |") -> str:
     return "\n".join(marker + l for l in lines)
 
 
+# Values that hold no nodes; ``_invalidate`` does not descend into them.
+_SCALARS = frozenset({str, int, float, bool, bytes, type(None)})
+
+
 def _invalidate(obj: Any, depth: int = 0) -> str | None:
     """
     Recursively validate type anotated classes.
@@ -175,30 +418,69 @@ def _invalidate(obj: Any, depth: int = 0) -> str | None:
     if getattr(obj, "_reject_at_validate", False):
         raise NotImplementedError(obj._why_unserializable())
 
-    annotations = get_type_hints(type(obj))  # type: ignore[arg-type]
-    for k, v in annotations.items():
-        # FIX: AttributeError: 'Text' object has no attribute 'position'
-        item = getattr(obj, k)
-        res = not_type_check(item, v)
-        if res:
-            return f"{k} field of  {type(obj)} : {res}"
+    validator = _VALIDATORS.get(type(obj)) or _compile_validator(type(obj))
+    return validator(obj, depth)
 
-        if isinstance(item, (list, tuple)):
-            for ii, i in enumerate(item):
+
+def _walk(item: Any, depth: int) -> str | None:
+    """Validate the nodes held by the field value ``item``."""
+    if isinstance(item, (list, tuple)):
+        for ii, i in enumerate(item):
+            if type(i) not in _SCALARS:
                 sub = _invalidate(i, depth + 1)
                 if sub is not None:
-                    return f"{k}.{ii}." + sub
-        elif isinstance(item, dict):
-            for ii, i in item.items():
+                    return f"{ii}." + sub
+    elif isinstance(item, dict):
+        for ii, i in item.items():
+            if type(i) not in _SCALARS:
                 sub = _invalidate(i, depth + 1)
                 if sub is not None:
-                    return f"{k}.{ii}." + sub
-        else:
-            sub = _invalidate(item, depth + 1)
+                    return f"{ii}." + sub
+    elif type(item) not in _SCALARS:
+        return _invalidate(item, depth + 1)
+    return None
+
+
+_VALIDATORS: dict[type, Callable[[Any, int], str | None]] = {}
+
+
+def _compile_validator(cls: type) -> Callable[[Any, int], str | None]:
+    """
+    Build the function ``_invalidate`` applies to instances of ``cls``.
+
+    Field types are checked with the predicates of ``type_checker``; the
+    message of ``not_type_check``, which formats the offending value, is only
+    built once a check fails. Classes with a ``_validated`` slot are
+    immutable, so each instance is checked only once.
+    """
+    fields = [(k, ann, type_checker(ann)) for k, ann in get_type_hints(cls).items()]
+
+    def check_fields(obj: Any, depth: int) -> str | None:
+        for k, ann, check in fields:
+            # FIX: AttributeError: 'Text' object has no attribute 'position'
+            item = getattr(obj, k)
+            if not check(item):
+                res = not_type_check(item, ann)
+                return f"{k} field of  {type(obj)} : {res}"
+            sub = _walk(item, depth)
             if sub is not None:
                 return f"{k}." + sub
+        return None
 
-    return None
+    validator = check_fields
+    if hasattr(cls, "_validated"):
+
+        def check_once(obj: Any, depth: int) -> str | None:
+            if getattr(obj, "_validated", False):
+                return None
+            res = check_fields(obj, depth)
+            if res is None:
+                object.__setattr__(obj, "_validated", True)
+            return res
+
+        validator = check_once
+    _VALIDATORS[cls] = validator
+    return validator
 
 
 class WrongTypeAtField(ValueError):
@@ -256,6 +538,56 @@ def not_type_check(item: Any, annotation: Any) -> str | None:
     raise ValueError(item, annotation)
 
 
+_CHECKERS: dict[Any, Callable[[Any], bool]] = {}
+
+
+def type_checker(annotation: Any) -> Callable[[Any], bool]:
+    """
+    Predicate accepting the values ``not_type_check`` accepts for
+    ``annotation``, without building any message; compiled once per
+    annotation.
+    """
+    try:
+        return _CHECKERS[annotation]
+    except KeyError:
+        pass
+    check = _compile_checker(annotation)
+    _CHECKERS[annotation] = check
+    return check
+
+
+def _compile_checker(annotation: Any) -> Callable[[Any], bool]:
+    origin = getattr(annotation, "__origin__", None)
+    if isinstance(annotation, types.UnionType) or origin is typing.Union:
+        args = annotation.__args__
+        if not any(hasattr(arg, "__origin__") for arg in args):
+            return lambda item: isinstance(item, args)
+        checks = [type_checker(arg) for arg in args]
+        return lambda item: any(check(item) for check in checks)
+    if not hasattr(annotation, "__origin__"):
+        return lambda item: isinstance(item, annotation)
+    if origin is dict:
+        key_check, value_check = map(type_checker, annotation.__args__[:2])
+        return lambda item: (
+            isinstance(item, dict)
+            and all(map(key_check, item))
+            and all(map(value_check, item.values()))
+        )
+    if origin in (list, tuple):
+        inner = annotation.__args__[0]
+        if not hasattr(inner, "__origin__") and not isinstance(inner, types.UnionType):
+            return lambda item: (
+                isinstance(item, (list, tuple))
+                and all(isinstance(i, inner) for i in item)
+            )
+        inner_check = type_checker(inner)
+        return lambda item: (
+            isinstance(item, (list, tuple)) and all(map(inner_check, item))
+        )
+    # not_type_check raises ValueError for anything else.
+    return lambda item: not_type_check(item, annotation) is None
+
+
 def register(value: int) -> Callable[[type], type]:
     assert value not in REV_TAG_MAP, REV_TAG_MAP[value]
 
@@ -7,9 +7,16 @@ value itself: every serialized Node dict carries a ``"type"`` key alongside
 its regular fields. The tag is either the class's ``type`` class-attribute
 (if set, e.g. ``"inlineCode"``) or the class name.
 
-Used by ``Node.to_dict`` / ``Node.to_json``.
+``serialize`` walks the annotations of every field of every node on every
+call. ``Node.to_dict`` / ``Node.to_json`` use ``serializer_for`` instead: it
+compiles, at first use of each annotation, a function specialised for it
+(the field list of a class, a table from runtime type to tag for a union)
+that returns exactly what ``serialize`` returns. Values the compiled
+function does not expect, such as a failing assertion or an unserializable
+node, are handed to ``serialize``, which raises as before.
 """
 
+from collections.abc import Callable
 from typing import Any
 from typing import get_type_hints as gth
 
@@ -79,3 +86,113 @@ def serialize(instance: Any, annotation: Any) -> Any:
     except Exception as e:
         e.add_note(f"serializing {instance.__class__}")
         raise
+
+
+_SERIALIZERS: dict[Any, Callable[[Any], Any]] = {}
+
+
+def serializer_for(annotation: Any) -> Callable[[Any], Any]:
+    """
+    A function returning ``serialize(value, annotation)``, compiled for
+    ``annotation`` on first use.
+    """
+    try:
+        return _SERIALIZERS[annotation]
+    except KeyError:
+        pass
+    except TypeError:
+        # Unhashable annotation: nothing to cache it under.
+        return lambda value: serialize(value, annotation)
+    function = _compile(annotation)
+    _SERIALIZERS[annotation] = function
+    return function
+
+
+def _compile(annotation: Any) -> Callable[[Any], Any]:
+    def fallback(value: Any) -> Any:
+        return serialize(value, annotation)
+
+    if annotation in base_types:
+
+        def serialize_base(value: Any) -> Any:
+            # Exact builtins cannot be flagged ``_dont_serialise``.
+            if type(value) in base_types and isinstance(value, annotation):
+                return value
+            return fallback(value)
+
+        return serialize_base
+
+    origin = getattr(annotation, "__origin__", None)
+    if origin in (list, tuple):
+        item = serializer_for(annotation.__args__[0])
+
+        def serialize_sequence(value: Any) -> Any:
+            if type(value) is tuple or type(value) is list:
+                return [item(x) for x in value]
+            return fallback(value)
+
+        return serialize_sequence
+
+    if origin is dict:
+        item = serializer_for(annotation.__args__[1])
+
+        def serialize_mapping(value: Any) -> Any:
+            if type(value) is dict:
+                return {k: item(v) for k, v in value.items()}
+            return fallback(value)
+
+        return serialize_mapping
+
+    if _is_union(annotation):
+        args = _union_args(annotation)
+        if len(args) == 2 and args[1] == type(None):
+            inner = serializer_for(args[0])
+            return lambda value: None if value is None else inner(value)
+        # Runtime type -> (tag, serializer), for the members ``serialize``
+        # matches by identity.
+        members = {
+            arg: (getattr(arg, "type", arg.__name__), serializer_for(arg))
+            for arg in args
+            if isinstance(arg, type)
+        }
+
+        def serialize_union(value: Any) -> Any:
+            member = members.get(type(value))
+            if member is None:
+                return fallback(value)
+            tag, inner = member
+            data = inner(value)
+            if isinstance(data, dict):
+                return {**data, "type": tag}
+            return {"data": data, "type": tag}
+
+        return serialize_union
+
+    if isinstance(annotation, type) and not getattr(
+        annotation, "_dont_serialise", False
+    ):
+        return _compile_class(annotation, fallback)
+    return fallback
+
+
+def _compile_class(cls: type, fallback: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    # Resolved at the first call: the annotations of a node may name
+    # classes defined after it, or the class itself.
+    fields: list[tuple[str, Callable[[Any], Any]]] | None = None
+
+    def serialize_class(value: Any) -> Any:
+        nonlocal fields
+        if type(value) is not cls:
+            return fallback(value)
+        if fields is None:
+            fields = [(k, serializer_for(ann)) for k, ann in gth(cls).items()]
+        data = {"type": value.type if hasattr(value, "type") else cls.__name__}
+        try:
+            for k, field in fields:
+                data[k] = field(getattr(value, k))
+        except Exception as e:
+            e.add_note(f"serializing {cls}")
+            raise
+        return data
+
+    return serialize_class
@@ -58,6 +58,7 @@ Unless your use case is widely adopted it is likely not worse the complexity
 from __future__ import annotations
 
 import sys
+import types
 from collections.abc import Iterator
 from dataclasses import dataclass, field
 from typing import Any, ClassVar, Self, TypeAlias
@@ -150,8 +151,13 @@ class CrossRef(Node):
       - anything else ("module", "local", "api", ...) — resolved.
 
     `exists` is a derived property over `reference.kind`; don't store it.
+
+    Only decoded cross-references are shared (see ``node_base.interning``):
+    gen and ``tree.py`` still resolve ``reference`` in place, so the hash is
+    not cached either.
     """
 
+    _interned = True
     value: str
     reference: RefInfo | LocalRef
     # `kind` is a classification hint carried alongside the reference (e.g. the
@@ -195,7 +201,7 @@ def iter_crossrefs(node: Any) -> Iterator[CrossRef]:
         for item in node.values():
             yield from iter_crossrefs(item)
     elif isinstance(node, Node):
-        for attr in get_type_hints(type(node)):  # type: ignore[arg-type]
+        for attr in get_type_hints(type(node)):
             yield from iter_crossrefs(getattr(node, attr, None))
 
 
@@ -377,6 +383,8 @@ class Text(Node):
     """Literal text run with no formatting."""
 
     type = "text"
+    _trusted_init = True
+    _interned = True
     value: str
 
     def __init__(self, value: str) -> None:
@@ -437,6 +445,7 @@ class InlineCode(Node):
     """Inline code span (RST double backticks ``code``).  Single-line only."""
 
     type = "inlineCode"
+    _trusted_init = True
     value: str
 
     def __init__(self, value: str) -> None:
@@ -658,6 +667,7 @@ class Target(Node):
     """
 
     type = "target"
+    _trusted_init = True
     label: str
     url: str | None
 
@@ -732,6 +742,7 @@ class LocalRef(Node):
         Path within the bundle (e.g. ``"numpy.linspace"`` or ``"tutorial:index"``).
     """
 
+    _interned = True
     kind: str
     path: str
 
@@ -774,6 +785,7 @@ class RefInfo(Node):
 
     """
 
+    _interned = True
     module: str | None
     version: str | None
     kind: str
@@ -941,6 +953,7 @@ class DocParam(Node):
 
 
 class GenToken(UnserializableNode):
+    _interned = True
     value: str
     qa: str | None
     pygmentclass: str
@@ -1236,6 +1249,8 @@ SectionContent: TypeAlias = (
 class Encoder:
     def __init__(self, rev_map: dict[int, Any]) -> None:
         self._rev_map = rev_map
+        # Node type -> (field name, conversion of its decoded value or None).
+        self._fields: dict[Any, list[tuple[str, Any]]] = {}
 
     def encode(self, obj: Any) -> bytes:
         # canonical=True sorts map keys per RFC 8949 §4.2, so the same logical
@@ -1254,28 +1269,43 @@ class Encoder:
     def _type_from_tag(self, tag: Any) -> Any:
         return self._rev_map[tag.tag]
 
+    def _decoded_fields(self, type_: Any) -> list[tuple[str, Any]]:
+        # cbor2 ≥ 6 decodes containers inside tagged values as immutable:
+        # CBOR arrays → tuples (correct: node list fields are now tuple[T, ...])
+        # CBOR maps   → frozendict (not a dict subclass) → convert to dict.
+        fields: list[tuple[str, Any]] = []
+        for k, ann in get_type_hints(type_).items():
+            origin = getattr(ann, "__origin__", None)
+            if origin is None and isinstance(ann, types.UnionType):
+                # ``list[str] | None``
+                origins = {getattr(a, "__origin__", None) for a in ann.__args__}
+                origin = list if list in origins else None
+            if origin is dict:
+                # dict() accepts any mapping.
+                fields.append((k, _to_dict))
+            elif origin is list:
+                # ... and tuples for CBOR arrays, also where a list is declared.
+                fields.append((k, _to_list))
+            else:
+                fields.append((k, None))
+        self._fields[type_] = fields
+        return fields
+
     def _tag_hook(self, *args: Any, **_kwargs: Any) -> Any:
         # cbor2 has shifted calling conventions for tag_hook across major
         # versions: 5.x calls (decoder, tag[, shareable_index]); 6.x calls
         # (tag, immutable) without the decoder. We don't use any of the
         # extras, so just pick the CBORTag out of whichever positional slot
         # it landed in.
-        #
-        # cbor2 ≥ 6 decodes containers inside tagged values as immutable:
-        # CBOR arrays → tuples (correct: node list fields are now tuple[T, ...])
-        # CBOR maps   → frozendict (not a dict subclass) → convert to dict.
         from cbor2 import CBORTag
 
         tag = next(a for a in args if isinstance(a, CBORTag))
         type_ = self._type_from_tag(tag)
-        tt = get_type_hints(type_)
+        fields = self._fields.get(type_) or self._decoded_fields(type_)
         kwds = {}
-        for (k, ann), v in zip(tt.items(), tag.value, strict=False):
-            if getattr(ann, "__origin__", None) is dict and not isinstance(v, dict):
-                # cbor2 ≥ 6 gives frozendict for CBOR maps; dict() accepts any mapping.
-                v = dict(v)
-            kwds[k] = v
-        return type_(**kwds)
+        for (k, convert), v in zip(fields, tag.value, strict=False):
+            kwds[k] = v if convert is None else convert(v)
+        return type_._deserialise(**kwds)
 
     def decode(self, data: bytes) -> Any:
         return cbor2.loads(data, tag_hook=self._tag_hook)
@@ -1286,6 +1316,14 @@ class Encoder:
         return set(range(mi, ma + 2)) - set(k)
 
 
+def _to_dict(v: Any) -> Any:
+    return v if isinstance(v, dict) else dict(v)
+
+
+def _to_list(v: Any) -> Any:
+    return list(v) if isinstance(v, tuple) else v
+
+
 encoder = Encoder(REV_TAG_MAP)
 
 
@@ -18,8 +18,9 @@ from collections.abc import Callable, Iterator
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
+from . import profiling
 from .bundle import IR_SCHEMA_VERSION, PACK_FORMAT_VERSION, Bundle, BundleManifest
-from .node_base import Node
+from .node_base import Interner, Node, interning
 from .nodes import Image, Link, LocalRef, encoder, iter_crossrefs
 from .serde import get_type_hints
 
@@ -31,6 +32,13 @@ log = logging.getLogger("papyri")
 _ALLOWED_TOPLEVEL = {"papyri.json", "toc.json", "module", "docs", "examples", "assets"}
 _OPTIONAL_DIRS = ("docs", "examples", "assets")
 
+# Encodings of the module/, docs/ and examples/ entries of a DocBundle
+# directory (``staging_format``). "json" is indented JSON for humans; "cbor"
+# is the artifact's own ``encoder``, smaller on disk and decoded straight into
+# Nodes. CBOR entries are named ``<key>.cbor`` and papyri.json records the
+# format.
+STAGING_FORMATS = ("json", "cbor")
+
 
 def _safe_child(base: Path, name: str) -> Path:
     """Resolve ``base / name`` and refuse any result that escapes ``base``.
@@ -68,7 +76,7 @@ def _iter_nodes(obj: Any) -> Iterator[Node]:
     """Yield every Node reachable from *obj*, depth-first."""
     if isinstance(obj, Node):
         yield obj
-        for attr in get_type_hints(type(obj)):  # type: ignore[arg-type]
+        for attr in get_type_hints(type(obj)):
             yield from _iter_nodes(getattr(obj, attr))
     elif isinstance(obj, (list, tuple)):
         for item in obj:
@@ -98,6 +106,29 @@ def _assert_safe_urls(bundle: Bundle) -> None:
         )
 
 
+def check_staging_format(staging_format: str) -> None:
+    if staging_format not in STAGING_FORMATS:
+        raise ValueError(
+            f"Unknown staging_format {staging_format!r}. "
+            f"Valid formats: {list(STAGING_FORMATS)}"
+        )
+
+
+def entry_name(kind: str, key: str, staging_format: str) -> str:
+    """File name of the entry ``key`` of the ``kind`` directory (module, docs, examples)."""
+    if staging_format == "cbor":
+        return key + ".cbor"
+    return key + ".json" if kind == "module" else key
+
+
+@profiling.phase("serialize")
+def encode_entry(node: Node, staging_format: str) -> bytes:
+    """Encode a module/, docs/ or examples/ entry of a DocBundle directory."""
+    if staging_format == "cbor":
+        return encoder.encode(node)
+    return node.to_json()
+
+
 def _count_files(d: Path) -> int:
     return sum(1 for e in d.iterdir() if e.is_file()) if d.is_dir() else 0
 
@@ -119,13 +150,31 @@ class BundleError(ValueError):
         super().__init__(f"bundle is not well-formed: {problem}")
 
 
-def _check_layout(path: Path) -> None:
+def read_staging_format(path: Path) -> str:
+    """
+    The ``staging_format`` of the DocBundle directory ``path``, as recorded
+    in its papyri.json ("json" when it records none).
+    """
+    try:
+        raw: Any = json.loads((path / "papyri.json").read_text())
+    except Exception:
+        return "json"  # _read_meta reports it.
+    fmt = raw.get("staging_format", "json") if isinstance(raw, dict) else "json"
+    if fmt not in STAGING_FORMATS:
+        raise BundleError(f"papyri.json has unknown staging_format {fmt!r}")
+    return str(fmt)
+
+
+def _check_layout(path: Path) -> str:
+    """Check the layout of a DocBundle directory; return its staging format."""
     if not path.is_dir():
         raise BundleError(f"{path} is not a directory")
 
     meta_path = path / "papyri.json"
     if not meta_path.is_file():
         raise BundleError("missing papyri.json")
+    fmt = read_staging_format(path)
+    suffix = "." + fmt
 
     module_dir = path / "module"
     if not module_dir.is_dir():
@@ -133,8 +182,8 @@ def _check_layout(path: Path) -> None:
     for entry in module_dir.iterdir():
         if not entry.is_file():
             raise BundleError(f"module/{entry.name} is not a regular file")
-        if entry.suffix != ".json":
-            raise BundleError(f"module/{entry.name} does not have .json suffix")
+        if entry.suffix != suffix:
+            raise BundleError(f"module/{entry.name} does not have {suffix} suffix")
 
     for sub in _OPTIONAL_DIRS:
         d = path / sub
@@ -145,10 +194,13 @@ def _check_layout(path: Path) -> None:
         for entry in d.iterdir():
             if not entry.is_file():
                 raise BundleError(f"{sub}/{entry.name} is not a regular file")
+            if fmt == "cbor" and sub != "assets" and entry.suffix != suffix:
+                raise BundleError(f"{sub}/{entry.name} does not have {suffix} suffix")
 
     for entry in path.iterdir():
         if entry.name not in _ALLOWED_TOPLEVEL:
             raise BundleError(f"unexpected top-level entry: {entry.name}")
+    return fmt
 
 
 def _read_meta(path: Path) -> BundleManifest:
@@ -156,6 +208,11 @@ def _read_meta(path: Path) -> BundleManifest:
         raw: Any = json.loads((path / "papyri.json").read_text())
     except Exception as exc:
         raise BundleError(f"papyri.json is not valid JSON: {exc}") from exc
+    return manifest_from_meta(raw)
+
+
+def manifest_from_meta(raw: Any) -> BundleManifest:
+    """The ``BundleManifest`` of the papyri.json content ``raw``."""
     if not isinstance(raw, dict):
         raise BundleError("papyri.json is not a JSON object")
     for key in ("module", "version"):
@@ -164,7 +221,16 @@ def _read_meta(path: Path) -> BundleManifest:
         if not isinstance(raw[key], str):
             raise BundleError(f"papyri.json[{key!r}] is not a string")
 
-    known = {"module", "version", "summary", "github_slug", "tag", "logo", "aliases"}
+    known = {
+        "module",
+        "version",
+        "summary",
+        "github_slug",
+        "tag",
+        "logo",
+        "aliases",
+        "staging_format",
+    }
     extra: dict[str, str] = {
         k: str(v)
         for k, v in raw.items()
@@ -183,24 +249,23 @@ def _read_meta(path: Path) -> BundleManifest:
 
 
 def _decode_dir(
-    path: Path, expected_type: type[Node], strip_suffix: str = ""
+    path: Path,
+    expected_type: type[Node],
+    strip_suffix: str = "",
+    fmt: str = "json",
+    interner: Interner | None = None,
 ) -> dict[str, Any]:
     out: dict[str, Any] = {}
     if not path.is_dir():
         return out
+    if fmt == "cbor":
+        strip_suffix = ".cbor"
     for entry in sorted(path.iterdir()):
         if not entry.is_file():
             continue
-        try:
-            value = expected_type.from_dict(json.loads(entry.read_bytes()))
-        except Exception as exc:
-            raise BundleError(
-                f"{path.name}/{entry.name} failed to decode: {exc}"
-            ) from exc
-        if not isinstance(value, expected_type):
-            raise BundleError(
-                f"{path.name}/{entry.name} decoded to "
-                f"{type(value).__name__}, expected {expected_type.__name__}"
+        with interning(interner):
+            value = decode_entry(
+                entry.read_bytes(), expected_type, fmt, f"{path.name}/{entry.name}"
             )
         key = entry.name
         if strip_suffix and key.endswith(strip_suffix):
@@ -209,6 +274,25 @@ def _decode_dir(
     return out
 
 
+def decode_entry(
+    data: bytes, expected_type: type[Node], staging_format: str, name: str
+) -> Any:
+    """Decode the module/, docs/ or examples/ entry ``name`` of a DocBundle."""
+    try:
+        if staging_format == "cbor":
+            value = encoder.decode(data)
+        else:
+            value = expected_type.from_dict(json.loads(data))
+    except Exception as exc:
+        raise BundleError(f"{name} failed to decode: {exc}") from exc
+    if not isinstance(value, expected_type):
+        raise BundleError(
+            f"{name} decoded to {type(value).__name__}, "
+            f"expected {expected_type.__name__}"
+        )
+    return value
+
+
 def _check_toc_refs(bundle: Bundle) -> None:
     """Every toc entry must point at a document present in the bundle.
 
@@ -381,7 +465,10 @@ def _check_orphan_docs(bundle: Bundle) -> None:
 
 
 def read_bundle_dir(
-    path: Path, log: Callable[[str], None] | None = None, strict: bool = False
+    path: Path,
+    log: Callable[[str], None] | None = None,
+    strict: bool = False,
+    revalidate: bool = True,
 ) -> Bundle:
     """Read a DocBundle directory and construct a typed ``Bundle``.
 
@@ -391,22 +478,32 @@ def read_bundle_dir(
 
     If ``strict=True``, orphan narrative docs (present in the bundle but not
     reachable from any toc entry) are treated as hard errors instead of warnings.
+
+    ``revalidate=False`` skips type-checking the decoded tree with
+    ``Node.validate()``, for a directory that ``papyri gen`` just wrote: gen
+    validates every document before writing it, and the decoders give each
+    field its annotated type.
     """
     from .doc import GeneratedDoc
     from .nodes import Section, TocTree
 
     if log:
         log("  checking layout …")
-    _check_layout(path)
+    fmt = _check_layout(path)
     manifest = _read_meta(path)
     if log:
         log(f"  metadata: module={manifest.module!r}, version={manifest.version!r}")
 
+    # Nothing edits the decoded documents, so their repeated leaves can
+    # share one object each.
+    interner = Interner()
     module_dir = path / "module"
     if log:
         n = _count_files(module_dir)
         log(f"  decoding module/   ({n} item{_plural(n)}) …")
-    api = _decode_dir(module_dir, GeneratedDoc, strip_suffix=".json")
+    api = _decode_dir(
+        module_dir, GeneratedDoc, strip_suffix=".json", fmt=fmt, interner=interner
+    )
 
     docs_dir = path / "docs"
     if log:
@@ -416,7 +513,7 @@ def read_bundle_dir(
             if n
             else "  docs/     (none)"
         )
-    narrative = _decode_dir(docs_dir, GeneratedDoc)
+    narrative = _decode_dir(docs_dir, GeneratedDoc, fmt=fmt, interner=interner)
 
     examples_dir = path / "examples"
     if log:
@@ -426,7 +523,12 @@ def read_bundle_dir(
             if n
             else "  examples/ (none)"
         )
-    examples = _decode_dir(examples_dir, Section)
+    examples = _decode_dir(examples_dir, Section, fmt=fmt, interner=interner)
+    if log:
+        log(
+            f"  shared leaf nodes: {interner.kept.total()} kept of "
+            f"{interner.seen.total()} ({interner.ratio:.1f}x)"
+        )
 
     assets: dict[str, bytes] = {}
     assets_dir = path / "assets"
@@ -450,6 +552,35 @@ def read_bundle_dir(
         except Exception as exc:
             raise BundleError(f"toc.json failed to decode: {exc}") from exc
 
+    return assemble_bundle(
+        manifest,
+        api=api,
+        narrative=narrative,
+        examples=examples,
+        assets=assets,
+        toc=toc,
+        strict=strict,
+        revalidate=revalidate,
+    )
+
+
+def assemble_bundle(
+    manifest: BundleManifest,
+    *,
+    api: dict[str, Any],
+    narrative: dict[str, Any],
+    examples: dict[str, Any],
+    assets: dict[str, bytes],
+    toc: tuple[TocTree, ...],
+    strict: bool = False,
+    revalidate: bool = True,
+) -> Bundle:
+    """Build the ``Bundle`` of a DocBundle's parts and run the pack checks.
+
+    Shared by ``read_bundle_dir`` and ``papyri gen --artifact``, which skips
+    the staging directory; ``strict`` and ``revalidate`` are as for
+    ``read_bundle_dir``.
+    """
     bundle = Bundle(
         pack_format_version=PACK_FORMAT_VERSION,
         ir_schema_version=IR_SCHEMA_VERSION,
@@ -467,7 +598,8 @@ def read_bundle_dir(
         assets=assets,
         toc=toc,
     )
-    bundle.validate()
+    if revalidate:
+        bundle.validate()
     _check_toc_refs(bundle)
     _check_local_refs(bundle, strict=strict)
     if strict:
@@ -496,21 +628,26 @@ def make_artifact(bundle: Bundle, log: Callable[[str], None] | None = None) -> b
 
 
 def make_artifact_from_dir(
-    path: Path, log: Callable[[str], None] | None = None, strict: bool = False
+    path: Path,
+    log: Callable[[str], None] | None = None,
+    strict: bool = False,
+    revalidate: bool = True,
 ) -> tuple[bytes, Bundle]:
     """Validate and pack a DocBundle directory. Returns (artifact_bytes, bundle).
 
     If ``strict=True``, dangling local refs and orphan narrative docs are
-    treated as hard errors instead of warnings.
+    treated as hard errors instead of warnings; ``revalidate`` is as for
+    ``read_bundle_dir``.
     """
-    bundle = read_bundle_dir(path, log=log, strict=strict)
+    bundle = read_bundle_dir(path, log=log, strict=strict, revalidate=revalidate)
     return make_artifact(bundle, log=log), bundle
 
 
 def load_artifact(data: bytes) -> Bundle:
     """Inverse of ``make_artifact``: gunzip + decode to a ``Bundle``."""
     cbor_bytes = gzip.decompress(data)
-    obj = encoder.decode(cbor_bytes)
+    with interning():
+        obj = encoder.decode(cbor_bytes)
     if not isinstance(obj, Bundle):
         raise ValueError(
             f"artifact did not decode to a Bundle (got {type(obj).__name__})"
@@ -518,7 +655,7 @@ def load_artifact(data: bytes) -> Bundle:
     return obj
 
 
-def _manifest_dict(bundle: Bundle) -> dict[str, Any]:
+def _manifest_dict(bundle: Bundle, staging_format: str = "json") -> dict[str, Any]:
     """Reconstruct the ``papyri.json`` manifest from a ``Bundle``.
 
     Inverse of ``_read_meta``: required keys are always present, optional
@@ -537,18 +674,25 @@ def _manifest_dict(bundle: Bundle) -> dict[str, Any]:
     if bundle.aliases:
         meta["aliases"] = dict(bundle.aliases)
     meta.update(bundle.extra)
+    if staging_format != "json":
+        meta["staging_format"] = staging_format
     return meta
 
 
 def explode_bundle_to_dir(
-    bundle: Bundle, path: Path, log: Callable[[str], None] | None = None
+    bundle: Bundle,
+    path: Path,
+    log: Callable[[str], None] | None = None,
+    staging_format: str = "json",
 ) -> None:
-    """Write a ``Bundle`` out as a JSON DocBundle staging directory.
+    """Write a ``Bundle`` out as a DocBundle staging directory.
 
-    Inverse of ``read_bundle_dir``: produces the same human-readable layout
-    that ``papyri gen`` writes (``papyri.json``, ``toc.json``, ``module/``,
-    ``docs/``, ``examples/``, ``assets/``). ``path`` must not already exist.
+    Inverse of ``read_bundle_dir``: produces the same layout that ``papyri
+    gen`` writes (``papyri.json``, ``toc.json``, ``module/``, ``docs/``,
+    ``examples/``, ``assets/``), with entries in ``staging_format`` (JSON by
+    default, for humans). ``path`` must not already exist.
     """
+    check_staging_format(staging_format)
     if path.exists():
         raise BundleError(f"{path} already exists")
     path.mkdir(parents=True)
@@ -558,7 +702,9 @@ def explode_bundle_to_dir(
     module_dir = path / "module"
     module_dir.mkdir()
     for qa, doc in bundle.api.items():
-        _safe_child(module_dir, f"{qa}.json").write_bytes(doc.to_json())
+        _safe_child(module_dir, entry_name("module", qa, staging_format)).write_bytes(
+            encode_entry(doc, staging_format)
+        )
 
     if bundle.narrative:
         if log:
@@ -567,7 +713,9 @@ def explode_bundle_to_dir(
         docs_dir = path / "docs"
         docs_dir.mkdir()
         for name, doc in bundle.narrative.items():
-            _safe_child(docs_dir, name).write_bytes(doc.to_json())
+            _safe_child(docs_dir, entry_name("docs", name, staging_format)).write_bytes(
+                encode_entry(doc, staging_format)
+            )
 
     if bundle.examples:
         if log:
@@ -576,7 +724,9 @@ def explode_bundle_to_dir(
         examples_dir = path / "examples"
         examples_dir.mkdir()
         for name, section in bundle.examples.items():
-            _safe_child(examples_dir, name).write_bytes(section.to_json())
+            _safe_child(
+                examples_dir, entry_name("examples", name, staging_format)
+            ).write_bytes(encode_entry(section, staging_format))
 
     if bundle.assets:
         if log:
@@ -599,14 +749,18 @@ def explode_bundle_to_dir(
     if log:
         log("  writing papyri.json …")
     (path / "papyri.json").write_text(
-        json.dumps(_manifest_dict(bundle), indent=2, sort_keys=True)
+        json.dumps(_manifest_dict(bundle, staging_format), indent=2, sort_keys=True)
     )
 
 
 def explode_artifact_to_dir(
-    artifact: Path, dest_parent: Path, log: Callable[[str], None] | None = None
+    artifact: Path,
+    dest_parent: Path,
+    log: Callable[[str], None] | None = None,
+    staging_format: str = "json",
 ) -> Path:
-    """Load a ``.papyri`` artifact and explode it into a JSON DocBundle dir.
+    """Load a ``.papyri`` artifact, or read a DocBundle directory, and explode
+    it into a DocBundle directory with entries in ``staging_format``.
 
     The bundle directory is named ``<module>_<version>`` (matching the
     ``papyri gen`` convention) and created under ``dest_parent``. Returns the
@@ -614,9 +768,12 @@ def explode_artifact_to_dir(
     """
     if log:
         log(f"  loading {artifact.name} …")
-    bundle = load_artifact(artifact.read_bytes())
+    if artifact.is_dir():
+        bundle = read_bundle_dir(artifact, log=log)
+    else:
+        bundle = load_artifact(artifact.read_bytes())
     out_dir = _safe_child(dest_parent, f"{bundle.module}_{bundle.version}")
-    explode_bundle_to_dir(bundle, out_dir, log=log)
+    explode_bundle_to_dir(bundle, out_dir, log=log, staging_format=staging_format)
     return out_dir
 
 
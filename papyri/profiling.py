@@ -0,0 +1,279 @@
+"""Wall and CPU time accounting of ``papyri gen`` phases (``--profile``).
+
+Work is attributed to named phases with ``phase``, used as a context manager
+or decorator around the code that does it (numpydoc parsing, tree-sitter
+parsing, example execution, ...). Phases nest, and time is charged
+exclusively: while a nested phase runs, its enclosing phase is paused, so the
+phase totals add up to the time spent in the outermost one. Accounting is
+always on; it costs a couple of clock reads per phase.
+
+Per-phase totals accumulate in ``PHASE_STATS`` (``"<phase>.wall_ns"``,
+``"<phase>.cpu_ns"``, ``"<phase>.calls"``), which ``gen`` aggregates across
+``--jobs`` and example workers like its other per-process counters, so the
+time of one object or document is the increment over its build.
+``build_report`` and ``format_report`` turn them into the ``--profile``
+report.
+
+``MemoryTracker`` adds the opt-in ``--memory`` section of that report: RSS
+and ``tracemalloc`` samples taken at the boundaries of gen's passes.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+from .utils import current_rss_mib, peak_rss_mib
+
+# Phases in report order, with what they cover.
+PHASES = {
+    "collect": "importing the package and collecting objects",
+    "numpydoc": "numpydoc docstring parsing",
+    "tree-sitter": "tree-sitter RST parsing",
+    "exec": "executing examples",
+    "jedi": "tokenizing examples and Jedi inference",
+    "figures": "rendering captured figures",
+    "visit": "GenVisitor",
+    "serialize": "JSON serialization",
+    "write": "writing the bundle",
+    "pack": "validating and encoding the artifact (--artifact)",
+    "other": "everything else",
+}
+
+PHASE_STATS: Counter[str] = Counter()
+
+
+class _State(threading.local):
+    def __init__(self) -> None:
+        self.stack: list[str] = []
+        self.wall = 0
+        self.cpu = 0
+
+
+_STATE = _State()
+
+
+def checkpoint() -> None:
+    """Charge the time since the last phase boundary to the current phase."""
+    state = _STATE
+    wall, cpu = time.perf_counter_ns(), time.thread_time_ns()
+    if state.stack:
+        name = state.stack[-1]
+        PHASE_STATS[f"{name}.wall_ns"] += wall - state.wall
+        PHASE_STATS[f"{name}.cpu_ns"] += cpu - state.cpu
+    state.wall, state.cpu = wall, cpu
+
+
+@contextlib.contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Attribute the time spent in the block (or function) to ``name``."""
+    checkpoint()
+    _STATE.stack.append(name)
+    PHASE_STATS[f"{name}.calls"] += 1
+    try:
+        yield
+    finally:
+        checkpoint()
+        _STATE.stack.pop()
+
+
+def absorb(increments: Mapping[str, int]) -> None:
+    """
+    Count the phase times of work done by another process as this one's.
+
+    The wall time this process spent waiting for it is not charged again to
+    the current phase (as far as it has elapsed since the last boundary).
+    """
+    PHASE_STATS.update(increments)
+    waited = sum(v for k, v in increments.items() if k.endswith(".wall_ns"))
+    state = _STATE
+    state.wall = min(time.perf_counter_ns(), state.wall + waited)
+
+
+def _mib(n: float | None) -> float | None:
+    return None if n is None else round(n, 3)
+
+
+class MemoryTracker:
+    """
+    Samples memory at the boundaries of gen's passes (``--memory``).
+
+    Each ``sample`` records the current and peak RSS, the memory traced by
+    ``tracemalloc`` and its peak since the previous sample, and the ``top``
+    source lines whose allocations grew the most since then. Tracing slows
+    gen down noticeably, so a disabled tracker does nothing. Forked workers
+    inherit tracing but are not sampled; only their peak RSS is reported.
+    """
+
+    def __init__(self, enabled: bool, top: int = 10) -> None:
+        self.enabled = enabled
+        self.top = top
+        self.samples: list[dict[str, Any]] = []
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._traced = 0
+        self._rss: float | None = None
+        if enabled:
+            tracemalloc.start()
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            ]
+        )
+
+    def sample(self, label: str) -> None:
+        """Record the memory used by the pass that just ended as ``label``."""
+        if not self.enabled:
+            return
+        snapshot = self._take_snapshot()
+        traced, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        rss = current_rss_mib()
+        growth = (
+            snapshot.compare_to(self._snapshot, "lineno")
+            if self._snapshot is not None
+            else snapshot.statistics("lineno")
+        )
+        self.samples.append(
+            {
+                "after": label,
+                "rss_mib": _mib(rss),
+                "rss_growth_mib": _mib(
+                    None if rss is None or self._rss is None else rss - self._rss
+                ),
+                "peak_rss_mib": _mib(peak_rss_mib()),
+                "traced_mib": _mib(traced / 2**20),
+                "traced_growth_mib": _mib((traced - self._traced) / 2**20),
+                "traced_peak_mib": _mib(traced_peak / 2**20),
+                "top_growth": [
+                    {
+                        "site": str(stat.traceback),
+                        "size_kib": round(
+                            getattr(stat, "size_diff", stat.size) / 1024, 1
+                        ),
+                        "count": getattr(stat, "count_diff", stat.count),
+                    }
+                    for stat in growth[: self.top]
+                ],
+            }
+        )
+        self._snapshot, self._traced, self._rss = snapshot, traced, rss
+
+    def stop(self) -> dict[str, Any] | None:
+        """Stop tracing; return the report section, or None if disabled."""
+        if not self.enabled:
+            return None
+        top = self._snapshot.statistics("lineno") if self._snapshot else []
+        tracemalloc.stop()
+        self.enabled = False
+        return {
+            "samples": self.samples,
+            "peak_rss_mib": _mib(peak_rss_mib()),
+            "workers_peak_rss_mib": _mib(peak_rss_mib(children=True)),
+            "top_allocators": [
+                {
+                    "site": str(stat.traceback),
+                    "size_kib": round(stat.size / 1024, 1),
+                    "count": stat.count,
+                }
+                for stat in top[: self.top]
+            ],
+        }
+
+
+def _seconds(stats: Mapping[str, int], name: str, kind: str) -> float:
+    return round(stats.get(f"{name}.{kind}_ns", 0) / 1e9, 6)
+
+
+def _total(stats: Mapping[str, int], kind: str) -> float:
+    return round(sum(v for k, v in stats.items() if k.endswith(f".{kind}_ns")) / 1e9, 6)
+
+
+def build_report(
+    phases: Mapping[str, int],
+    objects: Mapping[str, Mapping[str, int]],
+    *,
+    wall_ns: int,
+    **extra: Any,
+) -> dict[str, Any]:
+    """
+    The ``--profile`` report: wall-clock time of the build, phase totals
+    (summed over worker processes with ``--jobs``), and every object's time
+    per phase, slowest first. ``extra`` entries are added as is.
+    """
+    names = [*PHASES, *sorted({k.rsplit(".", 1)[0] for k in phases} - set(PHASES))]
+    slowest = sorted(objects, key=lambda qa: (-_total(objects[qa], "wall"), qa))
+    return {
+        "wall_s": round(wall_ns / 1e9, 6),
+        "phases": {
+            name: {
+                "wall_s": _seconds(phases, name, "wall"),
+                "cpu_s": _seconds(phases, name, "cpu"),
+                "calls": phases.get(f"{name}.calls", 0),
+            }
+            for name in names
+            if phases.get(f"{name}.calls")
+        },
+        "objects": {
+            qa: {
+                "wall_s": _total(objects[qa], "wall"),
+                "cpu_s": _total(objects[qa], "cpu"),
+                "phases": {
+                    name: _seconds(objects[qa], name, "wall")
+                    for name in names
+                    if objects[qa].get(f"{name}.wall_ns")
+                },
+            }
+            for qa in slowest
+        },
+        **extra,
+    }
+
+
+def format_report(report: Mapping[str, Any], top: int) -> str:
+    """Phase totals and the ``top`` slowest objects of ``report`` as tables."""
+    lines = [f"{'phase':<12} {'wall s':>9} {'cpu s':>9} {'calls':>8}"]
+    for name, p in report["phases"].items():
+        lines.append(
+            f"{name:<12} {p['wall_s']:>9.3f} {p['cpu_s']:>9.3f} {p['calls']:>8}"
+        )
+    objects = list(report["objects"].items())[:top]
+    if objects:
+        lines += ["", f"{'wall s':>9} {'cpu s':>9}  {'slowest phases':<40} object"]
+        for qa, o in objects:
+            slowest = sorted(o["phases"].items(), key=lambda kv: -kv[1])[:3]
+            breakdown = ", ".join(f"{name} {s:.2f}" for name, s in slowest)
+            lines.append(
+                f"{o['wall_s']:>9.3f} {o['cpu_s']:>9.3f}  {breakdown:<40} {qa}"
+            )
+    memory = report.get("memory")
+    if memory:
+        lines += [
+            "",
+            f"{'after':<12} {'rss MiB':>9} {'growth':>9} {'traced':>9} "
+            f"{'growth':>9} {'peak':>9}  largest growth",
+        ]
+        for m in memory["samples"]:
+            site = m["top_growth"][0] if m["top_growth"] else None
+            largest = f"{site['size_kib']:+.0f} KiB {site['site']}" if site else ""
+            lines.append(
+                f"{m['after']:<12} {_fmt(m['rss_mib'])} {_fmt(m['rss_growth_mib'])} "
+                f"{_fmt(m['traced_mib'])} {_fmt(m['traced_growth_mib'])} "
+                f"{_fmt(m['traced_peak_mib'])}  {largest}"
+            )
+        lines.append(
+            f"peak RSS {_fmt(memory['peak_rss_mib']).strip()} MiB, "
+            f"largest worker {_fmt(memory['workers_peak_rss_mib']).strip()} MiB"
+        )
+    return "\n".join(lines)
+
+
+def _fmt(mib: float | None) -> str:
+    return f"{'?':>9}" if mib is None else f"{mib:>9.1f}"
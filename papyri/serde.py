@@ -65,6 +65,7 @@ either 2 Authors or 2 Reviewers.
 """
 
 import types
+from collections.abc import Callable
 from functools import lru_cache
 from typing import Any, ClassVar, Union, get_origin
 from typing import get_type_hints as gth
@@ -232,7 +233,7 @@ def deserialize(type_: Any, annotation: Any, data: Any) -> Any:
                 k: deserialize(value_annotation, value_annotation, x)
                 for k, x in data.items()
             }
-        elif (type(annotation) is type) and annotation.__module__ not in (
+        elif isinstance(annotation, type) and annotation.__module__ not in (
             "builtins",
             "typing",
         ):
@@ -256,3 +257,146 @@ def deserialize(type_: Any, annotation: Any, data: Any) -> Any:
     except Exception as e:
         e.add_note(f"Deserializing {type_}, {annotation}")
         raise
+
+
+_DESERIALIZERS: dict[Any, Callable[[Any], Any]] = {}
+
+
+def deserializer_for(annotation: Any) -> Callable[[Any], Any]:
+    """
+    A function returning ``deserialize(annotation, annotation, data)``,
+    compiled for ``annotation`` on first use.
+
+    Classes get their field list and constructor looked up once, unions a
+    table from tag to member; data the compiled function does not expect is
+    handed to ``deserialize``, which raises as before.
+    """
+    try:
+        return _DESERIALIZERS[annotation]
+    except KeyError:
+        pass
+    except TypeError:
+        return lambda data: deserialize(annotation, annotation, data)
+    function = _compile(annotation)
+    _DESERIALIZERS[annotation] = function
+    return function
+
+
+def _identity(data: Any) -> Any:
+    return data
+
+
+def _compile(annotation: Any) -> Callable[[Any], Any]:
+    def fallback(data: Any) -> Any:
+        return deserialize(annotation, annotation, data)
+
+    if annotation is str or annotation is int or annotation is bool:
+        return _identity
+    orig = getattr(annotation, "__origin__", None)
+    if _is_union(annotation):
+        args = _union_args(annotation)
+        if len(args) == 2 and args[1] == type(None):
+            inner = deserializer_for(args[0])
+            return lambda data: None if data is None else inner(data)
+        return _compile_union(args, fallback)
+    if orig is tuple or orig is list:
+        item = deserializer_for(annotation.__args__[0])
+        container = orig
+
+        def deserialize_sequence(data: Any) -> Any:
+            if data is None:
+                return None
+            return container(item(x) for x in data)
+
+        return deserialize_sequence
+    if orig is dict:
+        item = deserializer_for(annotation.__args__[1])
+
+        def deserialize_mapping(data: Any) -> Any:
+            if data is None:
+                return None
+            return {k: item(x) for k, x in data.items()}
+
+        return deserialize_mapping
+    if isinstance(annotation, type) and annotation.__module__ not in (
+        "builtins",
+        "typing",
+    ):
+        return _compile_class(annotation)
+    return fallback
+
+
+def _compile_union(
+    args: tuple[Any, ...], fallback: Callable[[Any], Any]
+) -> Callable[[Any], Any]:
+    # Tag -> (deserializer, whether the tag has to be dropped from the data
+    # first), filled in as tags are met.
+    members: dict[str, tuple[Callable[[Any], Any], bool]] = {}
+
+    def deserialize_union(data: Any) -> Any:
+        if data is None:
+            return None
+        try:
+            tag = data["type"]
+            inner, drop_tag = members[tag]
+        except (TypeError, KeyError):
+            member = _union_member(args, data)
+            if member is None:
+                return fallback(data)
+            inner, drop_tag = members[data["type"]] = member
+        if "data" in data:
+            return inner(data["data"])
+        if drop_tag:
+            return inner({k: v for k, v in data.items() if k != "type"})
+        return inner(data)
+
+    return deserialize_union
+
+
+def _union_member(
+    args: tuple[Any, ...], data: Any
+) -> tuple[Callable[[Any], Any], bool] | None:
+    """The member of a union ``deserialize`` picks for ``data``, if any."""
+    if not isinstance(data, dict) or not isinstance(data.get("type"), str):
+        return None
+    tag = data["type"]
+    real_type = [t for t in args if t.__name__ == tag]
+    if not real_type and tag:
+        candidate = f"{tag[0].upper()}{tag[1:]}"
+        real_type = [
+            t
+            for t in args
+            if (t.__name__ == candidate) or (getattr(t, "type", None) == tag)
+        ]
+    if len(real_type) != 1:
+        return None
+    (member,) = real_type
+    # Class deserializers only read the fields they know of: the tag can
+    # stay in the data unless it is one of them.
+    keep_tag = (
+        isinstance(member, type)
+        and member.__module__ not in ("builtins", "typing")
+        and "type" not in get_type_hints(member)
+    )
+    return deserializer_for(member), not keep_tag
+
+
+def _compile_class(cls: type) -> Callable[[Any], Any]:
+    # Resolved at the first call, once every class the annotations name is
+    # defined.
+    fields: list[tuple[str, Callable[[Any], Any]]] | None = None
+    make: Callable[..., Any] = getattr(cls, "_deserialise", cls)
+
+    def deserialize_class(data: Any) -> Any:
+        nonlocal fields
+        if data is None:
+            return None
+        if fields is None:
+            fields = [(k, deserializer_for(v)) for k, v in get_type_hints(cls).items()]
+        try:
+            return make(**{k: field(data[k]) for k, field in fields})
+        except Exception as e:
+            e.add_note(f"Deserializing {cls}, {cls}")
+            raise
+
+    return deserialize_class
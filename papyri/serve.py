@@ -0,0 +1,368 @@
+"""``papyri gen --serve``: a long-lived gen answering requests on a local socket.
+
+Starting ``papyri gen`` pays for importing the package, warming up Jedi and
+matplotlib every time. In serve mode the ``Gen`` that ran the initial build
+(which may be empty: ``--no-api --no-narrative --no-examples``) stays alive
+and regenerates single documents into its bundle on request, reusing the
+imported modules, the collected objects and its caches.
+
+The protocol is JSON-RPC 2.0 over a Unix stream socket: one request (or
+batch) per line, answered by one line. Methods:
+
+``generate_object(qualname, reload=False)``
+    Document one API object, re-importing its module first with ``reload``.
+``generate_narrative(path)``
+    Rebuild the narrative docs after ``path`` (relative to ``docs_path``)
+    changed; with ``cache`` only the documents depending on it are visited.
+``generate_example(name)``
+    Execute and render the example file ``name`` of ``examples_folder``.
+``status()``
+    Package, bundle, pending requests and per-method latencies.
+``shutdown()``
+    Stop serving once the pending requests are answered.
+
+Generation results carry the path of the document written and the
+diagnostics it raised. ``Gen`` is not thread-safe, so requests are generated
+one at a time; up to ``max_pending`` of them wait for their turn, further
+ones are refused as busy (``status`` is always answered, between two
+generations).
+
+The server is a single-threaded ``selectors`` loop on the thread that owns
+the ``Gen``: generating forks example workers and ``--jobs`` pools, and
+forking a process with other threads running can deadlock the child.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import inspect
+import json
+import os
+import selectors
+import socket
+import time
+from collections import Counter, defaultdict, deque
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .error_collector import Diagnostics
+from .utils import peak_rss_mib
+
+if TYPE_CHECKING:
+    from .gen import Gen
+
+# JSON-RPC 2.0 error codes, and ours for a full queue.
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+SERVER_BUSY = -32000
+
+# Requests whose latencies ``status`` summarizes, per method.
+LATENCY_WINDOW = 1000
+
+
+class RPCError(Exception):
+    """A JSON-RPC error, raised by methods and by ``call`` on the client side."""
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _percentile(values: list[float], q: float) -> float:
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class GenServer:
+    """The request handling of ``--serve``, around the ``Gen`` of a build."""
+
+    def __init__(self, g: Gen, bundle: Path, *, max_pending: int = 8) -> None:
+        self.g = g
+        self.bundle = bundle
+        self.max_pending = max_pending
+        self.started = time.monotonic()
+        # Requests queued for the Gen, as counted by ``serve``.
+        self.pending = 0
+        self.counts: Counter[str] = Counter()
+        self.latencies: defaultdict[str, deque[float]] = defaultdict(
+            lambda: deque(maxlen=LATENCY_WINDOW)
+        )
+        self._stopping = False
+        self.methods: dict[str, Callable[..., Any]] = {
+            "generate_object": self.generate_object,
+            "generate_narrative": self.generate_narrative,
+            "generate_example": self.generate_example,
+            "status": self.status,
+            "shutdown": self.shutdown,
+        }
+        # Methods that use the Gen, one at a time.
+        self._exclusive = {"generate_object", "generate_narrative", "generate_example"}
+
+    def _uses_gen(self, line: bytes) -> bool:
+        """Whether the request line calls a method that uses the Gen."""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return False
+        requests = request if isinstance(request, list) else [request]
+        return any(
+            isinstance(r, dict) and r.get("method") in self._exclusive for r in requests
+        )
+
+    # -- protocol ---------------------------------------------------------
+
+    def handle_line(self, line: bytes) -> bytes | None:
+        """The response line to a request line, or None for notifications."""
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            response: Any = _error(None, PARSE_ERROR, f"invalid JSON: {e}")
+        else:
+            if isinstance(request, list) and request:
+                response = [r for r in map(self.handle, request) if r is not None]
+                response = response or None
+            else:
+                response = self.handle(request)
+        if response is None:
+            return None
+        return json.dumps(response).encode() + b"\n"
+
+    def handle(self, request: Any) -> dict[str, Any] | None:
+        """Run one JSON-RPC request; return its response (None if notified)."""
+        if not (
+            isinstance(request, dict)
+            and request.get("jsonrpc") == "2.0"
+            and isinstance(request.get("method"), str)
+            and isinstance(request.get("params", []), list | dict)
+        ):
+            return _error(None, INVALID_REQUEST, "not a JSON-RPC 2.0 request")
+        id_ = request.get("id")
+        method = request["method"]
+        params = request.get("params", [])
+        start = time.perf_counter()
+        try:
+            result = self._dispatch(method, params)
+        except RPCError as e:
+            response = _error(id_, e.code, e.message)
+        except Exception as e:
+            self.g.log.exception("Request %s failed", method)
+            response = _error(id_, INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+        else:
+            response = {"jsonrpc": "2.0", "id": id_, "result": result}
+        elapsed = time.perf_counter() - start
+        if method in self.methods:
+            failed = "error" in response
+            self.counts[f"{method}.{'errors' if failed else 'ok'}"] += 1
+            self.latencies[method].append(elapsed)
+            self.g.log.info(
+                "%s %s: %s in %.3fs",
+                method,
+                json.dumps(params),
+                response["error"]["message"] if failed else "ok",
+                elapsed,
+            )
+        return response if "id" in request else None
+
+    def _dispatch(self, method: str, params: list[Any] | dict[str, Any]) -> Any:
+        function = self.methods.get(method)
+        if function is None:
+            raise RPCError(METHOD_NOT_FOUND, f"unknown method {method!r}")
+        try:
+            if isinstance(params, dict):
+                inspect.signature(function).bind(**params)
+            else:
+                inspect.signature(function).bind(*params)
+        except TypeError as e:
+            raise RPCError(INVALID_PARAMS, str(e)) from None
+
+        def run() -> Any:
+            if isinstance(params, dict):
+                return function(**params)
+            return function(*params)
+
+        if method not in self._exclusive:
+            return run()
+        # ``serve`` runs queued requests with room left in the queue, and
+        # answers those it could not queue right away.
+        if self.pending >= self.max_pending:
+            raise RPCError(
+                SERVER_BUSY,
+                f"busy: {self.pending} request(s) pending, try again later",
+            )
+        self.g.diagnostics = Diagnostics(self.g.diagnostics.config, self.g.log)
+        return run()
+
+    # -- methods ----------------------------------------------------------
+
+    def _result(self, path: Path | None, **extra: Any) -> dict[str, Any]:
+        return {
+            "path": None if path is None else str(path),
+            **extra,
+            "diagnostics": self.g.diagnostics.records,
+        }
+
+    def generate_object(self, qualname: str, reload: bool = False) -> dict[str, Any]:
+        g = self.g
+        objects = g.api_objects()
+        if reload:
+            module = qualname.partition(":")[0]
+            if module not in objects:
+                raise RPCError(INVALID_PARAMS, f"unknown module {module!r}")
+            _, gone = g.reload_modules([module])
+            for qa in gone:
+                g.bundle_entry(self.bundle, "module", qa).unlink(missing_ok=True)
+        if qualname not in objects:
+            raise RPCError(INVALID_PARAMS, f"unknown qualname {qualname!r}")
+        g.data = {}
+        g.collect_api_docs(g.root, limit_to=[qualname])
+        g.partial_write(self.bundle)
+        return self._result(g.bundle_entry(self.bundle, "module", qualname))
+
+    def generate_narrative(self, path: str) -> dict[str, Any]:
+        g = self.g
+        if not g.config.docs_path:
+            raise RPCError(INVALID_PARAMS, "docs_path is not configured")
+        root = Path(g.config.docs_path).expanduser().resolve()
+        source = (root / path).resolve()
+        if not source.is_relative_to(root) or source.suffix != ".rst":
+            raise RPCError(INVALID_PARAMS, f"not an .rst file under {root}: {path}")
+        g.rewrite_narrative(self.bundle)
+        key = ":".join(source.relative_to(root).parts)[:-4]
+        if key not in g.docs:
+            return self._result(None, key=key)
+        return self._result(g.bundle_entry(self.bundle, "docs", key), key=key)
+
+    def generate_example(self, name: str) -> dict[str, Any]:
+        g = self.g
+        if g.config.examples_folder is None:
+            raise RPCError(INVALID_PARAMS, "examples_folder is not configured")
+        g.examples.pop(name, None)
+        g.collect_examples_out(names={name})
+        if name not in g.examples:
+            raise RPCError(INVALID_PARAMS, f"unknown example {name!r}")
+        target = g.bundle_entry(self.bundle, "examples", name)
+        target.parent.mkdir(exist_ok=True)
+        target.write_bytes(g.examples[name])
+        return self._result(target)
+
+    def status(self) -> dict[str, Any]:
+        methods = {}
+        for method, window in sorted(self.latencies.items()):
+            values = sorted(window)
+            methods[method] = {
+                "ok": self.counts[f"{method}.ok"],
+                "errors": self.counts[f"{method}.errors"],
+                "mean_s": round(sum(values) / len(values), 6),
+                "p50_s": round(_percentile(values, 0.5), 6),
+                "p95_s": round(_percentile(values, 0.95), 6),
+                "max_s": round(values[-1], 6),
+            }
+        return {
+            "package": self.g.root,
+            "version": self.g.version,
+            "bundle": str(self.bundle),
+            "pid": os.getpid(),
+            "uptime_s": round(time.monotonic() - self.started, 3),
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "peak_rss_mib": peak_rss_mib(),
+            "methods": methods,
+        }
+
+    def shutdown(self) -> bool:
+        # Stop once the queued requests are answered.
+        self._stopping = True
+        return True
+
+    # -- serving ----------------------------------------------------------
+
+    def serve(self, path: Path) -> None:
+        """Answer requests on the Unix socket ``path`` until shut down."""
+        if path.is_socket():
+            path.unlink()
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Created owner-only: a chmod after bind leaves it open meanwhile.
+        umask = os.umask(0o177)
+        try:
+            listener.bind(str(path))
+        finally:
+            os.umask(umask)
+        listener.listen()
+        self._stopping = False
+        self.g.log.info("Serving %s on %s", self.g.root, path)
+        selector = selectors.DefaultSelector()
+        selector.register(listener, selectors.EVENT_READ)
+        buffers: dict[socket.socket, bytes] = {}
+        # Request lines waiting for the Gen, with the connection to answer.
+        jobs: deque[tuple[socket.socket, bytes]] = deque()
+        try:
+            while jobs or not self._stopping:
+                for key, _ in selector.select(timeout=0 if jobs else None):
+                    if key.fileobj is listener:
+                        conn, _ = listener.accept()
+                        buffers[conn] = b""
+                        selector.register(conn, selectors.EVENT_READ)
+                        continue
+                    conn = key.fileobj  # type: ignore[assignment]
+                    try:
+                        data = conn.recv(1 << 16)
+                    except OSError:
+                        data = b""
+                    if not data:
+                        selector.unregister(conn)
+                        conn.close()
+                        del buffers[conn]
+                        continue
+                    *lines, buffers[conn] = (buffers[conn] + data).split(b"\n")
+                    for line in lines:
+                        if not line.strip():
+                            continue
+                        if self._uses_gen(line) and len(jobs) < self.max_pending:
+                            jobs.append((conn, line))
+                            self.pending = len(jobs)
+                        else:
+                            # Answered now; a full queue makes it busy.
+                            _reply(conn, self.handle_line(line))
+                if jobs:
+                    conn, line = jobs.popleft()
+                    self.pending = len(jobs)
+                    _reply(conn, self.handle_line(line))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for conn in buffers:
+                conn.close()
+            selector.close()
+            listener.close()
+            path.unlink(missing_ok=True)
+            self.g.close_jedi_cache()
+            self.g.log.info("Stopped serving on %s", path)
+
+
+def _reply(conn: socket.socket, response: bytes | None) -> None:
+    if response is None:
+        return
+    # The client may be gone; its request was still run.
+    with contextlib.suppress(OSError):
+        conn.sendall(response)
+
+
+def _error(id_: Any, code: int, message: str) -> dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": id_, "error": {"code": code, "message": message}}
+
+
+def call(socket_path: Path | str, method: str, /, **params: Any) -> Any:
+    """Send one request to the server on ``socket_path``; return its result."""
+    request = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(socket_path))
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        with sock.makefile("rb") as f:
+            response = json.loads(f.readline())
+    if "error" in response:
+        raise RPCError(response["error"]["code"], response["error"]["message"])
+    return response["result"]
@@ -51,6 +51,8 @@ class SigParam(Node):
     kind: str
     default: str | NoneType | Empty
 
+    _trusted_init = True
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
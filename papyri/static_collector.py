@@ -0,0 +1,754 @@
+"""Import-free API collection: ``collector = "static"``.
+
+``DFSCollector`` imports the package and every configured submodule, then
+calls ``getattr`` on every name of every module it reaches. That runs
+module-level code and triggers lazy loaders and imports of heavy optional
+dependencies. The static collector reads the sources with ``ast`` instead.
+It builds *stubs*, which are never-executed module, class and function
+objects. Each stub carries the name, docstring, signature and source
+location that ``Gen`` reads from a real object. ``DFSCollector`` then crawls
+the stubs, so aliases, pruning and exclusions work as they do for an
+imported package.
+
+What the sources tell:
+
+- A module is reachable when the package root or a configured submodule
+  imports it, directly or not. Importing ``pkg.sub`` binds ``sub`` on
+  ``pkg``, as it does at runtime.
+- Module names come from ``def`` and ``class`` statements and from
+  imports. ``from m import *`` follows ``m.__all__``. Plain
+  ``name = other.name`` aliases are followed too. A name listed in
+  ``__all__`` but not bound in the module is looked up as a submodule,
+  which covers lazy loaders.
+- Signatures are read from the source. Defaults and annotations are shown
+  as written, and literal defaults as their value. A class signature comes
+  from an ``__init__`` in the class body only: base classes are not
+  resolved.
+- ``property``, ``cached_property``, ``typing.overload`` and
+  ``if TYPE_CHECKING:`` definitions are skipped. Objects made at runtime,
+  such as dataclass methods, are not seen.
+
+Extension modules, and sources ``ast`` cannot parse, are imported and
+crawled as in import mode. Parsing happens once per file and, with
+``--jobs``, across forked processes. Executing examples needs the real
+objects, so it still imports the package (see ``realize``).
+"""
+
+from __future__ import annotations
+
+import ast
+import importlib
+import importlib.machinery
+import importlib.util
+import inspect
+import logging
+import multiprocessing
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import CodeType, FunctionType, ModuleType
+from typing import Any
+
+log = logging.getLogger("papyri")
+
+COLLECTORS = ("import", "static")
+
+# Attribute of stub modules, classes and functions holding their StubInfo.
+STUB_ATTR = "__papyri_stub__"
+
+# Decorators whose result is not a function or class DFSCollector collects.
+_SKIPPED_DECORATORS = {
+    "property",
+    "cached_property",
+    "overload",
+    "setter",
+    "getter",
+    "deleter",
+}
+
+_MISSING = object()
+
+
+def check_collector(collector: str) -> None:
+    if collector not in COLLECTORS:
+        raise ValueError(
+            f"Unknown collector {collector!r}. Valid collectors: {list(COLLECTORS)}"
+        )
+
+
+@dataclass(frozen=True)
+class StubInfo:
+    """Where a stub comes from."""
+
+    module: str
+    # Empty for modules.
+    qualname: str
+    file: str
+    line: int
+
+
+def stub_info(obj: Any) -> StubInfo | None:
+    """The ``StubInfo`` of a stub built by the static collector, else None."""
+    if isinstance(obj, staticmethod | classmethod):
+        obj = obj.__func__
+    try:
+        info = vars(obj).get(STUB_ATTR)
+    except Exception:
+        return None
+    return info if isinstance(info, StubInfo) else None
+
+
+def realize(obj: Any) -> Any:
+    """
+    The object a stub stands for, importing its module; other objects are
+    returned unchanged.
+    """
+    info = stub_info(obj)
+    if info is None:
+        return obj
+    value = importlib.import_module(info.module)
+    for part in info.qualname.split(".") if info.qualname else ():
+        value = getattr(value, part)
+    return value
+
+
+# -- parsing (one file at a time, possibly in a worker process) ------------
+
+
+class _Source:
+    """A default value or annotation, rendered as written."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def __repr__(self) -> str:
+        return self.text
+
+    __str__ = __repr__
+
+
+@dataclass
+class _Param:
+    name: str
+    kind: inspect._ParameterKind
+    # ("value", literal) or ("source", text); None without a default.
+    default: tuple[str, Any] | None
+    annotation: str | None
+
+
+@dataclass
+class _Def:
+    kind: str  # "function" or "class"
+    name: str
+    qualname: str
+    line: int
+    doc: str | None
+    # Functions: "def", "async", "generator" or "async generator", and how
+    # the class body wraps them ("staticmethod", "classmethod" or "").
+    flavor: str = "def"
+    wrapper: str = ""
+    params: list[_Param] = field(default_factory=list)
+    returns: str | None = None
+    # Under ``from __future__ import annotations`` the annotations of the
+    # real function are strings, which signatures show quoted.
+    postponed: bool = False
+    # Classes: body bindings, in order.
+    members: list[tuple[str | None, tuple[Any, ...]]] = field(default_factory=list)
+
+
+@dataclass
+class _ModuleInfo:
+    name: str
+    path: str
+    doc: str | None
+    # Literal ``__all__``, or None when not defined (or not a literal).
+    all: list[str] | None
+    # (name, binding) in source order; star imports have no name. Bindings:
+    # ("def", _Def), ("module", name), ("from", module, attr),
+    # ("star", module), ("ref", (name, *attrs)), ("const", value), ("other",).
+    bindings: list[tuple[str | None, tuple[Any, ...]]]
+    # Absolute names of the modules it imports.
+    imports: list[str]
+
+
+def _clean_doc(doc: str) -> str:
+    """The docstring the compiler stores for the literal ``doc``.
+
+    The compiler strips the common indentation of the lines after the
+    first, and the leading whitespace of the first.
+    """
+    first, *rest = doc.split("\n")
+    margin = min(
+        (len(line) - len(line.lstrip(" ")) for line in rest if line.strip(" ")),
+        default=0,
+    )
+    return "\n".join(
+        [
+            first.lstrip(" "),
+            *(line[margin:] if line.strip(" ") else "" for line in rest),
+        ]
+    )
+
+
+def _docstring(node: ast.AST) -> str | None:
+    assert isinstance(
+        node, ast.Module | ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef
+    )
+    doc = ast.get_docstring(node, clean=False)
+    return None if doc is None else _clean_doc(doc)
+
+
+def _dotted(node: ast.expr) -> list[str] | None:
+    """``a.b.c`` as ["a", "b", "c"], or None for other expressions."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return parts[::-1]
+
+
+def _decorator_names(node: ast.FunctionDef | ast.AsyncFunctionDef) -> list[str]:
+    names = []
+    for d in node.decorator_list:
+        parts = _dotted(d.func if isinstance(d, ast.Call) else d)
+        names.append(parts[-1] if parts else "")
+    return names
+
+
+def _is_generator(node: ast.FunctionDef | ast.AsyncFunctionDef) -> bool:
+    todo: list[ast.AST] = list(node.body)
+    while todo:
+        n = todo.pop()
+        if isinstance(n, ast.Yield | ast.YieldFrom):
+            return True
+        # Nested scopes have generators of their own.
+        scope = ast.FunctionDef | ast.AsyncFunctionDef | ast.Lambda | ast.ClassDef
+        if not isinstance(n, scope):
+            todo.extend(ast.iter_child_nodes(n))
+    return False
+
+
+def _default(node: ast.expr) -> tuple[str, Any]:
+    try:
+        return "value", ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return "source", ast.unparse(node)
+
+
+def _params(args: ast.arguments) -> list[_Param]:
+    P = inspect.Parameter
+
+    def annotation(a: ast.arg) -> str | None:
+        return None if a.annotation is None else ast.unparse(a.annotation)
+
+    positional = [*args.posonlyargs, *args.args]
+    defaults: list[ast.expr | None] = [None] * (len(positional) - len(args.defaults))
+    defaults += args.defaults
+    params = []
+    for i, (a, d) in enumerate(zip(positional, defaults, strict=True)):
+        kind = (
+            P.POSITIONAL_ONLY if i < len(args.posonlyargs) else P.POSITIONAL_OR_KEYWORD
+        )
+        params.append(
+            _Param(a.arg, kind, None if d is None else _default(d), annotation(a))
+        )
+    if args.vararg:
+        params.append(
+            _Param(args.vararg.arg, P.VAR_POSITIONAL, None, annotation(args.vararg))
+        )
+    for a, d in zip(args.kwonlyargs, args.kw_defaults, strict=True):
+        params.append(
+            _Param(
+                a.arg, P.KEYWORD_ONLY, None if d is None else _default(d), annotation(a)
+            )
+        )
+    if args.kwarg:
+        params.append(
+            _Param(args.kwarg.arg, P.VAR_KEYWORD, None, annotation(args.kwarg))
+        )
+    return params
+
+
+class _Parser:
+    def __init__(self, name: str, path: str, is_package: bool) -> None:
+        self.name = name
+        self.path = path
+        self.package = name if is_package else name.rpartition(".")[0]
+        self.all: list[str] | None = None
+        self.imports: list[str] = []
+        self.postponed = False
+
+    def absolute(self, module: str | None, level: int) -> str:
+        if not level:
+            assert module is not None
+            return module
+        base = self.package.split(".")
+        base = base[: len(base) - (level - 1)]
+        return ".".join([*base, module] if module else base)
+
+    def imported(self, name: str) -> None:
+        parts = name.split(".")
+        self.imports.extend(".".join(parts[: i + 1]) for i in range(len(parts)))
+
+    def define(
+        self, node: ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef, prefix: str
+    ) -> _Def | None:
+        qualname = prefix + node.name
+        line = min([node.lineno, *(d.lineno for d in node.decorator_list)])
+        if isinstance(node, ast.ClassDef):
+            d = _Def("class", node.name, qualname, line, _docstring(node))
+            d.members = self.body(node.body, qualname + ".")
+            return d
+        decorators = _decorator_names(node)
+        if _SKIPPED_DECORATORS.intersection(decorators):
+            return None
+        flavor = "async" if isinstance(node, ast.AsyncFunctionDef) else "def"
+        if _is_generator(node):
+            flavor = "async generator" if flavor == "async" else "generator"
+        wrapper = next(
+            (w for w in ("staticmethod", "classmethod") if w in decorators), ""
+        )
+        return _Def(
+            "function",
+            node.name,
+            qualname,
+            line,
+            _docstring(node),
+            flavor=flavor,
+            wrapper=wrapper if prefix else "",
+            params=_params(node.args),
+            returns=None if node.returns is None else ast.unparse(node.returns),
+            postponed=self.postponed,
+        )
+
+    def body(
+        self, stmts: list[ast.stmt], prefix: str = ""
+    ) -> list[tuple[str | None, tuple[Any, ...]]]:
+        """The bindings of a module (or class, with ``prefix``) body."""
+        out: list[tuple[str | None, tuple[Any, ...]]] = []
+        for node in stmts:
+            if isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef):
+                d = self.define(node, prefix)
+                if d is not None:
+                    out.append((node.name, ("def", d)))
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    self.imported(alias.name)
+                    if alias.asname:
+                        out.append((alias.asname, ("module", alias.name)))
+                    else:
+                        top = alias.name.partition(".")[0]
+                        out.append((top, ("module", top)))
+            elif isinstance(node, ast.ImportFrom):
+                module = self.absolute(node.module, node.level)
+                if module == "__future__":
+                    if any(a.name == "annotations" for a in node.names):
+                        self.postponed = True
+                    continue
+                self.imported(module)
+                for alias in node.names:
+                    if alias.name == "*":
+                        out.append((None, ("star", module)))
+                    else:
+                        out.append(
+                            (alias.asname or alias.name, ("from", module, alias.name))
+                        )
+            elif isinstance(node, ast.Assign | ast.AnnAssign | ast.AugAssign):
+                self.assign(node, out, prefix)
+            elif isinstance(node, ast.Expr) and not prefix:
+                self.extend_all(node)
+            elif isinstance(node, ast.If):
+                test = _dotted(node.test)
+                if test and test[-1] == "TYPE_CHECKING":
+                    out.extend(self.body(node.orelse, prefix))
+                else:
+                    out.extend(self.body(node.body, prefix))
+                    out.extend(self.body(node.orelse, prefix))
+            elif isinstance(node, ast.Try | ast.TryStar):
+                out.extend(self.body(node.body, prefix))
+                for handler in node.handlers:
+                    out.extend(self.body(handler.body, prefix))
+                out.extend(self.body(node.orelse, prefix))
+                out.extend(self.body(node.finalbody, prefix))
+            elif isinstance(node, ast.With | ast.AsyncWith):
+                out.extend(self.body(node.body, prefix))
+        return out
+
+    def assign(
+        self,
+        node: ast.Assign | ast.AnnAssign | ast.AugAssign,
+        out: list[tuple[str | None, tuple[Any, ...]]],
+        prefix: str,
+    ) -> None:
+        targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+        names = [t.id for t in targets if isinstance(t, ast.Name)]
+        if not prefix and "__all__" in names and node.value is not None:
+            try:
+                value = [str(n) for n in ast.literal_eval(node.value)]
+            except (ValueError, TypeError, SyntaxError):
+                log.debug("%s: __all__ is not a literal", self.name)
+            else:
+                if isinstance(node, ast.AugAssign):
+                    self.all = [*(self.all or []), *value]
+                else:
+                    self.all = value
+        if isinstance(node, ast.AugAssign) or node.value is None:
+            return
+        binding: tuple[Any, ...]
+        if (parts := _dotted(node.value)) is not None:
+            binding = ("ref", tuple(parts))
+        else:
+            kind, value = _default(node.value)
+            binding = ("const", value) if kind == "value" else ("other",)
+        out.extend((name, binding) for name in names)
+
+    def extend_all(self, node: ast.Expr) -> None:
+        """``__all__.extend([...])`` and ``__all__.append(...)``."""
+        call = node.value
+        if not (
+            isinstance(call, ast.Call)
+            and _dotted(call.func) in (["__all__", "extend"], ["__all__", "append"])
+            and len(call.args) == 1
+        ):
+            return
+        try:
+            value = ast.literal_eval(call.args[0])
+        except (ValueError, TypeError, SyntaxError):
+            return
+        assert isinstance(call.func, ast.Attribute)
+        added = [value] if call.func.attr == "append" else list(value)
+        self.all = [*(self.all or []), *map(str, added)]
+
+
+def _parse_module(item: tuple[str, str, bool]) -> _ModuleInfo | None:
+    """Parse one source file; None if ``ast`` cannot parse it."""
+    name, path, is_package = item
+    try:
+        tree = ast.parse(Path(path).read_bytes(), path)
+    except (SyntaxError, ValueError, UnicodeDecodeError) as e:
+        log.info("Cannot parse %s (%s), it will be imported", path, e)
+        return None
+    parser = _Parser(name, path, is_package)
+    bindings = parser.body(tree.body)
+    return _ModuleInfo(
+        name=name,
+        path=path,
+        doc=_docstring(tree),
+        all=parser.all,
+        bindings=bindings,
+        imports=list(dict.fromkeys(parser.imports)),
+    )
+
+
+# -- building stubs ---------------------------------------------------------
+
+_TEMPLATES: dict[str, CodeType] = {}
+
+
+def _code_template(flavor: str) -> CodeType:
+    if flavor not in _TEMPLATES:
+        source = {
+            "def": "def _():\n    pass",
+            "async": "async def _():\n    pass",
+            "generator": "def _():\n    yield",
+            "async generator": "async def _():\n    yield",
+        }[flavor]
+        namespace: dict[str, Any] = {}
+        exec(source, namespace)
+        _TEMPLATES[flavor] = namespace["_"].__code__
+    return _TEMPLATES[flavor]
+
+
+def _signature(d: _Def) -> inspect.Signature:
+    annotation: type[str] | type[_Source] = str if d.postponed else _Source
+    params = []
+    for p in d.params:
+        default: Any = inspect.Parameter.empty
+        if p.default is not None:
+            kind, value = p.default
+            default = value if kind == "value" else _Source(value)
+        params.append(
+            inspect.Parameter(
+                p.name,
+                p.kind,
+                default=default,
+                annotation=(
+                    inspect.Parameter.empty
+                    if p.annotation is None
+                    else annotation(p.annotation)
+                ),
+            )
+        )
+    return inspect.Signature(
+        params,
+        return_annotation=(
+            inspect.Signature.empty if d.returns is None else annotation(d.returns)
+        ),
+        __validate_parameters__=False,
+    )
+
+
+def _module_files(root: str) -> dict[str, tuple[Path, bool]]:
+    """Module name -> (file, is package) for the modules of package ``root``."""
+    # Finding a top-level module does not import anything.
+    spec = importlib.util.find_spec(root)
+    if spec is None or spec.origin is None:
+        raise ImportError(f"Cannot find the sources of {root!r}")
+    files: dict[str, tuple[Path, bool]] = {}
+    if not spec.submodule_search_locations:
+        files[root] = (Path(spec.origin), False)
+        return files
+    suffixes = [*importlib.machinery.EXTENSION_SUFFIXES, ".py"]
+
+    def walk(directory: Path, package: str) -> None:
+        if (directory / "__init__.py").is_file():
+            files.setdefault(package, (directory / "__init__.py", True))
+        for entry in sorted(directory.iterdir()):
+            if entry.is_dir():
+                if (entry / "__init__.py").is_file() and entry.name.isidentifier():
+                    walk(entry, f"{package}.{entry.name}")
+                continue
+            for suffix in suffixes:
+                stem = entry.name.removesuffix(suffix)
+                if stem != entry.name and stem.isidentifier() and stem != "__init__":
+                    files.setdefault(f"{package}.{stem}", (entry, False))
+                    break
+
+    for location in spec.submodule_search_locations:
+        walk(Path(location), root)
+    return files
+
+
+class StaticPackage:
+    """
+    The parsed sources of package ``root``, and the stubs built from them.
+
+    ``load`` gives the stub of a module (or the module itself if it has to
+    be imported) after linking the modules it imports, directly or not, to
+    their parents.
+    """
+
+    def __init__(
+        self, root: str, files: dict[str, tuple[Path, bool]], infos: dict[str, Any]
+    ) -> None:
+        self.root = root
+        self.files = files
+        # None for modules that have to be imported.
+        self.infos: dict[str, _ModuleInfo | None] = infos
+        self._modules: dict[str, ModuleType] = {}
+        self._stubs: dict[tuple[str, str], Any] = {}
+        self._namespaces: dict[str, dict[str, tuple[Any, ...]]] = {}
+
+    @classmethod
+    def parse(cls, root: str, *, jobs: int = 1) -> StaticPackage:
+        files = _module_files(root)
+        items = [
+            (name, str(path), is_package)
+            for name, (path, is_package) in files.items()
+            if path.suffix == ".py"
+        ]
+        if jobs > 1 and len(items) > 1:
+            with multiprocessing.get_context("fork").Pool(jobs) as pool:
+                parsed = pool.map(_parse_module, items, chunksize=8)
+        else:
+            parsed = [_parse_module(item) for item in items]
+        infos: dict[str, _ModuleInfo | None] = dict.fromkeys(files)
+        for (name, _, _), info in zip(items, parsed, strict=True):
+            infos[name] = info
+        return cls(root, files, infos)
+
+    def load(self, names: list[str]) -> list[ModuleType]:
+        """The modules ``names``, with what they import bound on its parent."""
+        todo = list(names)
+        seen: set[str] = set()
+        while todo:
+            name = todo.pop()
+            if name in seen or name not in self.files:
+                continue
+            seen.add(name)
+            info = self.infos[name]
+            if info is None:
+                continue
+            todo.extend(info.imports)
+            for _, binding in info.bindings:
+                if binding[0] == "from":
+                    todo.append(f"{binding[1]}.{binding[2]}")
+        for name in sorted(seen):
+            parent, _, last = name.rpartition(".")
+            if parent in seen and self.infos[parent] is not None:
+                namespace = vars(self.module(parent))
+                # The parent's own bindings win, as when it imports the
+                # submodule before rebinding its name.
+                if last not in namespace:
+                    namespace[last] = self.module(name)
+        return [self.module(name) for name in names]
+
+    def module(self, name: str) -> ModuleType:
+        if name in self._modules:
+            return self._modules[name]
+        info = self.infos.get(name)
+        if info is None:
+            log.info("Importing %s, which cannot be read statically", name)
+            module = importlib.import_module(name)
+            self._modules[name] = module
+            return module
+        module = ModuleType(name, info.doc)
+        module.__file__ = info.path
+        module.__package__ = name if self.files[name][1] else name.rpartition(".")[0]
+        setattr(module, STUB_ATTR, StubInfo(name, "", info.path, 0))
+        self._modules[name] = module
+        for key in self._namespace(name):
+            value = self._lookup(name, key, set())
+            if value is not _MISSING:
+                setattr(module, key, value)
+        return module
+
+    def constant(self, module: str, name: str) -> Any:
+        """The literal value of ``module.name``, or None."""
+        seen = set()
+        while self.infos.get(module) is not None and (module, name) not in seen:
+            seen.add((module, name))
+            binding = self._namespace(module).get(name)
+            if binding is None:
+                return None
+            if binding[0] == "const":
+                return binding[1]
+            if binding[0] == "from":
+                module, name = binding[1], binding[2]
+            elif binding[0] == "ref" and len(binding[1]) == 1:
+                name = binding[1][0]
+            else:
+                return None
+        return None
+
+    def _namespace(self, module: str) -> dict[str, tuple[Any, ...]]:
+        """Name -> binding at the end of the module ``module``."""
+        if module in self._namespaces:
+            return self._namespaces[module]
+        info = self.infos[module]
+        assert info is not None
+        namespace: dict[str, tuple[Any, ...]] = {}
+        # Guards against star-import cycles.
+        self._namespaces[module] = namespace
+        for name, binding in info.bindings:
+            if name is not None:
+                namespace[name] = binding
+                continue
+            target = binding[1]
+            if target not in self.files:
+                continue
+            for exported in self._exports(target):
+                namespace[exported] = ("from", target, exported)
+        return namespace
+
+    def _exports(self, module: str) -> list[str]:
+        """The names ``from module import *`` binds."""
+        info = self.infos[module]
+        if info is None:
+            real = self.module(module)
+            names = getattr(real, "__all__", None)
+            return (
+                list(names)
+                if names is not None
+                else [k for k in vars(real) if not k.startswith("_")]
+            )
+        if info.all is not None:
+            return info.all
+        return [k for k in self._namespace(module) if not k.startswith("_")]
+
+    def _lookup(self, module: str, name: str, seen: set[tuple[str, str]]) -> Any:
+        """The object bound to ``name`` in ``module``, or _MISSING."""
+        if module not in self.files:
+            # Outside the package: DFSCollector would not collect it.
+            return _MISSING
+        if self.infos[module] is None:
+            return getattr(self.module(module), name, _MISSING)
+        if (module, name) in seen:
+            return _MISSING
+        seen.add((module, name))
+        binding = self._namespace(module).get(name)
+        if binding is None:
+            if f"{module}.{name}" in self.files:
+                return self.module(f"{module}.{name}")
+            return _MISSING
+        return self._resolve(module, binding, seen)
+
+    def _resolve(
+        self, module: str, binding: tuple[Any, ...], seen: set[tuple[str, str]]
+    ) -> Any:
+        kind = binding[0]
+        if kind == "def":
+            return self._stub(module, binding[1])
+        if kind == "module":
+            return self.module(binding[1]) if binding[1] in self.files else _MISSING
+        if kind == "from":
+            _, source, attr = binding
+            if f"{source}.{attr}" in self.files:
+                return self.module(f"{source}.{attr}")
+            return self._lookup(source, attr, seen)
+        if kind == "ref":
+            first, *attrs = binding[1]
+            value = self._lookup(module, first, seen)
+            for attr in attrs:
+                if value is _MISSING:
+                    break
+                if isinstance(value, ModuleType):
+                    value = self._lookup(value.__name__, attr, seen)
+                elif stub_info(value) is not None:
+                    value = vars(value).get(attr, _MISSING)
+                else:
+                    value = _MISSING
+            return value
+        return _MISSING
+
+    def _stub(self, module: str, d: _Def) -> Any:
+        key = (module, d.qualname)
+        if key in self._stubs:
+            return self._stubs[key]
+        path = self.files[module][0]
+        info = StubInfo(module, d.qualname, str(path), d.line)
+        stub: Any
+        if d.kind == "class":
+            namespace: dict[str, Any] = {
+                "__module__": module,
+                "__qualname__": d.qualname,
+                "__doc__": d.doc,
+                "__firstlineno__": d.line,
+                STUB_ATTR: info,
+            }
+            stub = type(d.name, (), namespace)
+            self._stubs[key] = stub
+            for name, binding in d.members:
+                assert name is not None
+                if binding[0] == "def":
+                    value = self._stub(module, binding[1])
+                elif binding[0] == "ref" and len(binding[1]) == 1:
+                    value = vars(stub).get(binding[1][0], _MISSING)
+                    if value is _MISSING:
+                        value = self._resolve(module, binding, set())
+                else:
+                    value = self._resolve(module, binding, set())
+                if value is not _MISSING:
+                    setattr(stub, name, value)
+            return stub
+        code = _code_template(d.flavor).replace(
+            co_name=d.name,
+            co_qualname=d.qualname,
+            co_filename=str(path),
+            co_firstlineno=d.line,
+        )
+        function = FunctionType(code, {"__name__": module}, d.name)
+        function.__qualname__ = d.qualname
+        function.__doc__ = d.doc
+        function.__signature__ = _signature(d)  # type: ignore[attr-defined]
+        setattr(function, STUB_ATTR, info)
+        if d.wrapper == "staticmethod":
+            stub = staticmethod(function)
+        elif d.wrapper == "classmethod":
+            stub = classmethod(function)
+        else:
+            stub = function
+        self._stubs[key] = stub
+        return stub
@@ -1,5 +1,9 @@
+from pathlib import Path
+
 import pytest
 
+from papyri import exec_cache, gen_cache, narrative_cache, tokens
+
 
 def pytest_addoption(parser: pytest.Parser) -> None:
     parser.addoption(
@@ -8,3 +12,14 @@ def pytest_addoption(parser: pytest.Parser) -> None:
         default=False,
         help="Regenerate golden test fixtures (papyri/tests/golden/*.json).",
     )
+
+
+@pytest.fixture(autouse=True)
+def _isolated_caches(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep the on-disk gen caches of every test under its ``tmp_path``, so
+    the suite neither writes to nor reads from ``~/.cache/papyri``."""
+    cache = tmp_path / "cache"
+    monkeypatch.setattr(exec_cache, "EXEC_CACHE_DIR", cache / "exec")
+    monkeypatch.setattr(gen_cache, "GEN_CACHE_DIR", cache / "gen")
+    monkeypatch.setattr(narrative_cache, "NARRATIVE_CACHE_DIR", cache / "narrative")
+    monkeypatch.setattr(tokens, "JEDI_CACHE_PATH", cache / "jedi.sqlite3")
@@ -0,0 +1,104 @@
+"""Tests for the isolated example-execution pool in ``papyri.exec_pool``."""
+
+from __future__ import annotations
+
+import os
+import signal
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from papyri.exec_pool import ExampleWorkerError, ExecPool, UnpicklableTaskError
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "fork"), reason="example workers require fork"
+)
+
+
+def _add(a: int, b: int) -> tuple[int, int]:
+    return os.getpid(), a + b
+
+
+def _sleep(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+def _segfault() -> None:
+    os.kill(os.getpid(), signal.SIGSEGV)
+
+
+def _allocate(n_bytes: int) -> int:
+    return len(bytearray(n_bytes))
+
+
+def _raise() -> None:
+    raise ValueError("from the worker")
+
+
+@pytest.fixture
+def pool() -> Iterator[ExecPool]:
+    p = ExecPool(1, timeout=2, max_tasks=3)
+    yield p
+    p.close()
+
+
+def test_runs_in_a_reused_worker(pool: ExecPool) -> None:
+    pid1, total = pool.run(_add, 1, b=2)
+    pid2, _ = pool.run(_add, 1, 2)
+    assert total == 3
+    assert pid1 == pid2 != os.getpid()
+
+
+def test_recycles_worker_after_max_tasks(pool: ExecPool) -> None:
+    pids = [pool.run(_add, 0, 0)[0] for _ in range(4)]
+    assert len(set(pids[:3])) == 1
+    assert pids[3] != pids[0]
+
+
+def test_before_fork_runs_before_every_spawn() -> None:
+    forks: list[int] = []
+    pool = ExecPool(1, timeout=2, max_tasks=2, before_fork=lambda: forks.append(1))
+    try:
+        pids = [pool.run(_add, 0, 0)[0] for _ in range(5)]
+    finally:
+        pool.close()
+    assert len(set(pids)) == len(forks) == 3
+
+
+def test_reraises_task_exceptions_and_keeps_worker(pool: ExecPool) -> None:
+    pid, _ = pool.run(_add, 0, 0)
+    with pytest.raises(ValueError, match="from the worker"):
+        pool.run(_raise)
+    assert pool.run(_add, 0, 0)[0] == pid
+
+
+def test_timeout_costs_one_task(pool: ExecPool) -> None:
+    pid, _ = pool.run(_add, 0, 0)
+    with pytest.raises(ExampleWorkerError, match="timed out"):
+        pool.run(_sleep, 30)
+    new_pid, total = pool.run(_add, 2, 2)
+    assert total == 4
+    assert new_pid != pid
+
+
+def test_crash_costs_one_task(pool: ExecPool) -> None:
+    with pytest.raises(ExampleWorkerError, match="SIGSEGV"):
+        pool.run(_segfault)
+    assert pool.run(_add, 1, 1)[1] == 2
+
+
+def test_memory_limit() -> None:
+    pool = ExecPool(1, timeout=10, memory_limit=16 << 30)
+    try:
+        with pytest.raises(ExampleWorkerError, match="memory limit"):
+            pool.run(_allocate, 32 << 30)
+        assert pool.run(_allocate, 1 << 20) == 1 << 20
+    finally:
+        pool.close()
+
+
+def test_unpicklable_task_is_not_sent(pool: ExecPool) -> None:
+    with pytest.raises(UnpicklableTaskError):
+        pool.run(_add, lambda: None, 1)
+    assert pool.run(_add, 1, 1)[1] == 2
@@ -1,14 +1,20 @@
+import logging
+import os
+import subprocess
+import sys
 import tempfile
+import textwrap
 from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
 import pytest
 
+from papyri import exec_cache, profiling, watch
 from papyri.config_loader import Config
 from papyri.doc import GeneratedDoc, _normalize_see_also
-from papyri.executors import BlockExecutor
-from papyri.gen import APIObjectInfo, Gen
+from papyri.executors import FIGURE_STATS, BlockExecutor, FigureEncoder
+from papyri.gen import APIObjectInfo, DFSCollector, Gen
 from papyri.numpydoc_compat import NumpyDocString
 from papyri.utils import strip_clinic_signature
 
@@ -23,6 +29,54 @@ def test_BlockExecutor() -> None:
     b.exec("# this is a comment")
 
 
+@pytest.mark.parametrize(
+    "fmt, magic", [("png", b"\x89PNG"), ("svg", b"<?xml"), ("webp", b"RIFF")]
+)
+def test_figure_encoder_dedupes_identical_figures(fmt: str, magic: bytes) -> None:
+    import matplotlib.pyplot as plt
+
+    encoder = FigureEncoder(fmt, dpi=50)
+    before = FIGURE_STATS.copy()
+    figures = []
+    for y in ([1, 2], [1, 2], [2, 1]):
+        fig = plt.figure()
+        fig.add_subplot().plot(y)
+        figures.append(fig)
+    try:
+        (n1, d1), (n2, d2), (n3, d3) = encoder.encode(figures)
+    finally:
+        plt.close("all")
+    assert n1 == n2 != n3
+    assert n1.endswith(f".{fmt}")
+    assert d1 == d2 != d3
+    assert d1.startswith(magic)
+    stats = FIGURE_STATS - before
+    assert stats["figures"] == 3
+    assert stats["encoded"] == 2
+    assert stats["bytes"] == len(d1) + len(d3)
+
+
+def test_figure_encoder_png_matches_savefig() -> None:
+    import io
+
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure()
+    fig.add_subplot().plot([3, 1, 2])
+    try:
+        buf = io.BytesIO()
+        fig.savefig(buf, dpi=72)
+        ((_, data),) = FigureEncoder("png", dpi=72).encode([fig])
+    finally:
+        plt.close("all")
+    assert data == buf.getvalue()
+
+
+def test_figure_encoder_rejects_unknown_format() -> None:
+    with pytest.raises(ValueError, match="figure_format"):
+        FigureEncoder("gif")
+
+
 def test_generated_doc_new() -> None:
     """ClassVar annotations on GeneratedDoc must not shift positional args.
 
@@ -82,6 +136,108 @@ def test_infer() -> None:
     assert all("LinAlgError" in fqn for fqn in x_fqns), x_fqns
 
 
+def test_parse_script_queries_a_single_jedi_object(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """With a namespace only the Interpreter is built; the Script is not."""
+    from papyri import tokens
+
+    def no_script(*args: Any, **kwargs: Any) -> None:
+        raise AssertionError("jedi.Script should not be built")
+
+    monkeypatch.setattr(tokens.jedi, "Script", no_script)
+    res = tokens.parse_script("x = os.sep", {"os": os}, "", Config(infer=True))
+    assert res is not None
+    assert ("os", "os") in res
+
+
+def test_tokenize_script_attaches_classes_and_positions() -> None:
+    from papyri.tokens import get_classes, tokenize_script
+
+    script = "import os\n\nfor i in range(2):\n    x = os.sep  # sep\n"
+    res = tokenize_script(script, {}, "", Config(infer=True))
+    assert res is not None
+    assert "".join(text for text, _, _ in res) == script
+    assert [cls for _, _, cls in res] == get_classes(script)
+    # Jedi is queried at the right line and column past the first line.
+    refs = [(text, ref) for text, ref, _ in res]
+    assert refs[-6:-3] == [("os", "os"), (".", ""), ("sep", "builtins.str")]
+    assert ("range", "builtins.range") in refs
+
+
+def test_jedi_cache_reuses_results(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Results are stored across ``JediCache`` instances of the same context
+    and read back without running Jedi."""
+    from papyri import tokens
+
+    path = tmp_path / "jedi.sqlite3"
+    config = Config(infer=True)
+    script = "import os\nos.path.join"
+    before = tokens.JEDI_CACHE_STATS.copy()
+
+    first = tokens.JediCache(path, "ctx", 1 << 20)
+    expected = tokens.parse_script(script, {}, "", config, cache=first)
+    first.close()
+    assert expected is not None
+    assert ("os", "os") in expected
+
+    def no_jedi(*args: Any, **kwargs: Any) -> None:
+        raise AssertionError("Jedi should not run on a cache hit")
+
+    monkeypatch.setattr(tokens.jedi, "Script", no_jedi)
+    second = tokens.JediCache(path, "ctx", 1 << 20)
+    second.prefetch([script])
+    assert tokens.parse_script(script, {}, "", config, cache=second) == expected
+    assert (tokens.JEDI_CACHE_STATS - before) == {"hits": 1, "misses": 1}
+
+    other = tokens.JediCache(path, "other package version", 1 << 20)
+    assert other.get("\n" + script) is None
+
+
+def test_jedi_cache_keys_inference_mode_and_sources(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A snippet inferred against a namespace is not replayed for a plain
+    script, and editing the package files invalidates every entry."""
+    from papyri.tokens import JediCache, Tokens
+
+    name = "papyri_jedi_key_pkg"
+    _write_synthetic_package(tmp_path, name)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    tokens: Tokens = [("x", "builtins.int", "n")]
+
+    cache = JediCache.for_bundle(name, "1.0.0", 1 << 20)
+    cache.put("x", tokens, interpreter=True)
+    cache.flush()
+    assert cache.get("x", interpreter=True) == tokens
+    assert cache.get("x") is None
+    cache.close()
+
+    sub = tmp_path / name / "sub.py"
+    sub.write_text(sub.read_text() + "\n# edited\n")
+    edited = JediCache.for_bundle(name, "1.0.0", 1 << 20)
+    assert edited.context != cache.context
+    assert edited.get("x", interpreter=True) is None
+
+
+def test_jedi_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    from papyri.tokens import JediCache
+
+    cache = JediCache(tmp_path / "jedi.sqlite3", "ctx", 1 << 20)
+    for text in ("a", "b", "c"):
+        cache.put(text, [(text * 100, None, "")])
+        cache.flush()
+    assert cache.get("a") is not None
+    cache.flush()  # "a" is now the most recently used
+    cache.max_size = 150
+    assert cache.evict() == 2
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is None
+
+
 @pytest.mark.parametrize(
     "module, submodules, objects",
     [
@@ -605,3 +761,933 @@ def test_lenient_narrative_skip_drops_doc_and_continues(
     # The failing page was skipped; the valid sibling survived.
     assert "index" not in gen.docs
     assert "page" in gen.docs
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="--jobs requires fork")
+def test_parallel_narrative_matches_serial(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    """``--jobs`` narrative builds produce the same docs, toc and warnings."""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    pages = [f"page{i}" for i in range(6)]
+    (docs / "index.rst").write_text(
+        "Title\n=====\n\n.. toctree::\n\n" + "".join(f"   {p}\n" for p in pages)
+    )
+    for i, page in enumerate(pages):
+        (docs / f"{page}.rst").write_text(
+            f".. _dup:\n\n.. _label{i}:\n\nPage {i}\n======\n\nSee :ref:`label0`.\n"
+        )
+    (docs / "broken.rst").write_text("Broken\n======\n\n.. completely-unregistered::\n")
+
+    def build(jobs: int) -> tuple[Gen, list[str]]:
+        config = Config(
+            dry_run=True, dummy_progress=True, execute_doctests=False, jobs=jobs
+        )
+        config.docs_path = str(docs)
+        config.early_error = False
+        gen = Gen(False, config=config)
+        gen._meta = {"version": "1.0", "module": "nptest"}
+        caplog.clear()
+        with caplog.at_level(logging.WARNING, logger="papyri"):
+            gen.collect_narrative_docs()
+        return gen, [r.getMessage() for r in caplog.records]
+
+    parallel, parallel_warnings = build(2)
+    serial, serial_warnings = build(1)
+    assert parallel.docs == serial.docs
+    assert sorted(serial.docs) == sorted(["index", *pages])
+    assert [t.to_dict() for t in parallel._toc_nodes] == [
+        t.to_dict() for t in serial._toc_nodes
+    ]
+    assert parallel_warnings == serial_warnings
+    assert sum("Duplicate RST target 'dup'" in w for w in serial_warnings) == 5
+    assert any("Could not process" in w for w in serial_warnings)
+
+
+_NARRATIVE_FORK_CHECK = """
+import warnings
+
+from papyri.config_loader import Config
+from papyri.gen import Gen
+from papyri.tokens import tokenize_script
+
+config = Config(dry_run=True, dummy_progress=True, jobs=2, docs_path="docs")
+with warnings.catch_warnings(record=True) as caught:
+    warnings.simplefilter("always")
+    # As the API docs do before the narrative docs: start Jedi's subprocess,
+    # and its reader thread, in the parent.
+    assert tokenize_script("import os\\nos.path", {}, "", config)
+    gen = Gen(False, config=config)
+    gen._meta = {"version": "1.0", "module": "nptest"}
+    gen.collect_narrative_docs()
+    assert len(gen.docs) == 4, gen.docs
+print("fork warnings:", [str(w.message) for w in caught if "fork()" in str(w.message)])
+"""
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="--jobs requires fork")
+def test_narrative_pools_fork_without_threads(tmp_path: Path) -> None:
+    """Both narrative pools (parsing, then visiting) are forked after the
+    helper threads and the Jedi subprocess of the parent are stopped. Run in
+    a fresh interpreter: threads left by other tests would trip the check."""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for i in range(4):
+        (docs / f"page{i}.rst").write_text(f"Page {i}\n======\n\nText.\n")
+    result = subprocess.run(
+        [sys.executable, "-c", _NARRATIVE_FORK_CHECK],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr
+    # The progress bars print to stdout as well.
+    assert "fork warnings: []" in result.stdout
+
+
+def test_narrative_cache_rebuilds_only_affected_docs(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    """A rebuild replays cached narrative docs and only visits the documents
+    that changed, read a changed file, or resolved a label that moved."""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "index.rst").write_text("Index\n=====\n\n.. toctree::\n\n   a\n   b\n")
+    (docs / "a.rst").write_text(
+        "A\n=\n\nSee :ref:`b-label`.\n\n.. include:: snippet.txt\n"
+    )
+    (docs / "b.rst").write_text(".. _b-label:\n\nB\n=\n\nText.\n")
+    (docs / "c.rst").write_text("C\n=\n\nStandalone.\n")
+    (docs / "snippet.txt").write_text("Included once.\n")
+
+    def build(cache: bool = True) -> tuple[Gen, str]:
+        config = Config(dry_run=not cache, dummy_progress=True, cache=cache)
+        config.execute_doctests = False
+        config.docs_path = str(docs)
+        gen = Gen(False, config=config)
+        gen._meta = {"version": "1.0", "module": "nptest"}
+        caplog.clear()
+        with caplog.at_level(logging.INFO, logger="papyri"):
+            gen.collect_narrative_docs()
+        msgs = [
+            r.getMessage() for r in caplog.records if "Narrative docs cache" in r.msg
+        ]
+        return gen, "".join(msgs)
+
+    def check(expected: str) -> Gen:
+        uncached, _ = build(cache=False)
+        gen, summary = build()
+        assert expected in summary
+        assert gen.docs == uncached.docs
+        assert [t.to_dict() for t in gen._toc_nodes] == [
+            t.to_dict() for t in uncached._toc_nodes
+        ]
+        return gen
+
+    check("0/4 reused, 4 rebuilt")
+    check("4/4 reused, 0 rebuilt")
+
+    (docs / "snippet.txt").write_text("Included twice.\n")
+    assert b"twice" in check("3/4 reused, 1 rebuilt").docs["a"]
+
+    # The index shows b's title; a only resolves b's label, which did not move.
+    (docs / "b.rst").write_text(".. _b-label:\n\nBee\n===\n\nText.\n")
+    check("2/4 reused, 2 rebuilt")
+
+    (docs / "c.rst").write_text(".. _b-label:\n\nC\n=\n\nStandalone.\n")
+    (docs / "b.rst").write_text("Bee\n===\n\nText.\n")
+    check("1/4 reused, 3 rebuilt")
+
+
+def test_narrative_cache_replays_plots_after_edit(tmp_path: Path) -> None:
+    """Replayed ``.. plot::`` assets of narrative docs and the ones of
+    rebuilt documents never collide: a cached rebuild after editing one
+    document matches a fresh one."""
+    pytest.importorskip("matplotlib")
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    plot = ".. plot::\n\n   import matplotlib.pyplot as plt\n   plt.plot({})\n"
+    (docs / "a.rst").write_text("A\n=\n\n" + plot.format([1, 2, 3]))
+    (docs / "b.rst").write_text("B\n=\n\n" + plot.format([3, 2, 1]))
+
+    def build(cache: bool = True) -> Gen:
+        config = Config(dry_run=not cache, dummy_progress=True, cache=cache)
+        config.docs_path = str(docs)
+        gen = Gen(False, config=config)
+        gen._meta = {"version": "1.0", "module": "nptest"}
+        gen.collect_narrative_docs()
+        return gen
+
+    build()
+    (docs / "b.rst").write_text("B\n=\n\n" + plot.format([2, 2, 2]))
+    edited = build()
+    fresh = build(cache=False)
+
+    assert len(fresh.bdata) == 2
+    assert edited.bdata == fresh.bdata
+    assert edited.docs == fresh.docs
+
+
+_SYNTHETIC_PACKAGE = {
+    "__init__.py": '''
+        """A tiny package for exercising ``Gen.collect_api_docs`` end to end."""
+
+        __version__ = "1.0.0"
+
+        from .sub import Thing, helper
+
+
+        def add(a: int, b: int = 1) -> int:
+            """
+            Add two numbers.
+
+            Parameters
+            ----------
+            a : int
+                First operand.
+            b : int
+                Second operand, see :func:`helper`.
+
+            See Also
+            --------
+            helper
+
+            Examples
+            --------
+            >>> add(1, 2)
+            3
+            """
+            return a + b
+        ''',
+    "sub.py": '''
+        """Helpers living in a submodule."""
+
+
+        def helper(x):
+            """
+            Return ``x`` unchanged.
+
+            Examples
+            --------
+            >>> helper(3)
+            3
+            """
+            return x
+
+
+        class Thing:
+            """
+            A thing with a method.
+
+            Attributes
+            ----------
+            size : int
+                How big it is.
+            """
+
+            def grow(self, by: int) -> None:
+                """Grow by ``by``."""
+''',
+}
+
+
+def _write_synthetic_package(root: Path, name: str) -> None:
+    pkg = root / name
+    pkg.mkdir()
+    for filename, source in _SYNTHETIC_PACKAGE.items():
+        (pkg / filename).write_text(textwrap.dedent(source))
+
+
+def _gen_synthetic_package(root: Path, name: str, **config: Any) -> Gen:
+    config.setdefault("dry_run", True)
+    gen = Gen(
+        dummy_progress=True,
+        config=Config(dummy_progress=True, infer=False, **config),
+    )
+    gen.collect_package_metadata(name, relative_dir=root, meta={})
+    gen.collect_api_docs(name, limit_to=[])
+    return gen
+
+
+def test_collect_api_docs_jobs_matches_serial(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """``--jobs`` shards objects across forked workers; the merged result
+    must be identical to a serial run, in the same order."""
+    _write_synthetic_package(tmp_path, "papyri_jobs_pkg")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    serial = _gen_synthetic_package(tmp_path, "papyri_jobs_pkg", jobs=1)
+    parallel = _gen_synthetic_package(tmp_path, "papyri_jobs_pkg", jobs=3)
+
+    assert len(serial.data) > 3
+    assert list(parallel.data) == list(serial.data)
+    assert {k: v.to_json() for k, v in parallel.data.items()} == {
+        k: v.to_json() for k, v in serial.data.items()
+    }
+    assert parallel.bdata == serial.bdata
+    assert parallel.diagnostics.records == serial.diagnostics.records
+    assert parallel.diagnostics.counts == serial.diagnostics.counts
+
+
+_PLOT_FUNCTION = '''
+    def plot{i}():
+        """
+        Plot.
+
+        Notes
+        -----
+        .. plot::
+
+           import matplotlib.pyplot as plt
+           plt.plot([1, 2, {i}])
+           plt.show()
+        """
+    '''
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="--jobs requires fork")
+def test_collect_api_docs_jobs_names_plots_by_content(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """``.. plot::`` assets rendered in ``--jobs`` workers get the same
+    names, and no two different figures share one, as in a serial run."""
+    pytest.importorskip("matplotlib")
+    monkeypatch.setenv("MPLBACKEND", "agg")
+    name = "papyri_jobs_plot_pkg"
+    pkg = tmp_path / name
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text(
+        "".join(textwrap.dedent(_PLOT_FUNCTION.format(i=i)) for i in range(6))
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    serial = _gen_synthetic_package(tmp_path, name, jobs=1)
+    parallel = _gen_synthetic_package(tmp_path, name, jobs=3)
+
+    assert len(serial.bdata) == 6
+    assert parallel.bdata == serial.bdata
+    assert {k: v.to_json() for k, v in parallel.data.items()} == {
+        k: v.to_json() for k, v in serial.data.items()
+    }
+
+
+@pytest.mark.parametrize("execute_doctests", [False, True])
+def test_static_collector_matches_import_collector(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, execute_doctests: bool
+) -> None:
+    """``collector = "static"`` documents the same objects as importing the
+    package, without importing it unless examples are executed."""
+    name = f"papyri_static_pkg_{execute_doctests}"
+    _write_synthetic_package(tmp_path, name)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    static = _gen_synthetic_package(
+        tmp_path, name, collector="static", execute_doctests=execute_doctests
+    )
+    assert (name in sys.modules) is execute_doctests
+    imported = _gen_synthetic_package(
+        tmp_path, name, collector="import", execute_doctests=execute_doctests
+    )
+
+    assert static.version == imported.version == "1.0.0"
+    assert list(static.data) == list(imported.data)
+    assert {k: v.to_json() for k, v in static.data.items()} == {
+        k: v.to_json() for k, v in imported.data.items()
+    }
+
+
+def test_profiling_phases_are_charged_exclusively(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A nested phase pauses its parent, and time another process reported
+    is not charged again to the phase that waited for it."""
+    clock = iter(range(0, 10**6, 10))
+    monkeypatch.setattr(profiling.time, "perf_counter_ns", lambda: next(clock))
+    monkeypatch.setattr(profiling.time, "thread_time_ns", lambda: 0)
+    monkeypatch.setattr(profiling, "PHASE_STATS", profiling.Counter())
+    monkeypatch.setattr(profiling, "_STATE", profiling._State())
+    with profiling.phase("outer"):  # 0
+        with profiling.phase("inner"):  # 10
+            pass  # 20
+        profiling.checkpoint()  # 30
+        profiling.absorb({"inner.wall_ns": 5, "inner.calls": 1})  # 40
+    # 50
+    assert profiling.PHASE_STATS == {
+        "outer.calls": 1,
+        "outer.wall_ns": 10 + 10 + 15,
+        "outer.cpu_ns": 0,
+        "inner.calls": 2,
+        "inner.wall_ns": 10 + 5,
+        "inner.cpu_ns": 0,
+    }
+
+
+def test_memory_tracker_reports_growth_per_pass() -> None:
+    """``--memory`` samples report traced growth per pass and where the
+    memory was allocated; a disabled tracker does nothing."""
+    import tracemalloc
+
+    disabled = profiling.MemoryTracker(enabled=False)
+    disabled.sample("api")
+    assert disabled.stop() is None
+    assert not tracemalloc.is_tracing()
+
+    tracker = profiling.MemoryTracker(enabled=True, top=3)
+    tracker.sample("import")
+    retained = [bytes(1024) for _ in range(4096)]
+    tracker.sample("api")
+    del retained
+    tracker.sample("write")
+    memory = tracker.stop()
+    assert not tracemalloc.is_tracing()
+    assert memory is not None
+    assert [m["after"] for m in memory["samples"]] == ["import", "api", "write"]
+    _, api, write = memory["samples"]
+    assert api["traced_growth_mib"] > 3.5
+    assert write["traced_growth_mib"] < -3.5
+    assert api["traced_peak_mib"] >= api["traced_mib"]
+    assert __file__ in api["top_growth"][0]["site"]
+    assert memory["peak_rss_mib"] is None or memory["peak_rss_mib"] > 0
+    report = profiling.build_report({}, {}, wall_ns=1, memory=memory)
+    assert "api" in profiling.format_report(report, 10)
+
+
+def test_collect_api_docs_profiles_each_object(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """With ``--profile``, every documented object gets its phase times, in
+    serial and ``--jobs`` builds alike, and the report ranks them."""
+    _write_synthetic_package(tmp_path, "papyri_profile_pkg")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for jobs in (1, 2):
+        gen = Gen(
+            dummy_progress=True,
+            config=Config(dummy_progress=True, dry_run=True, infer=False, jobs=jobs),
+        )
+        gen.object_phases = {}
+        gen.collect_package_metadata("papyri_profile_pkg", tmp_path, meta={})
+        gen.collect_api_docs("papyri_profile_pkg", limit_to=[])
+        assert set(gen.object_phases) == set(gen.data)
+        report = profiling.build_report(
+            gen.stats["phases"], gen.object_phases, wall_ns=1
+        )
+        times = [o["wall_s"] for o in report["objects"].values()]
+        assert times == sorted(times, reverse=True)
+        assert set(report["phases"]) <= set(profiling.PHASES)
+        assert report["phases"]["numpydoc"]["calls"] >= 1
+        assert report["phases"]["visit"]["calls"] == len(gen.data)
+        assert "papyri_profile_pkg:add" in profiling.format_report(report, 50)
+
+
+def test_cbor_staging_packs_like_json(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """``staging_format = "cbor"`` writes smaller entries that pack into the
+    very artifact the JSON staging directory packs into."""
+    from papyri.pack import make_artifact_from_dir
+
+    name = "papyri_staging_pkg"
+    _write_synthetic_package(tmp_path, name)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    artifacts = {}
+    sizes = {}
+    for fmt in ("json", "cbor"):
+        gen = _gen_synthetic_package(tmp_path, name, staging_format=fmt)
+        bundle = tmp_path / fmt
+        bundle.mkdir()
+        gen.write(bundle)
+        sizes[fmt] = sum(f.stat().st_size for f in (bundle / "module").iterdir())
+        artifacts[fmt], _ = make_artifact_from_dir(bundle)
+    assert {f.suffix for f in (tmp_path / "cbor" / "module").iterdir()} == {".cbor"}
+    assert artifacts["cbor"] == artifacts["json"]
+    assert sizes["cbor"] < sizes["json"] / 2
+
+
+def test_write_artifact_matches_write_and_pack(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """``--artifact`` packs the in-memory build into the bytes ``write``
+    followed by ``papyri pack`` produces, in either staging format."""
+    from papyri.pack import make_artifact_from_dir
+
+    name = "papyri_artifact_pkg"
+    _write_synthetic_package(tmp_path, name)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for fmt in ("json", "cbor"):
+        gen = _gen_synthetic_package(tmp_path, name, staging_format=fmt)
+        bundle = tmp_path / fmt
+        bundle.mkdir()
+        gen.write(bundle)
+        packed, _ = make_artifact_from_dir(bundle)
+        gen.write_artifact(tmp_path / f"{fmt}.papyri")
+        assert (tmp_path / f"{fmt}.papyri").read_bytes() == packed
+
+
+def test_watch_regenerates_only_the_edited_module(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """``--watch`` re-imports an edited module and rewrites the bundle files of
+    its objects only, removing those that no longer exist."""
+    name = "papyri_watch_pkg"
+    _write_synthetic_package(tmp_path, name)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    gen = _gen_synthetic_package(tmp_path, name)
+    bundle = tmp_path / "bundle"
+    bundle.mkdir()
+    gen.partial_write(bundle)
+    module = bundle / "module"
+    before = {f.name: f.read_bytes() for f in module.iterdir()}
+    assert f"{name}.sub:Thing.json" in before
+
+    sub = tmp_path / name / "sub.py"
+    source = sub.read_text()
+    sub.write_text(
+        source[: source.index("class Thing")].replace("unchanged", "untouched")
+    )
+    sources = watch._Sources(gen, api=True, narrative=False)
+    assert sources.modules[sub] == f"{name}.sub"
+    gen.data = {}
+    watch.regenerate(gen, bundle, {sub}, sources)
+
+    assert set(gen.data) == {f"{name}.sub", f"{name}.sub:helper"}
+    after = {f.name: f.read_bytes() for f in module.iterdir()}
+    assert set(before) - set(after) == {
+        f"{name}.sub:Thing.json",
+        f"{name}.sub:Thing.grow.json",
+    }
+    assert b"untouched" in after[f"{name}.sub:helper.json"]
+    assert after[f"{name}:add.json"] == before[f"{name}:add.json"]
+
+
+def test_watch_recovers_from_a_broken_save(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A module that fails to import keeps its previous version and stays
+    watched, and the save that fixes it is picked up."""
+    name = "papyri_watch_broken_pkg"
+    _write_synthetic_package(tmp_path, name)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    gen = _gen_synthetic_package(tmp_path, name)
+    bundle = tmp_path / "bundle"
+    bundle.mkdir()
+    gen.partial_write(bundle)
+    sources = watch._Sources(gen, api=True, narrative=False)
+    sub = tmp_path / name / "sub.py"
+    old = sys.modules[f"{name}.sub"]
+
+    source = sub.read_text()
+    sub.write_text(source + "\ndef broken(:\n")
+    with pytest.raises(SyntaxError):
+        watch.regenerate(gen, bundle, {sub}, sources)
+    assert sys.modules[f"{name}.sub"] is old
+    sources.refresh(gen)
+    assert sources.modules[sub] == f"{name}.sub"
+
+    sub.write_text(source.replace("unchanged", "untouched"))
+    gen.data = {}
+    watch.regenerate(gen, bundle, {sub}, sources)
+    assert sys.modules[f"{name}.sub"] is not old
+    helper = bundle / "module" / f"{name}.sub:helper.json"
+    assert b"untouched" in helper.read_bytes()
+
+
+def test_collect_api_docs_cache_reuses_unchanged_objects(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    """A rebuild replays cached objects verbatim and only rebuilds objects
+    whose defining file changed."""
+    name = "papyri_cache_pkg"
+    _write_synthetic_package(tmp_path, name)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    def build() -> Gen:
+        for mod in [m for m in sys.modules if m.split(".")[0] == name]:
+            monkeypatch.delitem(sys.modules, mod)
+        caplog.clear()
+        with caplog.at_level(logging.INFO, logger="papyri"):
+            return _gen_synthetic_package(tmp_path, name, dry_run=False)
+
+    def summary() -> str:
+        (msg,) = [r.getMessage() for r in caplog.records if "API docs cache" in r.msg]
+        return msg
+
+    uncached = _gen_synthetic_package(tmp_path, name, cache=False)
+    cold = build()
+    total = len(cold.data)
+    assert f"0/{total} hit(s), {total} miss(es)" in summary()
+
+    warm = build()
+    assert f"{total}/{total} hit(s), 0 miss(es)" in summary()
+    for gen in (cold, warm):
+        assert list(gen.data) == list(uncached.data)
+        assert {k: v.to_json() for k, v in gen.data.items()} == {
+            k: v.to_json() for k, v in uncached.data.items()
+        }
+        assert gen.bdata == uncached.bdata
+        assert gen.diagnostics.records == uncached.diagnostics.records
+
+    sub = tmp_path / name / "sub.py"
+    sub.write_text(sub.read_text().replace("unchanged.", "unchanged, always."))
+    edited = build()
+    in_sub = [qa for qa in edited.data if qa.startswith(f"{name}.sub")]
+    assert len(in_sub) >= 3
+    hits = total - len(in_sub)
+    assert f"{hits}/{total} hit(s), {len(in_sub)} miss(es)" in summary()
+    assert b"always" in edited.data[f"{name}.sub:helper"].to_json()
+
+
+def test_collect_api_docs_cache_replays_plots_after_edit(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Replayed ``.. plot::`` assets and the ones of rebuilt objects never
+    collide: a cached rebuild after editing one module matches a fresh one."""
+    pytest.importorskip("matplotlib")
+    monkeypatch.setenv("MPLBACKEND", "agg")
+    name = "papyri_cache_plot_pkg"
+    pkg = tmp_path / name
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text(
+        "from .a import plot0, plot1\nfrom .b import plot2, plot3\n"
+    )
+    for module, plots in (("a", (0, 1)), ("b", (2, 3))):
+        (pkg / f"{module}.py").write_text(
+            "".join(textwrap.dedent(_PLOT_FUNCTION.format(i=i)) for i in plots)
+        )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    def build(**config: Any) -> Gen:
+        for mod in [m for m in sys.modules if m.split(".")[0] == name]:
+            monkeypatch.delitem(sys.modules, mod)
+        return _gen_synthetic_package(tmp_path, name, dry_run=False, **config)
+
+    build()
+    b = pkg / "b.py"
+    b.write_text(b.read_text().replace("[1, 2, 3]", "[3, 2, 1]"))
+    edited = build()
+    fresh = build(cache=False)
+
+    assert len(fresh.bdata) == 4
+    assert edited.bdata == fresh.bdata
+    assert {k: v.to_json() for k, v in edited.data.items()} == {
+        k: v.to_json() for k, v in fresh.data.items()
+    }
+
+
+def test_stream_to_writes_objects_as_they_finish(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """With ``stream_to`` set, documents and assets go straight to the bundle
+    folder and nothing accumulates in ``Gen.data``/``Gen.bdata``."""
+    name = "papyri_stream_pkg"
+    _write_synthetic_package(tmp_path, name)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    in_memory = _gen_synthetic_package(tmp_path, name)
+
+    bundle = tmp_path / "bundle"
+    bundle.mkdir()
+    gen = Gen(
+        dummy_progress=True,
+        config=Config(dry_run=True, dummy_progress=True, infer=False),
+    )
+    gen.collect_package_metadata(name, relative_dir=tmp_path, meta={})
+    gen.stream_to(bundle)
+    gen.collect_api_docs(name, limit_to=[])
+
+    assert gen.data == {}
+    assert gen.bdata == {}
+    written = {
+        p.name[: -len(".json")]: p.read_bytes() for p in (bundle / "module").iterdir()
+    }
+    assert written == {k: v.to_json() for k, v in in_memory.data.items()}
+    assert gen._meta["summary"] == in_memory._meta["summary"]
+
+
+def test_collector_does_not_compare_objects(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Visited objects are tracked by identity; collecting must never call
+    (possibly broken or elementwise) ``__eq__`` implementations."""
+    pkg = tmp_path / "papyri_eq_pkg"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text(
+        textwrap.dedent(
+            """
+            class Meta(type):
+                def __eq__(cls, other):
+                    raise TypeError("no comparisons")
+
+                __hash__ = type.__hash__
+
+
+            class A(metaclass=Meta):
+                def f(self):
+                    pass
+
+
+            class B(metaclass=Meta):
+                pass
+
+
+            Alias = A
+            """
+        )
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    import papyri_eq_pkg
+
+    collected = DFSCollector(papyri_eq_pkg, []).items()
+    assert collected["papyri_eq_pkg:A"] is papyri_eq_pkg.A
+    assert collected["papyri_eq_pkg:B"] is papyri_eq_pkg.B
+    assert "papyri_eq_pkg:A.f" in collected
+
+
+def test_each_docstring_is_parsed_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """APIObjectInfo's numpydoc and tree-sitter parses are reused when the
+    GeneratedDoc is built, rather than parsing every docstring twice."""
+    from papyri import ts
+
+    name = "papyri_parse_once_pkg"
+    _write_synthetic_package(tmp_path, name)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    calls: list[tuple[str | None, bytes]] = []
+    parse = ts.parse
+
+    def counting_parse(text: bytes, qa: str | None = None) -> Any:
+        calls.append((qa, text))
+        return parse(text, qa)
+
+    monkeypatch.setattr(ts, "parse", counting_parse)
+    gen = _gen_synthetic_package(tmp_path, name)
+
+    assert len(gen.data) > 3
+    assert gen.parse_counts["numpydoc"] == len(gen.data)
+    assert gen.parse_counts["ts"] > 0
+    assert len(set(calls)) == len(calls), "some text was parsed twice"
+
+
+def test_example_workers_isolate_hanging_examples(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """With ``example_workers``, an example that outlives ``example_timeout``
+    only loses its own outputs; every other object renders as in-process."""
+    name = "papyri_exec_pool_pkg"
+    _write_synthetic_package(tmp_path, name)
+    sub = tmp_path / name / "sub.py"
+    sub.write_text(
+        sub.read_text()
+        + textwrap.dedent(
+            '''
+
+            def stall():
+                """
+                Take forever.
+
+                Examples
+                --------
+                >>> import time
+                >>> time.sleep(60)
+                """
+            '''
+        )
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    in_process = _gen_synthetic_package(tmp_path, name, exclude=[f"{name}.sub:stall"])
+    pooled = _gen_synthetic_package(
+        tmp_path, name, example_workers=1, example_timeout=1
+    )
+
+    stall = f"{name}.sub:stall"
+    assert stall in pooled.data
+    (record,) = [r for r in pooled.diagnostics.records if r["target"] == stall]
+    assert record["code"] == "W-example-worker"
+    assert "timed out" in record["message"]
+    for qa, doc in in_process.data.items():
+        assert pooled.data[qa].to_json() == doc.to_json(), qa
+
+
+_FORK_CHECK = """
+import warnings
+
+from papyri.config_loader import Config
+from papyri.gen import Gen
+
+with warnings.catch_warnings(record=True) as caught:
+    warnings.simplefilter("always")
+    gen = Gen(
+        dummy_progress=True,
+        config=Config(
+            dummy_progress=True,
+            infer=False,
+            dry_run=True,
+            example_workers=1,
+            example_worker_max_tasks=1,
+        ),
+    )
+    gen.collect_package_metadata("{name}", relative_dir=".", meta={{}})
+    gen.collect_api_docs("{name}", limit_to=[])
+    assert len(gen.bdata) >= 2, gen.bdata
+for w in caught:
+    if "fork()" in str(w.message):
+        print(w.filename, w.lineno, w.message)
+"""
+
+
+def test_example_workers_fork_without_threads(tmp_path: Path) -> None:
+    """Every example worker is forked after the figure encoder threads of
+    the parent are stopped. Run in a fresh interpreter: threads left by other
+    tests would trip the check too."""
+    pytest.importorskip("matplotlib")
+    name = "papyri_fork_pkg"
+    # ``.. plot::`` runs in the parent and starts its encoder threads; each
+    # Examples section then forks a fresh worker (one task per worker).
+    function = '''
+        def plot{i}():
+            """
+            Plot.
+
+            Notes
+            -----
+            .. plot::
+
+               import matplotlib.pyplot as plt
+               plt.plot([1, 2, {i}])
+
+            Examples
+            --------
+            >>> {i} + 1
+            {j}
+            """
+        '''
+    pkg = tmp_path / name
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text(
+        "".join(textwrap.dedent(function.format(i=i, j=i + 1)) for i in range(3))
+    )
+    env = {**os.environ, "PYTHONPATH": str(tmp_path), "MPLBACKEND": "agg"}
+    result = subprocess.run(
+        [sys.executable, "-c", _FORK_CHECK.format(name=name)],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == ""
+
+
+_JOBS_FORK_CHECK = """
+import warnings
+
+from papyri.config_loader import Config
+from papyri.gen import Gen
+from papyri.tokens import tokenize_script
+
+config = Config(dummy_progress=True, dry_run=True, jobs=2)
+with warnings.catch_warnings(record=True) as caught:
+    warnings.simplefilter("always")
+    # As ``collect_examples_out`` does before the API docs: start Jedi's
+    # subprocess, and its reader thread, in the parent.
+    assert tokenize_script("import os\\nos.path", {{}}, "", config)
+    gen = Gen(dummy_progress=True, config=config)
+    gen.collect_package_metadata("{name}", relative_dir=".", meta={{}})
+    gen.collect_api_docs("{name}", limit_to=[])
+    assert len(gen.data) > 3, gen.data
+for w in caught:
+    if "fork()" in str(w.message):
+        print(w.filename, w.lineno, w.message)
+"""
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="--jobs requires fork")
+def test_jobs_fork_without_jedi_subprocess(tmp_path: Path) -> None:
+    """``--jobs`` workers are forked after the Jedi subprocess of the parent
+    is stopped, rather than sharing its pipes. Run in a fresh interpreter:
+    threads left by other tests would trip the check too."""
+    name = "papyri_jobs_jedi_pkg"
+    _write_synthetic_package(tmp_path, name)
+    env = {**os.environ, "PYTHONPATH": str(tmp_path)}
+    result = subprocess.run(
+        [sys.executable, "-c", _JOBS_FORK_CHECK.format(name=name)],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == ""
+
+
+def test_exec_cache_replays_unchanged_examples(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    """A rebuild replays executed examples from the exec cache instead of
+    running them, and the result matches an uncached build."""
+    name = "papyri_exec_cache_pkg"
+    _write_synthetic_package(tmp_path, name)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    executed: list[str] = []
+    get_example_data = Gen.get_example_data
+
+    def counting(self: Gen, *args: Any, qa: str, **kwargs: Any) -> Any:
+        executed.append(qa)
+        return get_example_data(self, *args, qa=qa, **kwargs)
+
+    monkeypatch.setattr(Gen, "get_example_data", counting)
+
+    def build(**config: Any) -> Gen:
+        executed.clear()
+        caplog.clear()
+        with caplog.at_level(logging.INFO, logger="papyri"):
+            return _gen_synthetic_package(
+                tmp_path, name, dry_run=False, cache=False, **config
+            )
+
+    def summary() -> str:
+        (msg,) = [r.getMessage() for r in caplog.records if "Examples cache" in r.msg]
+        return msg
+
+    uncached = build(exec_cache=False)
+    with_examples = sorted(executed)
+    assert with_examples == [f"{name}.sub:helper", f"{name}:add"]
+    n = len(with_examples)
+
+    cold = build()
+    assert sorted(executed) == with_examples
+    assert f"0/{n} hit(s), {n} miss(es), 0 evicted" in summary()
+
+    warm = build(exec_cache_size=0)
+    assert executed == []
+    assert f"{n}/{n} hit(s), 0 miss(es), {n} evicted" in summary()
+    for gen in (cold, warm):
+        assert {k: v.to_json() for k, v in gen.data.items()} == {
+            k: v.to_json() for k, v in uncached.data.items()
+        }
+        assert gen.bdata == uncached.bdata
+
+    build()
+    assert sorted(executed) == with_examples
+
+
+def test_exec_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    from papyri.nodes import Section
+
+    cache = exec_cache.ExecCache(tmp_path, "context", max_size=0)
+    for i, key in enumerate(["aa01", "aa02", "aa03"]):
+        cache.put(key, Section([], None), [(f"fig-{key}.png", b"x" * 100)])
+        os.utime(cache._entry(key), ns=(i, i))
+    assert cache.get("aa01") is not None  # now the most recently used
+    cache.max_size = cache._entry("aa01").stat().st_size
+    assert cache.evict() == 2
+    assert cache.get("aa01") is not None
+    assert cache.get("aa02") is None
+    assert cache.get("aa03") is None
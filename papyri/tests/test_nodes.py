@@ -1,19 +1,41 @@
 from __future__ import annotations
 
+import pickle
 from typing import Any
 
 import pytest
 
+from papyri.node_serializer import serialize
+from papyri.serde import deserialize
 from papyri.ts import parse
 
+from ..node_base import (
+    Interner,
+    WrongTypeAtField,
+    construction_plan,
+    interning,
+    not_type_check,
+    type_checker,
+)
 from ..nodes import (
+    Admonition,
+    AdmonitionTitle,
+    Comment,
+    CrossRef,
     Directive,
+    LocalRef,
+    Paragraph,
+    RefInfo,
     Section,
+    Table,
+    Target,
     Text,
     UnprocessedDirective,
     dedent_but_first,
+    encoder,
     get_object,
 )
+from .utils import CORP, _process
 
 
 @pytest.mark.parametrize(
@@ -62,3 +84,161 @@ def test_validate_tolerates_unprocessed_directive() -> None:
         target=None,
     )
     sec.validate()
+
+
+@pytest.mark.parametrize(
+    "sample", sorted(CORP.glob("*.sample.txt")), ids=lambda p: p.name
+)
+def test_compiled_serializers_match_reference(sample: Any) -> None:
+    # to_dict/from_dict use the serializers compiled per class; they must
+    # agree with the generic serialize/deserialize they replace.
+    for node in _process(sample):
+        data = node.to_dict()
+        assert data == serialize(node, type(node))
+        assert type(node).from_dict(data) == deserialize(type(node), type(node), data)
+        assert type(node).from_dict(data).to_dict() == data
+
+
+def test_compiled_serializers_edge_cases() -> None:
+    # Unions holding None tag it as NoneType; ClassVar annotations serialize
+    # to None; a union member is picked by its ``type`` tag.
+    title = AdmonitionTitle((Text("Note"), None))
+    comment = Comment("hidden")
+    ref = CrossRef("intro", reference=LocalRef("docs", "intro"), kind="docs")
+    for node in (title, comment, ref, Paragraph((ref, Text("x")))):
+        data = node.to_dict()
+        assert data == serialize(node, type(node))
+        assert type(node).from_dict(data) == node
+    assert title.to_dict()["children"][1] == {"data": None, "type": "NoneType"}
+    assert comment.to_dict()["_drop_in_cbor"] is None
+
+    nested = Section(
+        children=[
+            Directive(name="someunknown", args=None, options={}, value="x", children=[])
+        ],
+        title=(Text("Sec"),),
+        level=1,
+        target=None,
+    )
+    with pytest.raises(NotImplementedError, match="someunknown"):
+        nested.to_dict()
+
+
+def test_construction_plans() -> None:
+    # Lists become tuples where a tuple is declared; the post hook runs for
+    # constructors and for both decoders, which skip trusted __init__s.
+    assert construction_plan(Paragraph).tuple_fields == {"children"}
+    assert construction_plan(Paragraph).trusted
+    assert construction_plan(Text).trusted
+    assert not construction_plan(LocalRef).trusted
+    assert Paragraph([Text("x")]).children == (Text("x"),)
+
+    admonition = Admonition(kind="warning", base_type="?", children=[])
+    assert admonition.base_type == "warning"
+    assert admonition.children == ()
+    stale = {**admonition.to_dict(), "base_type": "?"}
+    assert Admonition.from_dict(stale).base_type == "warning"
+    assert encoder.decode(encoder.encode(admonition)) == admonition
+
+    target = Target.from_dict(Target("label").to_dict())
+    assert (target.label, target.url) == ("label", None)
+
+
+def test_nodes_are_slotted() -> None:
+    # Fields live in slots generated from the annotations; ClassVars and
+    # ``type`` tags stay on the class, defaults are applied per instance.
+    section = Section([Text("x")])
+    assert not hasattr(section, "__dict__")
+    assert (section.title, section.level, section.target) == ((), 0, None)
+    assert Table().children == ()
+    assert Comment("c").type == "comment" and Comment._drop_in_cbor
+    assert "_drop_in_cbor" not in Comment.__slots__
+    ref = RefInfo("numpy", "2.5.4", "module", "numpy:add")
+    for node in (section, ref, CrossRef("add", reference=ref, kind="module")):
+        assert pickle.loads(pickle.dumps(node)) == node
+
+
+def test_decoding_interns_leaves() -> None:
+    # Under interning(), equal leaves decoded by either decoder are one object
+    # with a cached hash; containers and leaves decoded outside stay distinct.
+    ref = RefInfo("numpy", "2.5.4", "module", "numpy:add")
+    doc = Section(
+        [
+            Paragraph([Text("x"), CrossRef("add", reference=ref, kind="module")]),
+            Paragraph([Text("x"), CrossRef("add", reference=ref, kind="module")]),
+        ]
+    )
+    with interning() as interner:
+        decoded = [
+            encoder.decode(encoder.encode(doc)),
+            Section.from_dict(doc.to_dict()),
+        ]
+    for section in decoded:
+        assert section == doc
+        first, second = section.children
+        assert first is not second
+        assert first.children[0] is second.children[0]
+        assert first.children[1] is second.children[1]
+    assert decoded[0].children[0].children[1] is decoded[1].children[0].children[1]
+    assert interner.kept == {"Text": 1, "CrossRef": 1, "RefInfo": 1}
+    assert interner.seen == {"Text": 4, "CrossRef": 4, "RefInfo": 4}
+    assert interner.ratio == 4.0
+
+    text = decoded[0].children[0].children[0]
+    assert hash(text) == text._hash == hash(Text("x"))
+    assert not hasattr(pickle.loads(pickle.dumps(text)), "_hash")
+    plain = encoder.decode(encoder.encode(doc))
+    assert plain.children[0].children[0] is not plain.children[1].children[0]
+    assert Interner()(doc) is doc
+
+
+def test_structural_hash() -> None:
+    # Equal nodes hash equal, whatever sequence or mapping type they hold.
+    assert hash(Paragraph([Text("a")])) == hash(Paragraph((Text("a"),)))
+    assert hash(Text("a")) != hash(Text("b"))
+    ref = RefInfo("numpy", "2.5.4", "module", "numpy:add")
+    assert len({ref, RefInfo("numpy", "2.5.4", "module", "numpy:add")}) == 1
+
+
+@pytest.mark.parametrize(
+    "annotation",
+    [
+        str,
+        str | None,
+        RefInfo | LocalRef,
+        tuple[Text, ...],
+        tuple[Text | CrossRef, ...] | None,
+        dict[str, Paragraph],
+        dict[str, tuple[Text, ...]],
+    ],
+)
+def test_type_checker_matches_not_type_check(annotation: Any) -> None:
+    values = [
+        None,
+        "s",
+        1,
+        Text("x"),
+        RefInfo(None, None, "api", "x"),
+        LocalRef("docs", "x"),
+        (Text("x"),),
+        [Text("x"), CrossRef("x", LocalRef("docs", "x"), "docs")],
+        (Text("x"), "s"),
+        {"a": Paragraph([])},
+        {"a": (Text("x"),)},
+        {"a": "s"},
+        {1: Paragraph([])},
+    ]
+    for value in values:
+        expected = not_type_check(value, annotation) is None
+        assert type_checker(annotation)(value) is expected, value
+
+
+def test_validate_checks_immutable_leaves_once() -> None:
+    text = Text("x")
+    Paragraph([text]).validate()
+    assert text._validated  # type: ignore[attr-defined]
+    broken = Text("x")
+    object.__setattr__(broken, "value", 1)
+    with pytest.raises(WrongTypeAtField, match=r"children\.0\.value field of"):
+        Paragraph([broken]).validate()
+    assert not hasattr(broken, "_validated")
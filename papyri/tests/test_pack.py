@@ -689,6 +689,32 @@ def test_pack_cli_bulk_mode(tmp_path: Any, monkeypatch: Any) -> None:
     assert (data_dir / "pkg2-2.0.papyri").is_file()
 
 
+def test_pack_cli_no_revalidate(tmp_path: Any, monkeypatch: Any) -> None:
+    """--no-revalidate packs the same bytes without re-running validate()."""
+    import typer
+    from typer.testing import CliRunner
+
+    from papyri.cli.pack import pack as pack_cli
+
+    bundle_dir = _make_minimal_bundle_dir(tmp_path / "mypkg_1.0")
+    expected, _ = make_artifact_from_dir(bundle_dir)
+
+    def fail(self: Any) -> None:
+        raise AssertionError("revalidated")
+
+    monkeypatch.setattr(Bundle, "validate", fail)
+    app = typer.Typer()
+    app.command()(pack_cli)
+    out = tmp_path / "x.papyri"
+    result = CliRunner().invoke(
+        app, [str(bundle_dir), "--no-revalidate", "-o", str(out)]
+    )
+    assert result.exit_code == 0, result.output
+    assert out.read_bytes() == expected
+    with pytest.raises(AssertionError, match="revalidated"):
+        make_artifact_from_dir(bundle_dir)
+
+
 def test_pack_cli_bulk_mode_rejects_output_flag(
     tmp_path: Any, monkeypatch: Any
 ) -> None:
@@ -744,6 +770,45 @@ def test_explode_bundle_to_dir_round_trips(tmp_path: Any) -> None:
     assert read_bundle_dir(out) == bundle
 
 
+def test_cbor_staging_round_trips_and_packs_identically(tmp_path: Any) -> None:
+    """A CBOR staging directory reads back as the same Bundle, packs to the
+    same artifact, and ``unpack --json`` turns it back into JSON."""
+    import typer
+    from typer.testing import CliRunner
+
+    from papyri.cli.unpack import unpack as unpack_cli
+    from papyri.nodes import LocalRef, TocTree
+
+    bundle = _make_bundle_node(
+        narrative={"index": _minimal_narrative_doc()},
+        toc=[TocTree(children=(), title="Root", ref=LocalRef("docs", "index"))],
+    )
+    out = tmp_path / "cbor" / "mypkg_1.0"
+    explode_bundle_to_dir(bundle, out, staging_format="cbor")
+    assert json.loads((out / "papyri.json").read_text())["staging_format"] == "cbor"
+    assert [p.name for p in (out / "docs").iterdir()] == ["index.cbor"]
+    read = read_bundle_dir(out)
+    assert read == bundle
+    assert make_artifact(read) == make_artifact(bundle)
+
+    app = typer.Typer()
+    app.command()(unpack_cli)
+    result = CliRunner().invoke(app, [str(out), "--json", "-o", str(tmp_path / "js")])
+    assert result.exit_code == 0, result.output
+    converted = tmp_path / "js" / "mypkg_1.0"
+    assert [p.name for p in (converted / "docs").iterdir()] == ["index"]
+    assert read_bundle_dir(converted) == bundle
+
+
+def test_pack_rejects_json_entry_in_cbor_staging(tmp_path: Any) -> None:
+    bundle_dir = _make_minimal_bundle_dir(
+        tmp_path / "mypkg_1.0", extra_meta={"staging_format": "cbor"}
+    )
+    (bundle_dir / "module" / "mypkg.json").write_text("{}")
+    with pytest.raises(BundleError, match=r"does not have \.cbor suffix"):
+        read_bundle_dir(bundle_dir)
+
+
 def test_explode_bundle_to_dir_refuses_existing(tmp_path: Any) -> None:
     bundle = _make_bundle_node()
     out = tmp_path / "mypkg_1.0"
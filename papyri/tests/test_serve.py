@@ -0,0 +1,212 @@
+"""Tests for ``papyri.serve``, the request handling of ``papyri gen --serve``."""
+
+from __future__ import annotations
+
+import json
+import os
+import stat
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from papyri import serve
+from papyri.config_loader import Config
+from papyri.gen import Gen
+
+SOURCE = '''
+def double(x):
+    """
+    Return twice ``x``.
+
+    Examples
+    --------
+    >>> double(2)
+    4
+    """
+    return 2 * x
+'''
+
+
+@pytest.fixture
+def server(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> serve.GenServer:
+    pkg = tmp_path / "papyri_serve_pkg"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text(textwrap.dedent(SOURCE))
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "index.rst").write_text("Index\n=====\n\nSee :ref:`intro`.\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "papyri_serve_pkg", raising=False)
+    config = Config(dummy_progress=True, dry_run=True, infer=False)
+    config.docs_path = str(docs)
+    g = Gen(dummy_progress=True, config=config)
+    g.collect_package_metadata("papyri_serve_pkg", relative_dir=tmp_path, meta={})
+    bundle = tmp_path / "bundle"
+    bundle.mkdir()
+    return serve.GenServer(g, bundle, max_pending=2)
+
+
+def rpc(server: serve.GenServer, method: str, **params: object) -> dict[str, Any]:
+    line = json.dumps({"jsonrpc": "2.0", "id": 7, "method": method, "params": params})
+    response = server.handle_line(line.encode())
+    assert response is not None
+    decoded: dict[str, Any] = json.loads(response)
+    return decoded
+
+
+def test_generate_object_and_status(server: serve.GenServer) -> None:
+    result = rpc(server, "generate_object", qualname="papyri_serve_pkg:double")
+    assert result["id"] == 7
+    path = Path(result["result"]["path"])
+    assert path == server.bundle / "module" / "papyri_serve_pkg:double.json"
+    assert b"Return twice" in path.read_bytes()
+
+    source = Path(server.g.api_objects()["papyri_serve_pkg"].__file__)
+    source.write_text(source.read_text().replace("twice", "two times"))
+    rpc(server, "generate_object", qualname="papyri_serve_pkg:double", reload=True)
+    assert b"Return two times" in path.read_bytes()
+
+    error = rpc(server, "generate_object", qualname="papyri_serve_pkg:nope")
+    assert error["error"]["code"] == serve.INVALID_PARAMS
+
+    status = rpc(server, "status")["result"]
+    assert status["package"] == "papyri_serve_pkg"
+    assert status["pending"] == 0
+    stats = status["methods"]["generate_object"]
+    assert (stats["ok"], stats["errors"]) == (2, 1)
+    assert 0 < stats["p50_s"] <= stats["p95_s"] <= stats["max_s"]
+
+
+def test_reload_after_a_broken_save(server: serve.GenServer) -> None:
+    """A reload that fails to import keeps serving the previous version of
+    the module, and the next reload picks up the fix."""
+    qualname = "papyri_serve_pkg:double"
+    path = Path(rpc(server, "generate_object", qualname=qualname)["result"]["path"])
+    source = Path(server.g.api_objects()["papyri_serve_pkg"].__file__)
+    good = source.read_text()
+
+    source.write_text(good + "\ndef broken(:\n")
+    error = rpc(server, "generate_object", qualname=qualname, reload=True)
+    assert "SyntaxError" in error["error"]["message"]
+    assert "result" in rpc(server, "generate_object", qualname=qualname)
+    assert b"Return twice" in path.read_bytes()
+
+    source.write_text(good.replace("twice", "two times"))
+    rpc(server, "generate_object", qualname=qualname, reload=True)
+    assert b"Return two times" in path.read_bytes()
+
+
+def test_generate_narrative_reports_diagnostics(server: serve.GenServer) -> None:
+    result = rpc(server, "generate_narrative", path="index.rst")["result"]
+    assert result["key"] == "index"
+    assert Path(result["path"]) == server.bundle / "docs" / "index"
+    assert [d["code"] for d in result["diagnostics"]] == ["W-unresolved-ref"]
+
+    error = rpc(server, "generate_narrative", path="../elsewhere.rst")
+    assert error["error"]["code"] == serve.INVALID_PARAMS
+
+
+def test_protocol_errors(server: serve.GenServer) -> None:
+    assert json.loads(server.handle_line(b"{nope") or b"")["error"]["code"] == (
+        serve.PARSE_ERROR
+    )
+    assert rpc(server, "frobnicate")["error"]["code"] == serve.METHOD_NOT_FOUND
+    assert rpc(server, "status", verbose=True)["error"]["code"] == (
+        serve.INVALID_PARAMS
+    )
+    notification = {"jsonrpc": "2.0", "method": "status"}
+    assert server.handle_line(json.dumps(notification).encode()) is None
+
+    server.pending = server.max_pending
+    busy = rpc(server, "generate_object", qualname="papyri_serve_pkg:double")
+    assert busy["error"]["code"] == serve.SERVER_BUSY
+    assert "result" in rpc(server, "status")
+
+
+def test_serve_over_unix_socket(server: serve.GenServer, tmp_path: Path) -> None:
+    sock = tmp_path / "gen.sock"
+    thread = threading.Thread(target=server.serve, args=(sock,))
+    thread.start()
+    try:
+        deadline = time.monotonic() + 10
+        while not sock.exists():
+            assert time.monotonic() < deadline, "server did not start"
+            time.sleep(0.01)
+        assert stat.S_IMODE(sock.stat().st_mode) == 0o600
+        assert serve.call(sock, "status")["bundle"] == str(server.bundle)
+        result = serve.call(sock, "generate_object", qualname="papyri_serve_pkg:double")
+        assert Path(result["path"]).is_file()
+        with pytest.raises(serve.RPCError, match="unknown method"):
+            serve.call(sock, "frobnicate")
+    finally:
+        if sock.exists():
+            serve.call(sock, "shutdown")
+        thread.join(10)
+    assert not thread.is_alive()
+    assert not sock.exists()
+
+
+_SERVE_FORKS = """
+import sys
+import warnings
+from pathlib import Path
+
+from papyri import serve
+from papyri.config_loader import Config
+from papyri.gen import Gen
+
+with warnings.catch_warnings(record=True) as caught:
+    warnings.simplefilter("always")
+    config = Config(
+        dummy_progress=True,
+        dry_run=True,
+        infer=False,
+        example_workers=1,
+        example_worker_max_tasks=1,
+    )
+    g = Gen(dummy_progress=True, config=config)
+    g.collect_package_metadata("papyri_serve_pkg", relative_dir=".", meta={})
+    serve.GenServer(g, Path("bundle")).serve(Path(sys.argv[1]))
+for w in caught:
+    if "fork()" in str(w.message):
+        print(w.filename, w.lineno, w.message)
+"""
+
+
+def test_serving_forks_example_workers_without_threads(tmp_path: Path) -> None:
+    """Requests run on the serving thread, the only one of the process, so
+    example workers are forked safely. Run in a fresh interpreter: threads
+    left by other tests would trip the check too."""
+    (tmp_path / "papyri_serve_pkg").mkdir()
+    (tmp_path / "papyri_serve_pkg" / "__init__.py").write_text(SOURCE)
+    (tmp_path / "bundle").mkdir()
+    sock = tmp_path / "gen.sock"
+    env = {**os.environ, "PYTHONPATH": str(tmp_path)}
+    process = subprocess.Popen(
+        [sys.executable, "-c", _SERVE_FORKS, str(sock)],
+        cwd=tmp_path,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while not sock.exists():
+            assert process.poll() is None, process.communicate()[1]
+            assert time.monotonic() < deadline, "server did not start"
+            time.sleep(0.05)
+        for _ in range(2):
+            serve.call(sock, "generate_object", qualname="papyri_serve_pkg:double")
+        serve.call(sock, "shutdown")
+        out, err = process.communicate(timeout=30)
+    finally:
+        process.kill()
+    assert process.returncode == 0, err
+    assert out == ""
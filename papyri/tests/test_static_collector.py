@@ -0,0 +1,176 @@
+"""Tests for ``papyri.static_collector``, the import-free API collector."""
+
+from __future__ import annotations
+
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from papyri.gen import DFSCollector
+from papyri.signature import Signature
+from papyri.static_collector import StaticPackage, realize, stub_info
+
+PACKAGE = {
+    "__init__.py": '''
+        """Root.
+
+            Indented line.
+        """
+        from __future__ import annotations
+
+        __version__ = "2.1.0"
+        __all__ = ["add", "Thing", "helper"]
+
+        from .core import *
+        from .core import helper as _h
+        from . import sub
+        import {name}.other
+
+        alias = _h
+
+
+        def add(a: int, b: int = 1, *args, key: str = "x", **kw) -> int:
+            """Add."""
+            return a + b
+
+
+        async def fetch(url, timeout=None):
+            """Fetch."""
+
+
+        def count(n=3):
+            """Count."""
+            yield n
+        ''',
+    "core.py": '''
+        """Core."""
+        from typing import TYPE_CHECKING
+
+        if TYPE_CHECKING:
+            from .typing_only import T
+
+        __all__ = ["helper", "Thing"]
+
+
+        def helper(x, *, z=(1, 2)):
+            """Help."""
+            return x
+
+
+        def _private():
+            pass
+
+
+        class Thing:
+            """A thing.
+
+               Second line.
+            """
+
+            def __init__(self, size: int = 3) -> None:
+                self.size = size
+
+            def grow(self, by):
+                """Grow."""
+
+            @staticmethod
+            def make(n):
+                """Make."""
+
+            @classmethod
+            def build(cls):
+                """Build."""
+
+            @property
+            def area(self):
+                """Area."""
+                return 1
+
+            class Inner:
+                """Inner."""
+
+                def deep(self):
+                    pass
+
+            alias_grow = grow
+        ''',
+    "other.py": """
+        def other_fn(a, /, b):
+            "One line."
+        """,
+    "sub/__init__.py": """
+        from .deep import deep_fn as renamed
+        """,
+    "sub/deep.py": '''
+        def deep_fn():
+            """Deep."""
+        ''',
+    "unreached.py": """
+        def nope():
+            pass
+        """,
+    "broken.py": """
+        def (
+        """,
+}
+
+
+def _write_package(root: Path, name: str) -> None:
+    for filename, source in PACKAGE.items():
+        path = root / name / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(textwrap.dedent(source.replace("{name}", name)))
+
+
+def _describe(collector: DFSCollector) -> dict[str, tuple[str | None, str, list[str]]]:
+    return {
+        qa: (
+            obj.__doc__,
+            Signature(obj).to_node().to_json().decode() if callable(obj) else "",
+            sorted(collector.aliases[qa]),
+        )
+        for qa, obj in collector.items().items()
+    }
+
+
+def test_stubs_collect_like_the_imported_package(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    name = "papyri_static_fixture"
+    _write_package(tmp_path, name)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    package = StaticPackage.parse(name)
+    assert package.infos[f"{name}.broken"] is None
+    assert package.constant(name, "__version__") == "2.1.0"
+    (root,) = package.load([name])
+    static = _describe(DFSCollector(root, []))
+    assert name not in sys.modules
+
+    imported = _describe(DFSCollector(__import__(name), []))
+    assert static == imported
+    assert f"{name}.core:Thing.make" in static
+    assert f"{name}.core:Thing.area" not in static
+    assert f"{name}.unreached" not in static
+    assert f"{name}.broken" not in sys.modules
+
+
+def test_stubs_know_where_they_come_from(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    name = "papyri_static_realize"
+    _write_package(tmp_path, name)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    (root,) = StaticPackage.parse(name, jobs=2).load([name])
+    info = stub_info(root.Thing.make)
+    assert info is not None
+    assert (info.module, info.qualname, info.line) == (f"{name}.core", "Thing.make", 32)
+    assert info.file == str(tmp_path / name / "core.py")
+    assert name not in sys.modules
+
+    real = realize(root.Thing.make)
+    assert real is sys.modules[f"{name}.core"].Thing.make
+    assert stub_info(real) is None
@@ -1,24 +1,30 @@
 """Tokenisation helpers for ``papyri gen``.
 
-Two unrelated tokenisers live here, both used to turn user-authored
-Python snippets into structured form:
+Two tokenisers live here, both used to turn user-authored Python snippets
+into structured form:
 
 - **Jedi-based identifier inference** for example blocks
-  (``parse_script``). Each identifier in the snippet is enriched with
+  (``tokenize_script``). Each identifier in the snippet is enriched with
   its fully-qualified name when Jedi can infer one.
 - **Pygments token-class extraction** for syntax-highlighting hints
-  (``get_classes`` / ``_add_classes``).
+  (``get_classes``); ``tokenize_script`` attaches the class of each token
+  from the same lexing pass.
 
-A small on-disk cache under ``~/.cache/papyri/jedi/`` keyed by content
-hash + day stops Jedi inference from re-running on every gen build.
+``JediCache``, a single SQLite file under ``~/.cache/papyri/``, stops Jedi
+inference from re-running on every gen build.
 """
 
 from __future__ import annotations
 
-import datetime
 import json
 import logging
+import os
+import sqlite3
+import time
 import warnings
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Iterable
 from hashlib import sha256
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
@@ -28,7 +34,7 @@ from pygments import lex
 from pygments.formatters import HtmlFormatter
 from pygments.lexers import PythonLexer
 
-from .utils import pos_to_nl
+from . import profiling
 
 if TYPE_CHECKING:
     from .config_loader import Config
@@ -38,44 +44,237 @@ log = logging.getLogger("papyri")
 _PYGMENTS_LEXER = PythonLexer()
 _PYGMENTS_FMT = HtmlFormatter()
 
-_JEDI_CACHE = Path("~/.cache/papyri/jedi/").expanduser()
+JEDI_CACHE_PATH = Path("~/.cache/papyri/jedi.sqlite3").expanduser()
 
+# Bump when the stored value or anything feeding the key changes meaning.
+_FORMAT = 3
 
-def _hashf(text: str) -> str:
-    ##  for cache expiring every day.
-    ## for every hours, change to 0:13.
+# Jedi cache lookups in this process: "hits" and "misses". ``Gen`` aggregates
+# them across ``--jobs`` and example workers.
+JEDI_CACHE_STATS: Counter[str] = Counter()
 
-    return sha256(text.encode()).hexdigest() + datetime.datetime.now().isoformat()[0:10]
+Tokens = list[tuple[str, str | None, str]]
 
+_INHERITED_CONNECTIONS: list[sqlite3.Connection] = []
 
-def _jedi_get_cache(text: str) -> list[tuple[str, str | None]] | None:
-    _JEDI_CACHE.mkdir(exist_ok=True, parents=True)
 
-    _cache = _JEDI_CACHE / _hashf(text)
-    if _cache.exists():
-        return [tuple(x) for x in json.loads(_cache.read_text())]
+class JediCache:
+    """
+    Persistent store of ``tokenize_script`` results, in one SQLite file.
+
+    Snippets are keyed by their hash, whether they were inferred by a
+    ``jedi.Interpreter`` against a namespace or by a plain ``jedi.Script``,
+    and ``context``, which identifies the environment inference ran in (Jedi
+    version, documented package, its version and a digest of its files), so
+    entries stay valid across days and are only dropped by ``evict``, least
+    recently used first, once the store exceeds ``max_size`` bytes.
+
+    Reads are batched: ``prefetch`` loads every snippet of an object in one
+    query, and new results and access times are written back by ``flush``.
+    The connection is opened lazily, and again after a ``fork``, so forked
+    workers share the store safely.
+    """
 
-    return None
+    def __init__(self, path: Path, context: str, max_size: int) -> None:
+        self.path = path
+        self.context = context
+        self.max_size = max_size
+        self._db: sqlite3.Connection | None = None
+        self._owner = 0
+        self._loaded: dict[str, Tokens] = {}
+        self._pending: dict[str, Tokens] = {}
+        self._used: set[str] = set()
+
+    @classmethod
+    def for_bundle(cls, root: str, version: str | None, max_size: int) -> JediCache:
+        from . import __version__
+        from .exec_cache import package_digest
+
+        context = json.dumps(
+            [
+                _FORMAT,
+                __version__,
+                jedi.__version__,
+                root,
+                version,
+                package_digest(root),
+            ]
+        )
+        return cls(JEDI_CACHE_PATH, context, max_size)
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None or self._owner != os.getpid():
+            if self._db is not None:
+                # Inherited through fork: never use it, and never let it be
+                # closed here either (closing may checkpoint the parent's WAL).
+                _INHERITED_CONNECTIONS.append(self._db)
+            self._owner = os.getpid()
+            self._loaded, self._pending, self._used = {}, {}, set()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=60)
+            self._db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self._db.execute("PRAGMA journal_mode = WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS tokens ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, used INTEGER NOT NULL)"
+            )
+        return self._db
+
+    def _key(self, text: str, interpreter: bool) -> str:
+        mode = "interpreter" if interpreter else "script"
+        return sha256(f"{self.context}\0{mode}\0{text}".encode()).hexdigest()
+
+    def prefetch(
+        self, scripts: Iterable[str], prev: str = "", *, interpreter: bool = False
+    ) -> None:
+        """Load the stored results of ``scripts`` in a single query."""
+        keys = list({self._key(prev + "\n" + s, interpreter) for s in scripts})
+        db = self._conn()
+        self._loaded = {}
+        # SQLite limits the number of bound parameters per statement.
+        for i in range(0, len(keys), 500):
+            chunk = keys[i : i + 500]
+            rows = db.execute(
+                "SELECT key, value FROM tokens WHERE key IN "
+                f"({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+            for key, value in rows:
+                self._loaded[key] = [tuple(x) for x in json.loads(value)]
+
+    def get(self, text: str, *, interpreter: bool = False) -> Tokens | None:
+        key = self._key(text, interpreter)
+        db = self._conn()
+        value = self._loaded.get(key)
+        if value is None:
+            value = self._pending.get(key)
+        if value is None:
+            row = db.execute(
+                "SELECT value FROM tokens WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                value = [tuple(x) for x in json.loads(row[0])]
+        if value is None:
+            JEDI_CACHE_STATS["misses"] += 1
+            return None
+        JEDI_CACHE_STATS["hits"] += 1
+        self._used.add(key)
+        return value
+
+    def put(self, text: str, value: Tokens, *, interpreter: bool = False) -> None:
+        self._conn()
+        self._pending[self._key(text, interpreter)] = value
+        if len(self._pending) >= 256:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write new results and access times back to the store."""
+        if self._db is None or self._owner != os.getpid():
+            return
+        if not self._pending and not self._used:
+            return
+        now = time.time_ns()
+        try:
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO tokens VALUES (?, ?, ?)",
+                    [(k, json.dumps(v), now) for k, v in self._pending.items()],
+                )
+                self._db.executemany(
+                    "UPDATE tokens SET used = ? WHERE key = ?",
+                    [(now, k) for k in self._used - self._pending.keys()],
+                )
+        except sqlite3.Error as e:
+            # The cache is an optimisation; a busy or broken store is not fatal.
+            log.debug("Could not update the Jedi cache %s: %s", self.path, e)
+        self._pending.clear()
+        self._used.clear()
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until the stored values take at
+        most ``max_size`` bytes; return the number of entries removed.
+        """
+        self.flush()
+        db = self._conn()
+        (total,) = db.execute(
+            "SELECT COALESCE(SUM(LENGTH(value)), 0) FROM tokens"
+        ).fetchone()
+        if total <= self.max_size:
+            return 0
+        doomed = []
+        for key, size in db.execute(
+            "SELECT key, LENGTH(value) FROM tokens ORDER BY used"
+        ):
+            if total <= self.max_size:
+                break
+            doomed.append((key,))
+            total -= size
+        with db:
+            db.executemany("DELETE FROM tokens WHERE key = ?", doomed)
+        db.execute("PRAGMA incremental_vacuum")
+        return len(doomed)
+
+    def close(self) -> None:
+        self.flush()
+        if self._db is not None and self._owner == os.getpid():
+            self._db.close()
+        self._db = None
+
+
+# Environment ``jedi.Script`` infers in; owned here rather than left to Jedi's
+# own cache, so that its subprocess can be stopped before forking.
+_JEDI_ENVIRONMENT: Any = None
+
+
+def _jedi_environment() -> Any:
+    global _JEDI_ENVIRONMENT
+    if _JEDI_ENVIRONMENT is None:
+        _JEDI_ENVIRONMENT = jedi.get_default_environment()
+    return _JEDI_ENVIRONMENT
+
+
+def stop_jedi() -> None:
+    """
+    Stop the Jedi subprocess and its reader thread before forking; a new
+    one is started on use.
 
+    A forked child would otherwise talk to the parent's subprocess over the
+    same pipes.
+    """
+    global _JEDI_ENVIRONMENT
+    environment, _JEDI_ENVIRONMENT = _JEDI_ENVIRONMENT, None
+    subprocess = getattr(environment, "_subprocess", None)
+    if subprocess is not None:
+        subprocess._kill()
 
-def _jedi_set_cache(text: str, value: list[tuple[str, str | None]]) -> None:
-    _JEDI_CACHE.mkdir(exist_ok=True, parents=True)
 
-    _cache = _JEDI_CACHE / _hashf(text)
-    _cache.write_text(json.dumps(value))
+def _line_starts(script: str) -> list[tuple[int, int]]:
+    """
+    ``(start, end)`` offsets of each line of ``script``, the table
+    ``pos_to_nl`` would otherwise rebuild for every token.
+    """
+    table = []
+    start = 0
+    for line in script.splitlines():
+        table.append((start, start + len(line)))
+        start += len(line) + 1
+    return table
 
 
-def parse_script(
+@profiling.phase("jedi")
+def tokenize_script(
     script: str,
     ns: dict[str, Any],
     prev: str,
     config: Config,
     *,
     where: str | None = None,
-) -> list[tuple[str, str | None]] | None:
+    cache: JediCache | None = None,
+) -> Tokens | None:
     """
-    Parse a script into tokens and use Jedi to infer the fully qualified names
-    of each token.
+    Lex a script once, and use Jedi to infer the fully qualified names of
+    each token.
 
     Parameters
     ----------
@@ -86,10 +285,12 @@ def parse_script(
         implicit imports, for example that `np` is interpreted as numpy.
     prev : str
         previous lines that lead to this.
-    where : <Insert Type here>
-        <Multiline Description Here>
-    config : <Insert Type here>
-        <Multiline Description Here>
+    config : Config
+        Only ``infer`` and ``jedi_failure_mode`` are read.
+    where : str, optional
+        Qualified name of the documented object, for log messages.
+    cache : JediCache, optional
+        Store of previous results; only used when ``config.infer`` is set.
 
     Returns
     -------
@@ -98,64 +299,95 @@ def parse_script(
         text of the token
     reference : str
         fully qualified name of the type of current token
+    class : str
+        Pygments CSS class of the token
 
+    None if Jedi failed and ``config.jedi_failure_mode`` is ``"log"``.
     """
     assert isinstance(ns, dict)
-    jeds = []
     warnings.simplefilter("ignore", UserWarning)
 
     l_delta = prev.count("\n") + 1
-    contextscript = prev + "\n" + script
-    if ns:
-        jeds.append(jedi.Interpreter(contextscript, namespaces=[ns]))
     full_text = prev + "\n" + script
-    k = _jedi_get_cache(full_text)
-    if k is not None:
-        return k
-    jeds.append(jedi.Script(full_text))
-    P = PythonLexer()
-
-    acc: list[tuple[str, str | None]] = []
-
-    for index, _type, text in P.get_tokens_unprocessed(script):
-        line_n, col_n = pos_to_nl(script, index)
+    if not config.infer:
+        cache = None
+    # A namespace of live objects infers differently than the text alone.
+    interpreter = bool(ns)
+    if cache is not None:
+        k = cache.get(full_text, interpreter=interpreter)
+        if k is not None:
+            return k
+    # Only build the Jedi object that is queried: an Interpreter when there is
+    # a namespace to resolve names against, a plain Script otherwise.
+    jed: jedi.Script | None = None
+    if config.infer:
+        if interpreter:
+            jed = jedi.Interpreter(full_text, namespaces=[ns])
+        else:
+            jed = jedi.Script(full_text, environment=_jedi_environment())
+    lines = _line_starts(script)
+    ends = [end for _, end in lines]
+    ttype2class = _PYGMENTS_FMT.ttype2class
+
+    acc: Tokens = []
+
+    for index, ttype, text in _PYGMENTS_LEXER.get_tokens_unprocessed(script):
+        cls = ttype2class.get(ttype, "")
+        if jed is None or (text in (" .=()[],")) or not text.isidentifier():
+            acc.append((text, "", cls))
+            continue
+        # Same position as ``pos_to_nl``: the first line ending at or after
+        # ``index``.
+        line_n = bisect_left(ends, index)
+        col_n = index - lines[line_n][0]
         line_n += l_delta
         ref = None
-        if not config.infer or (text in (" .=()[],")) or not text.isidentifier():
-            acc.append((text, ""))
-            continue
 
-        for jed in jeds:
-            try:
-                inf = jed.infer(line_n + 1, col_n)
-                if inf:
-                    # TODO: we might want the qualname to
-                    # be module_name:name for disambiguation.
-                    ref = inf[0].full_name
-            except (AttributeError, TypeError) as e:
-                raise type(e)(
-                    f"{contextscript}, {line_n=}, {col_n=}, {prev=}, {jed=}"
-                ) from e
-            except jedi.inference.utils.UncaughtAttributeError:
-                if config.jedi_failure_mode in (None, "error"):
-                    raise
-                elif config.jedi_failure_mode == "log":
-                    log.warning(
-                        "failed inference example will be empty %r %r %r",
-                        where,
-                        line_n,
-                        col_n,
-                    )
-                    return None
-            break
-        acc.append((text, ref))
-    _jedi_set_cache(full_text, acc)
+        try:
+            inf = jed.infer(line_n + 1, col_n)
+            if inf:
+                # TODO: we might want the qualname to
+                # be module_name:name for disambiguation.
+                ref = inf[0].full_name
+        except (AttributeError, TypeError) as e:
+            raise type(e)(f"{full_text}, {line_n=}, {col_n=}, {prev=}, {jed=}") from e
+        except jedi.inference.utils.UncaughtAttributeError:
+            if config.jedi_failure_mode in (None, "error"):
+                raise
+            elif config.jedi_failure_mode == "log":
+                log.warning(
+                    "failed inference example will be empty %r %r %r",
+                    where,
+                    line_n,
+                    col_n,
+                )
+                return None
+        acc.append((text, ref, cls))
+    if cache is not None:
+        cache.put(full_text, acc, interpreter=interpreter)
     warnings.simplefilter("default", UserWarning)
-    for a in acc:
-        assert len(a) == 2
     return acc
 
 
+def parse_script(
+    script: str,
+    ns: dict[str, Any],
+    prev: str,
+    config: Config,
+    *,
+    where: str | None = None,
+    cache: JediCache | None = None,
+) -> list[tuple[str, str | None]] | None:
+    """
+    ``tokenize_script`` without the Pygments classes: ``(text, reference)``
+    for each token of ``script``.
+    """
+    tokens = tokenize_script(script, ns, prev, config, where=where, cache=cache)
+    if tokens is None:
+        return None
+    return [(text, ref) for text, ref, _ in tokens]
+
+
 def get_classes(code: str) -> list[str]:
     """
     Extract Pygments token classes names for given code block
@@ -163,12 +395,3 @@ def get_classes(code: str) -> list[str]:
     tokens = list(lex(code, _PYGMENTS_LEXER))
     classes = [_PYGMENTS_FMT.ttype2class.get(x, "") for x, _ in tokens]
     return classes
-
-
-def _add_classes(
-    entries: list[tuple[str, str | None]],
-) -> list[tuple[str, str | None, str]]:
-    assert set(len(x) for x in entries) == {2}
-    text = "".join([x for x, y in entries])
-    classes = get_classes(text)
-    return [(*ii, cc) for ii, cc in zip(entries, classes, strict=True)]
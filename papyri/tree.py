@@ -6,7 +6,7 @@ usually trees, and update nodes.
 
 import logging
 from collections import Counter, defaultdict
-from collections.abc import Callable, Collection
+from collections.abc import Callable, Collection, Mapping
 from functools import lru_cache, partial
 from pathlib import Path
 from textwrap import indent
@@ -50,6 +50,7 @@ from .error_collector import (
     DiagnosticConfig,
     Diagnostics,
 )
+from .executors import FigureEncoder
 from .node_base import Node
 
 _N = TypeVar("_N", bound=Node)
@@ -171,9 +172,6 @@ class DelayedResolver:
             self._references[target] = []
 
 
-RESOLVER = DelayedResolver()
-
-
 def resolve_(
     qa: str,
     known_refs: frozenset[RefInfo],
@@ -645,13 +643,14 @@ class DirectiveVisiter(TreeReplacer):
         doc_path: Path | None = None,
         asset_store: Callable[[str, bytes], None] | None = None,
         doc_root: Path | None = None,
-        doc_targets: dict[str, str] | None = None,
-        external_targets: dict[str, str] | None = None,
-        doc_titles: dict[str, str] | None = None,
+        doc_targets: Mapping[str, str] | None = None,
+        external_targets: Mapping[str, str] | None = None,
+        doc_titles: Mapping[str, str] | None = None,
         execute: bool = False,
         param_names: frozenset[str] | set[str] | None = None,
         diagnostics: Diagnostics | None = None,
         github_slug: str | None = None,
+        figure_encoder: FigureEncoder | None = None,
     ):
         """
         qa: str
@@ -760,19 +759,21 @@ class DirectiveVisiter(TreeReplacer):
         self.version = version
         self._tocs: Any = []
         # Maps RST target label -> doc key for :ref: resolution within the bundle.
-        self.doc_targets: dict[str, str] = (
+        self.doc_targets: Mapping[str, str] = (
             doc_targets if doc_targets is not None else {}
         )
         # Maps RST target label -> external URL for named-hyperlink references
         # of the form ``.. _label: http://...`` referenced via ``label_``.
-        self.external_targets: dict[str, str] = (
+        self.external_targets: Mapping[str, str] = (
             external_targets if external_targets is not None else {}
         )
         # Maps doc key (':' separated) -> first section title, populated by
         # gen's first parse pass. Toctree entries without an explicit title
         # resolve their display text against this map so the rendered bullet
         # shows the document's heading rather than the raw path.
-        self.doc_titles: dict[str, str] = doc_titles if doc_titles is not None else {}
+        self.doc_titles: Mapping[str, str] = (
+            doc_titles if doc_titles is not None else {}
+        )
         # Names of parameters in the enclosing callable's signature, used to
         # auto-promote bare backtick references like `url` into ParamRef nodes
         # so the viewer can cross-highlight prose ↔ signature.
@@ -821,6 +822,7 @@ class DirectiveVisiter(TreeReplacer):
                 execute=execute,
                 qa=self.qa,
                 warn=self._directive_warn,
+                figure_encoder=figure_encoder,
             ),
         )
 
@@ -1318,9 +1320,16 @@ def _obj_from_path(parts: list[str]) -> Any:
 
 
 class GenVisitor(DirectiveVisiter):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # Section targets of this document only: a process-wide registry
+        # would make the outcome depend on which documents a ``--jobs``
+        # worker happened to visit before.
+        self._resolver = DelayedResolver()
+
     def visit_Section(self, node: Any) -> None:
         if node.target:
-            RESOLVER.add_target(LocalRef("docs", node.target), node.target)
+            self._resolver.add_target(LocalRef("docs", node.target), node.target)
 
     def replace_Fig(self, fig: Any) -> list[Any]:
         # todo: add version number here
@@ -10,7 +10,7 @@ from typing import Any
 import tree_sitter
 import tree_sitter_rst as _tree_sitter_rst
 
-from . import errors
+from . import errors, profiling
 from .nodes import (
     Blockquote,
     BulletList,
@@ -1162,6 +1162,7 @@ def _parse_cached(text: bytes) -> list[Section]:
     return ns
 
 
+@profiling.phase("tree-sitter")
 def parse(text: bytes, qa: str | None = None) -> list[Section]:
     """
     Parse text using Tree sitter RST, and return a list of serialised section I guess ?
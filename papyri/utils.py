@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import importlib
+import os
+import sys
 from textwrap import dedent
 from types import ModuleType
 from typing import Any, NewType
@@ -159,3 +161,34 @@ def obj_from_qualname(
                 next_obj = next_obj(*ctor_args, **(ctor_kwargs or {}))
             obj = next_obj
         return obj
+
+
+def peak_rss_mib(children: bool = False) -> float | None:
+    """
+    Peak resident set size of the current process in MiB (with ``children``,
+    of its largest terminated child process), or None where the ``resource``
+    module is not available (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS, KiB everywhere else.
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def current_rss_mib() -> float | None:
+    """
+    Resident set size of the current process in MiB, or None where
+    ``/proc/self/statm`` is not available (anything but Linux).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
@@ -0,0 +1,181 @@
+"""``papyri gen --watch``: keep a bundle up to date while its sources change.
+
+After the initial build, the ``Gen`` that produced the bundle stays alive: the
+package stays imported, Jedi keeps its in-memory state and the collected
+objects stay in memory. The package's imported modules and every file under
+``docs_path`` are polled for changes (no extra dependency; a stat call per
+file and interval), and on a change only what it affects is regenerated into
+the bundle directory:
+
+- an edited module is re-imported (re-parsed with the static collector),
+  its objects are collected again and documented again
+  (``Gen.reload_modules``, ``collect_api_docs`` with ``limit_to``,
+  ``partial_write``); objects that disappeared are removed from the bundle.
+  A module that fails to import keeps its previous version, and is retried
+  with the next change;
+- an edited narrative file rebuilds the narrative docs, which with ``cache``
+  enabled only re-visits the documents depending on it (see
+  ``narrative_cache``).
+
+Aliases (re-exports under other names) are those of the initial build; a
+restart picks up new ones.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING, Any
+
+from .error_collector import Diagnostics
+
+if TYPE_CHECKING:
+    from .gen import Gen
+
+# Seconds between two polls, and for a change to settle (editors often
+# write a file in several steps).
+POLL_INTERVAL = 0.5
+
+_Stamp = tuple[int, int]
+
+
+def _module_files(g: Gen) -> dict[Path, str]:
+    """Source file -> module name, for the modules of the package ``g`` documents."""
+    root = g.root
+    modules: list[tuple[str, Any]] = list(sys.modules.items())
+    if g.config.collector == "static":
+        # Not imported: the modules the static collector found.
+        modules = [
+            (name, obj)
+            for name, obj in g.api_objects().items()
+            if isinstance(obj, ModuleType)
+        ]
+    files = {}
+    for name, module in modules:
+        path = getattr(module, "__file__", None)
+        in_package = name == root or name.startswith(root + ".")
+        if in_package and path and path.endswith(".py"):
+            files[Path(path)] = name
+    return files
+
+
+def _stamps(paths: list[Path]) -> dict[Path, _Stamp]:
+    stamps = {}
+    for p in paths:
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        stamps[p] = (st.st_mtime_ns, st.st_size)
+    return stamps
+
+
+class _Sources:
+    """The files ``watch`` polls, and what a change to each of them affects."""
+
+    def __init__(self, g: Gen, *, api: bool, narrative: bool) -> None:
+        self.api = api
+        self.modules = _module_files(g) if api else {}
+        self.docs_root: Path | None = None
+        if narrative and g.config.docs_path:
+            self.docs_root = Path(g.config.docs_path).expanduser()
+
+    def refresh(self, g: Gen) -> None:
+        """
+        Also watch the modules imported since, keeping the files already
+        known: one that failed to import must stay watched for its fix.
+        """
+        if self.api:
+            self.modules.update(_module_files(g))
+
+    def poll(self) -> dict[Path, _Stamp]:
+        paths = list(self.modules)
+        if self.docs_root is not None and self.docs_root.is_dir():
+            paths.extend(p for p in self.docs_root.rglob("*") if p.is_file())
+        return _stamps(paths)
+
+    def is_doc(self, path: Path) -> bool:
+        return self.docs_root is not None and path.is_relative_to(self.docs_root)
+
+
+def _changes(before: dict[Path, _Stamp], after: dict[Path, _Stamp]) -> set[Path]:
+    return {p for p in before.keys() | after.keys() if before.get(p) != after.get(p)}
+
+
+def regenerate(g: Gen, bundle: Path, changed: set[Path], sources: _Sources) -> None:
+    """Regenerate into ``bundle`` what the ``changed`` files affect."""
+    start = time.perf_counter()
+    g.diagnostics = Diagnostics(g.diagnostics.config, g.log)
+    modules = sorted({sources.modules[p] for p in changed if p in sources.modules})
+    documented = 0
+    if modules:
+        qas, gone = g.reload_modules(modules)
+        for qa in gone:
+            g.bundle_entry(bundle, "module", qa).unlink(missing_ok=True)
+        if qas:
+            g.collect_api_docs(g.root, limit_to=qas)
+            g.partial_write(bundle)
+        documented = len(qas)
+    narrative = any(sources.is_doc(p) for p in changed)
+    if narrative:
+        g.rewrite_narrative(bundle)
+    summary = g.diagnostics.summary()
+    g.log.info(
+        "Regenerated %d object(s)%s in %.2fs%s",
+        documented,
+        " and the narrative docs" if narrative else "",
+        time.perf_counter() - start,
+        f"; diagnostics: {summary}" if summary else "",
+    )
+
+
+def watch(
+    g: Gen,
+    bundle: Path,
+    *,
+    api: bool,
+    narrative: bool,
+    interval: float = POLL_INTERVAL,
+) -> None:
+    """
+    Regenerate parts of ``bundle`` as the sources ``g`` built it from change,
+    until interrupted with Ctrl-C.
+    """
+    sources = _Sources(g, api=api, narrative=narrative)
+    stamps = sources.poll()
+    # Files whose regeneration failed, retried with the next change.
+    failed: set[Path] = set()
+    g.log.info("Watching %d file(s) for changes; press Ctrl-C to stop.", len(stamps))
+    try:
+        while True:
+            time.sleep(interval)
+            if not _changes(stamps, current := sources.poll()):
+                continue
+            # Let the change settle before acting on it.
+            while True:
+                time.sleep(interval)
+                settled = sources.poll()
+                if settled == current:
+                    break
+                current = settled
+            changed = _changes(stamps, current)
+            g.log.info(
+                "Changed: %s",
+                ", ".join(sorted(str(p) for p in changed)),
+            )
+            try:
+                regenerate(g, bundle, changed | failed, sources)
+                failed = set()
+            except Exception:
+                # Keep watching: the next save usually fixes it.
+                g.log.exception("Regeneration failed")
+                failed |= changed
+            # Reloading may have imported new modules.
+            sources.refresh(g)
+            stamps = current | sources.poll()
+    except KeyboardInterrupt:
+        g.log.info("Stopped watching %s", bundle)
+    finally:
+        g.close_jedi_cache()
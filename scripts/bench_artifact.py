@@ -0,0 +1,100 @@
+#!/usr/bin/env python3.13
+"""Benchmark ``papyri gen --artifact`` against ``papyri gen`` + ``papyri pack``.
+
+Reads a DocBundle directory written by ``papyri gen``, replicates its API
+documents until the bundle holds the requested number of objects, and loads
+it into a ``Gen`` as if it had just been built. For each ``staging_format``
+it then times the two ways of producing the artifact from there: writing the
+DocBundle directory and packing it (``Gen.write`` then
+``make_artifact_from_dir``), and packing straight from memory
+(``Gen.write_artifact``). Both must produce the same bytes.
+
+Usage::
+
+    papyri gen examples/papyri.toml
+    python scripts/bench_artifact.py ~/.papyri/data/papyri_0.0.10
+    python scripts/bench_artifact.py ~/.papyri/data/papyri_0.0.10 -n 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from papyri.config_loader import Config
+from papyri.gen import Gen
+from papyri.pack import (
+    STAGING_FORMATS,
+    _manifest_dict,
+    encode_entry,
+    make_artifact_from_dir,
+    read_bundle_dir,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("bundle", type=Path, help="DocBundle directory to start from")
+    parser.add_argument(
+        "-n",
+        "--objects",
+        type=int,
+        default=5000,
+        help="number of API documents to replicate the bundle's to (default: 5000)",
+    )
+    args = parser.parse_args()
+    # Orphan-doc and dangling-ref warnings are not what we are measuring.
+    logging.getLogger("papyri").setLevel(logging.ERROR)
+
+    bundle = read_bundle_dir(args.bundle.expanduser())
+    originals = list(bundle.api.items())
+    api = dict(originals)
+    i = 0
+    while len(api) < args.objects:
+        qa, doc = originals[i % len(originals)]
+        api[f"{qa}_copy{i}"] = doc
+        i += 1
+
+    print(
+        f"{len(api)} API documents, {len(bundle.narrative)} narrative docs, "
+        f"{len(bundle.examples)} examples"
+    )
+    print(f"{'format':<7} {'gen+pack s':>11} {'artifact s':>11} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as d:
+        for fmt in STAGING_FORMATS:
+            config = Config(dry_run=True, dummy_progress=True, staging_format=fmt)
+            gen = Gen(True, config=config)
+            gen.log.setLevel(logging.ERROR)
+            gen._meta = _manifest_dict(bundle)
+            gen.data = api
+            gen.docs = {k: encode_entry(v, fmt) for k, v in bundle.narrative.items()}
+            gen.examples = {k: encode_entry(v, fmt) for k, v in bundle.examples.items()}
+            gen.bdata = dict(bundle.assets)
+            gen._toc_nodes = list(bundle.toc)
+
+            out = Path(d) / fmt
+            out.mkdir()
+            start = time.perf_counter()
+            gen.write(out)
+            packed, _ = make_artifact_from_dir(out)
+            two_step = time.perf_counter() - start
+            gc.collect()
+
+            start = time.perf_counter()
+            gen.write_artifact(Path(d) / f"{fmt}.papyri")
+            direct = time.perf_counter() - start
+            assert (Path(d) / f"{fmt}.papyri").read_bytes() == packed, (
+                f"{fmt}: --artifact packed differently"
+            )
+            gc.collect()
+            print(
+                f"{fmt:<7} {two_step:>11.3f} {direct:>11.3f} {two_step / direct:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
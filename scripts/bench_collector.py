@@ -0,0 +1,87 @@
+#!/usr/bin/env python3.13
+"""Benchmark ``DFSCollector`` on a synthetic package of increasing size.
+
+Writes a throwaway package whose submodules hold plain functions and classes
+with methods, imports it, and times ``DFSCollector(...).items()`` (scan +
+prune) for growing fractions of the requested attribute count. The collector
+should scale linearly: the time per attribute stays flat as the package grows
+(it used to grow with the number of already-collected objects).
+
+Usage::
+
+    python scripts/bench_collector.py            # up to 50k attributes
+    python scripts/bench_collector.py -n 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from papyri.gen import DFSCollector
+
+# Per submodule: FUNCS functions + CLASSES classes with METHODS methods each.
+FUNCS = 500
+CLASSES = 50
+METHODS = 9
+PER_MODULE = FUNCS + CLASSES * (METHODS + 1)
+
+
+def write_package(root: Path, name: str, n_attributes: int) -> list[str]:
+    pkg = root / name
+    pkg.mkdir()
+    n_modules = max(1, n_attributes // PER_MODULE)
+    submodules = [f"{name}.m{i}" for i in range(n_modules)]
+    (pkg / "__init__.py").write_text(
+        "".join(f"from . import m{i}\n" for i in range(n_modules))
+    )
+    for i in range(n_modules):
+        lines = [f"def f{j}(x):\n    return x\n" for j in range(FUNCS)]
+        for j in range(CLASSES):
+            lines.append(f"class C{j}:\n")
+            lines.extend(f"    def m{k}(self):\n        pass\n" for k in range(METHODS))
+        (pkg / f"m{i}.py").write_text("\n".join(lines))
+    return submodules
+
+
+def bench(n_attributes: int) -> tuple[int, float]:
+    with tempfile.TemporaryDirectory() as d:
+        name = f"papyri_bench_collect_{n_attributes}"
+        write_package(Path(d), name, n_attributes)
+        sys.path.insert(0, d)
+        try:
+            root = importlib.import_module(name)
+            start = time.perf_counter()
+            collected = DFSCollector(root, []).items()
+            elapsed = time.perf_counter() - start
+        finally:
+            sys.path.remove(d)
+            for mod in [m for m in sys.modules if m.split(".")[0] == name]:
+                del sys.modules[mod]
+    return len(collected), elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "-n",
+        "--attributes",
+        type=int,
+        default=50_000,
+        help="attribute count of the largest package (default: 50000)",
+    )
+    args = parser.parse_args()
+
+    print(f"{'attributes':>10} {'collected':>10} {'seconds':>9} {'us/object':>10}")
+    for fraction in (8, 4, 2, 1):
+        n = args.attributes // fraction
+        count, elapsed = bench(n)
+        print(f"{n:>10} {count:>10} {elapsed:>9.3f} {1e6 * elapsed / count:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
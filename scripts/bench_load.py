@@ -0,0 +1,90 @@
+#!/usr/bin/env python3.13
+"""Benchmark the memory and time of loading a ``.papyri`` artifact.
+
+Loads an artifact with ``load_artifact``, the way ``papyri unpack``,
+``describe`` and ``lint`` do, and reports the time it takes, the memory the
+loaded ``Bundle`` holds (traced by ``tracemalloc``) and the peak while
+decoding, with the number of nodes and the average bytes held per node. For
+the immutable leaf classes that decoding hash-conses (``Node._interned``), it
+also reports how many distinct objects back their occurrences in the tree. A
+DocBundle directory is packed in memory first.
+
+Usage::
+
+    papyri gen examples/numpy.toml --no-exec --no-narrative --no-examples
+    papyri pack ~/.papyri/data/numpy_2.5.4
+    python scripts/bench_load.py ~/.papyri/data/numpy_2.5.4.papyri
+    python scripts/bench_load.py ~/.papyri/data/numpy_2.5.4
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import logging
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+from papyri.pack import _iter_nodes, load_artifact, make_artifact_from_dir
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "artifact", type=Path, help=".papyri artifact, or DocBundle directory"
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=3,
+        help="timing runs, the best of which is reported (default: 3)",
+    )
+    args = parser.parse_args()
+    # Orphan-doc and dangling-ref warnings are not what we are measuring.
+    logging.getLogger("papyri").setLevel(logging.ERROR)
+
+    path = args.artifact.expanduser()
+    if path.is_dir():
+        data, _ = make_artifact_from_dir(path)
+    else:
+        data = path.read_bytes()
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        gc.collect()
+        start = time.perf_counter()
+        bundle = load_artifact(data)
+        best = min(best, time.perf_counter() - start)
+        del bundle
+
+    gc.collect()
+    tracemalloc.start()
+    bundle = load_artifact(data)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    kinds: Counter[str] = Counter()
+    objects: dict[str, set[int]] = {}
+    for node in _iter_nodes(bundle):
+        name = type(node).__name__
+        kinds[name] += 1
+        if getattr(node, "_interned", False):
+            objects.setdefault(name, set()).add(id(node))
+    nodes = kinds.total()
+    print(f"{path.name}: {len(data) / 2**20:.1f} MiB artifact, {nodes} nodes")
+    print(", ".join(f"{k} {n}" for k, n in kinds.most_common(5)))
+    print(f"load_artifact    {best:8.3f} s")
+    print(f"held             {held / 2**20:8.1f} MiB ({held / nodes:.0f} B/node)")
+    print(f"peak             {peak / 2**20:8.1f} MiB")
+    for name, ids in sorted(objects.items()):
+        print(
+            f"{name + ' objects':<16} {len(ids):8} for {kinds[name]} "
+            f"({kinds[name] / len(ids):.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
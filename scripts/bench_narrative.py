@@ -0,0 +1,121 @@
+#!/usr/bin/env python3.13
+"""Benchmark ``Gen.collect_narrative_docs`` serially and with ``--jobs``.
+
+Writes a throwaway docs tree of synthetic ``.rst`` pages (sections with
+labels, paragraphs with inline markup, cross-references to other pages,
+literal blocks and a toctree on the index) and times both narrative passes
+with one process and with each requested number of workers, checking that
+every run produces the same documents.
+
+Usage::
+
+    python scripts/bench_narrative.py               # 1000 pages, 1/2/4 jobs
+    python scripts/bench_narrative.py -n 3000 -j 1 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from papyri import ts
+from papyri.config_loader import Config
+from papyri.gen import Gen
+
+PAGE = """\
+.. _page{i}:
+
+Page {i}
+========
+
+Some *emphasis*, some **strong** text and ``inline code``, with a link to
+:ref:`page{j}` and another to :ref:`page{i}-details`.
+
+.. _page{i}-details:
+
+Details
+-------
+
+.. note::
+
+   A note with a bullet list:
+
+   - first item
+   - second item referring to :ref:`page{k}`
+
+::
+
+    for x in range({i}):
+        print(x)
+
+Closing paragraph number {i}, long enough to wrap over a couple of lines in
+the rendered output of the narrative documentation.
+"""
+
+
+def write_docs(root: Path, n_pages: int) -> None:
+    pages = [f"page{i}" for i in range(n_pages)]
+    (root / "index.rst").write_text(
+        "Index\n=====\n\n.. toctree::\n\n" + "".join(f"   {p}\n" for p in pages)
+    )
+    for i in range(n_pages):
+        text = PAGE.format(i=i, j=(i + 1) % n_pages, k=(i * 7) % n_pages)
+        (root / f"page{i}.rst").write_text(text)
+
+
+def bench(docs: Path, jobs: int) -> tuple[dict[str, bytes], float]:
+    config = Config(
+        dry_run=True, dummy_progress=True, execute_doctests=False, jobs=jobs
+    )
+    config.docs_path = str(docs)
+    gen = Gen(True, config=config)
+    gen.log.setLevel(logging.WARNING)
+    gen._meta = {"version": "1.0", "module": "bench"}
+    # Trees cached by an earlier in-process run have already been visited.
+    ts._parse_cached.cache_clear()
+    start = time.perf_counter()
+    gen.collect_narrative_docs()
+    return gen.docs, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "-n",
+        "--pages",
+        type=int,
+        default=1000,
+        help="number of narrative pages (default: 1000)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4],
+        help="worker counts to time (default: 1 2 4)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        docs = Path(d)
+        write_docs(docs, args.pages)
+        print(f"{'jobs':>5} {'docs':>6} {'seconds':>9} {'speedup':>8}")
+        reference = None
+        baseline = None
+        for jobs in args.jobs:
+            out, elapsed = bench(docs, jobs)
+            if reference is None:
+                reference, baseline = out, elapsed
+            assert out == reference, f"--jobs {jobs} produced different docs"
+            assert baseline is not None
+            print(
+                f"{jobs:>5} {len(out):>6} {elapsed:>9.3f} {baseline / elapsed:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3.13
+"""Benchmark building Node instances: constructors and the two decoders.
+
+Reads the ``module/`` entries of a JSON-staged DocBundle directory written by
+``papyri gen`` and times, for every document, decoding it with ``from_dict``
+(how ``papyri pack`` reads a JSON staging directory) and decoding its CBOR
+encoding (how artifacts and CBOR staging directories are read). It also
+times building small nodes with their constructors, the way the tree-sitter
+visitor does. Each workload is run once more under ``tracemalloc`` to
+report the peak memory it allocates and what it keeps.
+
+Usage::
+
+    papyri gen examples/numpy.toml --no-exec --no-narrative --no-examples
+    python scripts/bench_nodes.py ~/.papyri/data/numpy_2.5.4
+    python scripts/bench_nodes.py ~/.papyri/data/numpy_2.5.4 -n 500000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from papyri.doc import GeneratedDoc
+from papyri.nodes import CrossRef, LocalRef, Paragraph, Text, encoder
+
+
+def measure(function: Callable[[], Any], repeat: int) -> tuple[float, float, float]:
+    """Best wall time, and traced peak and retained MiB, of ``function()``."""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+        del result
+    gc.collect()
+    tracemalloc.start()
+    result = function()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return best, peak / 2**20, retained / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("bundle", type=Path, help="DocBundle directory to read")
+    parser.add_argument(
+        "-n",
+        "--nodes",
+        type=int,
+        default=200_000,
+        help="nodes of each kind built with constructors (default: 200000)",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=3,
+        help="timing runs, the best of which is reported (default: 3)",
+    )
+    args = parser.parse_args()
+
+    files = sorted((args.bundle.expanduser() / "module").glob("*.json"))
+    data = [json.loads(f.read_bytes()) for f in files]
+    blobs = [encoder.encode(GeneratedDoc.from_dict(d)) for d in data]
+    n = args.nodes
+    print(f"{len(data)} API documents, {n} nodes per constructor workload")
+
+    workloads: dict[str, Callable[[], Any]] = {
+        "from_dict": lambda: [GeneratedDoc.from_dict(d) for d in data],
+        "cbor decode": lambda: [encoder.decode(b) for b in blobs],
+        "Text(...)": lambda: [Text("x") for _ in range(n)],
+        "Paragraph([...])": lambda: [Paragraph([Text("x")]) for _ in range(n)],
+        "CrossRef(kw=...)": lambda: [
+            CrossRef("x", reference=LocalRef("docs", "x"), kind="docs")
+            for _ in range(n)
+        ],
+    }
+    print(f"{'':<17} {'s':>8} {'peak MiB':>9} {'kept MiB':>9}")
+    for name, function in workloads.items():
+        seconds, peak, retained = measure(function, args.repeat)
+        print(f"{name:<17} {seconds:>8.3f} {peak:>9.1f} {retained:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
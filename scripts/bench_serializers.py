@@ -0,0 +1,101 @@
+#!/usr/bin/env python3.13
+"""Benchmark the compiled Node serializers against the generic ones.
+
+Reads the ``module/`` entries of a JSON-staged DocBundle directory written by
+``papyri gen``, and times turning them into ``GeneratedDoc`` objects and
+back: with the generic ``serde.deserialize`` / ``node_serializer.serialize``,
+which walk the annotations on every call, and with ``from_dict`` /
+``to_dict``, which use the functions compiled per class. ``papyri pack``
+decodes a JSON staging directory with ``from_dict``, and ``papyri gen``
+writes it with ``to_json``. Both paths must give equal documents and
+byte-identical JSON, and ``to_json`` must reproduce the files read.
+
+Usage::
+
+    papyri gen examples/numpy.toml --no-exec --no-narrative --no-examples
+    python scripts/bench_serializers.py ~/.papyri/data/numpy_2.5.4
+    python scripts/bench_serializers.py ~/.papyri/data/numpy_2.5.4 -r 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from papyri.doc import GeneratedDoc
+from papyri.node_serializer import serialize
+from papyri.serde import deserialize
+
+
+def best_of(repeat: int, function: Callable[[], Any]) -> tuple[float, Any]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("bundle", type=Path, help="DocBundle directory to read")
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=3,
+        help="timing runs, the best of which is reported (default: 3)",
+    )
+    args = parser.parse_args()
+
+    files = sorted((args.bundle.expanduser() / "module").glob("*.json"))
+    raw = [f.read_bytes() for f in files]
+    data = [json.loads(b) for b in raw]
+    print(f"{len(data)} API documents, {sum(map(len, raw)) / 2**20:.1f} MiB of JSON")
+
+    rows = []
+    t_generic, generic = best_of(
+        args.repeat,
+        lambda: [deserialize(GeneratedDoc, GeneratedDoc, d) for d in data],
+    )
+    t_compiled, docs = best_of(
+        args.repeat, lambda: [GeneratedDoc.from_dict(d) for d in data]
+    )
+    assert docs == generic, "from_dict decoded differently"
+    rows.append(("from_dict", t_generic, t_compiled))
+
+    t_generic, generic = best_of(
+        args.repeat, lambda: [serialize(doc, GeneratedDoc) for doc in docs]
+    )
+    t_compiled, compiled = best_of(args.repeat, lambda: [d.to_dict() for d in docs])
+    assert compiled == generic, "to_dict serialized differently"
+    rows.append(("to_dict", t_generic, t_compiled))
+
+    def dumps(d: Any) -> bytes:
+        return json.dumps(d, indent=2, sort_keys=True).encode()
+
+    t_generic, generic = best_of(
+        args.repeat, lambda: [dumps(serialize(doc, GeneratedDoc)) for doc in docs]
+    )
+    t_compiled, compiled = best_of(args.repeat, lambda: [d.to_json() for d in docs])
+    assert compiled == generic, "to_json serialized differently"
+    assert compiled == raw, "to_json does not reproduce the bundle"
+    rows.append(("to_json", t_generic, t_compiled))
+
+    print(f"{'':<10} {'generic s':>10} {'compiled s':>11} {'docs/s':>8} {'speedup':>8}")
+    for name, generic_s, compiled_s in rows:
+        print(
+            f"{name:<10} {generic_s:>10.3f} {compiled_s:>11.3f} "
+            f"{len(data) / compiled_s:>8.0f} {generic_s / compiled_s:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3.13
+"""Benchmark the JSON and CBOR staging formats of DocBundle directories.
+
+Reads a DocBundle directory written by ``papyri gen``, replicates its API
+documents until the bundle holds the requested number of objects, and for
+each ``staging_format`` times writing the staging directory, reading it back
+the way ``papyri pack`` does (``read_bundle_dir``) and encoding the artifact,
+and measures the size of the ``module/``, ``docs/`` and ``examples/``
+entries. Both formats must pack into the same artifact.
+
+Usage::
+
+    papyri gen examples/papyri.toml
+    python scripts/bench_staging.py ~/.papyri/data/papyri_0.0.10
+    python scripts/bench_staging.py ~/.papyri/data/papyri_0.0.10 -n 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from papyri.pack import (
+    STAGING_FORMATS,
+    explode_bundle_to_dir,
+    make_artifact,
+    read_bundle_dir,
+)
+
+
+def entries_size(path: Path) -> int:
+    return sum(
+        f.stat().st_size
+        for sub in ("module", "docs", "examples")
+        if (path / sub).is_dir()
+        for f in (path / sub).iterdir()
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("bundle", type=Path, help="DocBundle directory to start from")
+    parser.add_argument(
+        "-n",
+        "--objects",
+        type=int,
+        default=5000,
+        help="number of API documents to replicate the bundle's to (default: 5000)",
+    )
+    args = parser.parse_args()
+    # Orphan-doc and dangling-ref warnings are not what we are measuring.
+    logging.getLogger("papyri").setLevel(logging.ERROR)
+
+    bundle = read_bundle_dir(args.bundle.expanduser())
+    originals = list(bundle.api.items())
+    api = dict(originals)
+    i = 0
+    while len(api) < args.objects:
+        qa, doc = originals[i % len(originals)]
+        api[f"{qa}_copy{i}"] = doc
+        i += 1
+    bundle.api = api
+
+    print(
+        f"{len(api)} API documents, {len(bundle.narrative)} narrative docs, "
+        f"{len(bundle.examples)} examples"
+    )
+    print(f"{'format':<7} {'write s':>9} {'read s':>9} {'pack s':>9} {'MiB':>9}")
+    reference = None
+    with tempfile.TemporaryDirectory() as d:
+        for fmt in STAGING_FORMATS:
+            out = Path(d) / fmt
+            start = time.perf_counter()
+            explode_bundle_to_dir(bundle, out, staging_format=fmt)
+            write = time.perf_counter() - start
+            start = time.perf_counter()
+            read = read_bundle_dir(out)
+            read_s = time.perf_counter() - start
+            start = time.perf_counter()
+            artifact = make_artifact(read)
+            pack = time.perf_counter() - start
+            if reference is None:
+                reference = artifact
+            assert artifact == reference, f"{fmt} staging packed differently"
+            # Keep the garbage collector from walking this one while timing
+            # the next format.
+            del read
+            gc.collect()
+            print(
+                f"{fmt:<7} {write:>9.3f} {read_s:>9.3f} {pack:>9.3f} "
+                f"{entries_size(out) / 2**20:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
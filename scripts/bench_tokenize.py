@@ -0,0 +1,68 @@
+#!/usr/bin/env python3.13
+"""Benchmark ``tokenize_script`` on long examples of increasing size.
+
+Builds a synthetic gallery-style script by repeating a block of typical
+example code, and times ``tokenize_script`` (lexing, token positions and
+Pygments classes) with inference off, so only the tokenizer is measured. The
+time per token should stay flat as the script grows (it used to grow with the
+script length, as each token's position was found by rescanning the script,
+and the script was lexed a second time for the classes).
+
+Usage::
+
+    python scripts/bench_tokenize.py            # up to 8000 lines
+    python scripts/bench_tokenize.py -n 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from papyri.config_loader import Config
+from papyri.tokens import tokenize_script
+
+BLOCK = """\
+import numpy as np
+import matplotlib.pyplot as plt
+
+x = np.linspace(0, 2 * np.pi, 100)
+y = np.sin(x) + 0.1 * np.random.default_rng(0).normal(size=x.shape)
+fig, ax = plt.subplots()
+ax.plot(x, y, label="noisy sine")  # a comment
+for i, value in enumerate(y[:3]):
+    print(f"{i}: {value:.2f}")
+"""
+
+
+def bench(n_lines: int) -> tuple[int, float]:
+    block_lines = BLOCK.count("\n")
+    script = BLOCK * max(1, n_lines // block_lines)
+    config = Config(infer=False)
+    start = time.perf_counter()
+    tokens = tokenize_script(script, {}, "", config)
+    elapsed = time.perf_counter() - start
+    assert tokens is not None
+    return len(tokens), elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "-n",
+        "--lines",
+        type=int,
+        default=8_000,
+        help="line count of the longest script (default: 8000)",
+    )
+    args = parser.parse_args()
+
+    print(f"{'lines':>7} {'tokens':>8} {'seconds':>9} {'us/token':>9}")
+    for fraction in (8, 4, 2, 1):
+        n = args.lines // fraction
+        count, elapsed = bench(n)
+        print(f"{n:>7} {count:>8} {elapsed:>9.3f} {1e6 * elapsed / count:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3.13
+"""Benchmark ``Node.validate()`` over a whole ``Bundle``.
+
+Reads a DocBundle directory the way ``papyri pack`` does, without its final
+``validate()``, then times validating the freshly decoded bundle (the check
+``pack`` runs) and validating it again (as gen does for documents it has
+already checked). Also times the whole ``make_artifact_from_dir`` with and
+without ``--no-revalidate``.
+
+Usage::
+
+    papyri gen examples/numpy.toml --no-exec --no-narrative --no-examples
+    python scripts/bench_validate.py ~/.papyri/data/numpy_2.5.4
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import logging
+import time
+from pathlib import Path
+
+from papyri.pack import make_artifact_from_dir, read_bundle_dir
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("bundle", type=Path, help="DocBundle directory to read")
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=3,
+        help="timing runs, the best of which is reported (default: 3)",
+    )
+    args = parser.parse_args()
+    # Orphan-doc and dangling-ref warnings are not what we are measuring.
+    logging.getLogger("papyri").setLevel(logging.ERROR)
+    path = args.bundle.expanduser()
+
+    first = again = float("inf")
+    for _ in range(args.repeat):
+        bundle = read_bundle_dir(path, revalidate=False)
+        gc.collect()
+        start = time.perf_counter()
+        bundle.validate()
+        first = min(first, time.perf_counter() - start)
+        start = time.perf_counter()
+        bundle.validate()
+        again = min(again, time.perf_counter() - start)
+        del bundle
+
+    packs = {}
+    for revalidate in (True, False):
+        best = float("inf")
+        for _ in range(args.repeat):
+            gc.collect()
+            start = time.perf_counter()
+            make_artifact_from_dir(path, revalidate=revalidate)
+            best = min(best, time.perf_counter() - start)
+        packs[revalidate] = best
+
+    print(f"{path.name}: {len(list((path / 'module').iterdir()))} API documents")
+    print(f"validate (decoded)       {first:8.3f} s")
+    print(f"validate (again)         {again:8.3f} s")
+    print(f"pack                     {packs[True]:8.3f} s")
+    print(f"pack --no-revalidate     {packs[False]:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()